@@ -0,0 +1,89 @@
+# Classe que define um 'cache' de tamanho limitado, que descarta o item usado há mais tempo quando fica cheio
+
+from collections import OrderedDict
+
+
+class CacheLRU:
+
+    def __init__(self, tamanho_maximo):
+
+        # Quantidade máxima de itens armazenados, 0 desabilita o 'cache'
+        self.tamanho_maximo = tamanho_maximo
+
+        # Itens armazenados, do usado há mais tempo para o usado mais recentemente
+        self.itens = OrderedDict()
+
+        # Quantidade de buscas que encontraram o item
+        self.acertos = 0
+
+        # Quantidade de buscas que não encontraram o item
+        self.falhas = 0
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __contains__(self, chave):
+        return chave in self.itens
+
+    # Retorna o item associado à chave, ou None se ele não estiver armazenado
+    def obtem(self, chave):
+
+        if chave not in self.itens:
+
+            self.falhas += 1
+            return None
+
+        self.acertos += 1
+
+        # O item passa a ser o usado mais recentemente
+        self.itens.move_to_end(chave)
+
+        return self.itens[chave]
+
+    # Armazena um item, descartando os usados há mais tempo se o tamanho máximo for ultrapassado
+    def insere(self, chave, valor):
+
+        if self.tamanho_maximo <= 0:
+            return
+
+        self.itens[chave] = valor
+        self.itens.move_to_end(chave)
+
+        while len(self.itens) > self.tamanho_maximo:
+            self.itens.popitem(last=False)
+
+    # Contabiliza um acerto de um item obtido fora do 'cache', como uma avaliação repetida no mesmo lote
+    def registra_acerto(self):
+
+        self.acertos += 1
+
+    # Retorna o estado do 'cache' (itens, acertos e falhas), para que ele seja salvo e restaurado depois
+    def estado(self):
+
+        return list(self.itens.items()), self.acertos, self.falhas
+
+    # Restaura o estado retornado por estado()
+    def restaura(self, estado):
+
+        itens, self.acertos, self.falhas = estado
+
+        self.itens.clear()
+        self.itens.update(itens)
+
+    def limpa(self):
+
+        self.itens.clear()
+        self.acertos = 0
+        self.falhas = 0
+
+    # Retorna a fração das buscas que encontraram o item
+    def taxa_acertos(self):
+
+        buscas = self.acertos + self.falhas
+
+        return self.acertos / buscas if buscas else 0.0
+
+    def __str__(self):
+
+        return f"{len(self.itens)} itens, {self.acertos} acertos, {self.falhas} falhas " \
+               f"({100 * self.taxa_acertos():.1f}% de acertos)"
@@ -0,0 +1,91 @@
+# Classe que calcula e armazena os circuitos eulerianos dos clusters de um modelo da cidade
+# Cada execução do NSGA-II possui os seus próprios circuitos, para que o modelo da cidade, que é compartilhado entre
+# as execuções, não precise ser alterado
+
+import networkx as nx
+import numpy as np
+
+from RoteamentoTCC.CacheLRU import CacheLRU
+
+
+class CircuitosEulerianos:
+
+    # modelo: Modelo da cidade (ModeloCidade) com os subgrafos dos clusters
+    # tamanho_cache: Quantidade máxima de circuitos armazenados
+    # rotaciona: Se True, os novos circuitos de um cluster são obtidos rotacionando o primeiro circuito calculado dele
+    def __init__(self, modelo, tamanho_cache, rotaciona=False):
+
+        self.modelo = modelo
+
+        self.rotaciona = rotaciona
+
+        # 'Cache' dos circuitos, indexados pelo número de clusters, id do cluster e id do ponto de início
+        # Cada circuito é armazenado como um array com a sequência dos índices (do grafo compilado) dos pontos
+        # percorridos e um array com o peso de cada aresta percorrida
+        self.cache = CacheLRU(tamanho_cache)
+
+        # Primeiro circuito calculado de cada cluster, utilizado para as rotações
+        self.base = {}
+
+    # Descarta os circuitos já calculados
+    def limpa(self):
+
+        self.cache.limpa()
+        self.base.clear()
+
+    # Retorna o circuito euleriano de um cluster que começa no ponto passado
+    # Os circuitos já calculados são obtidos do 'cache', e os novos são calculados pelo networkx ou, se a rotação
+    # estiver habilitada, rotacionando um circuito já calculado do mesmo cluster
+    def circuito(self, n_cluster, id_cluster, id_inicio):
+
+        chave = (n_cluster, id_cluster, id_inicio)
+
+        circuito = self.cache.obtem(chave)
+
+        if circuito is not None:
+            return circuito
+
+        grafo = self.modelo.grafo
+
+        base = self.base.get((n_cluster, id_cluster))
+
+        # Somente circuitos fechados podem ser rotacionados, e o ponto de início precisa fazer parte do circuito
+        if self.rotaciona and base is not None and len(base[0]) > 1 and base[0][0] == base[0][-1]:
+
+            sequencia, pesos = base
+            posicoes = np.flatnonzero(sequencia[:-1] == grafo.indices[id_inicio])
+
+            if len(posicoes) > 0:
+
+                posicao = posicoes[0]
+                circuito = (np.concatenate((sequencia[posicao:-1], sequencia[:posicao + 1])),
+                            np.concatenate((pesos[posicao:], pesos[:posicao])))
+
+        if circuito is None:
+
+            grafo_cluster = self.modelo.subgrafo(n_cluster, id_cluster)
+
+            rota = list(nx.eulerian_path(grafo_cluster, source=id_inicio))
+
+            # O peso de cada passo é o da primeira aresta entre os dois pontos no subgrafo do cluster, que pode possuir
+            # arestas que não existem no grafo da cidade, criadas para conectá-lo
+            if len(rota) != 0:
+
+                sequencia = [rota[0][0]] + [v for _, v in rota]
+                circuito = (np.array([grafo.indices[no] for no in sequencia], dtype=np.int32),
+                            np.array([grafo_cluster[u][v][0]["weight"] for u, v in rota], dtype=np.float64))
+            else:
+
+                circuito = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+
+            self.base.setdefault((n_cluster, id_cluster), circuito)
+
+        self.cache.insere(chave, circuito)
+
+        return circuito
+
+    def taxa_acertos(self):
+        return self.cache.taxa_acertos()
+
+    def __str__(self):
+        return str(self.cache)
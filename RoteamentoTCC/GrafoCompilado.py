@@ -0,0 +1,261 @@
+# Classe que define uma versão compilada do grafo simplificado da cidade
+# Os pontos são identificados por índices inteiros densos, no lugar dos ids do OSM, e as ligações ficam em arrays no
+# formato CSR (Compressed Sparse Row): os vizinhos do ponto i estão nas posições offsets[i] até offsets[i + 1]
+# O grafo do networkx continua sendo a referência para a exportação e plotagem, e este é utilizado nos cálculos das rotas
+
+import numpy as np
+
+
+class GrafoCompilado:
+
+    # Arrays do grafo, que podem ser copiados para um bloco de memória compartilhada
+    ARRAYS = ('lixo', 'altitude', 'vizinhos', 'pesos', 'ruas', 'offsets', 'ordem_chaves', 'chaves',
+              'distancias_deposito', 'predecessores_deposito')
+
+    # grafo: Grafo simplificado da cidade (MultiGraph do networkx)
+    # pontos: Dicionário que associa o id de cada ponto ao objeto Ponto
+    # deposito: Id do ponto do depósito
+    # distancias_deposito: Dicionário com a distância mínima de cada ponto até o depósito
+    # predecessores_deposito: Dicionário com o predecessor de cada ponto na árvore de caminhos mínimos do depósito
+    def __init__(self, grafo, pontos, deposito, distancias_deposito, predecessores_deposito):
+
+        # Id do OSM de cada índice e índice de cada id
+        self.ids = list(pontos)
+        self.indices = {id_ponto: indice for indice, id_ponto in enumerate(self.ids)}
+
+        n_pontos = len(self.ids)
+
+        # Quantidade de lixo e altitude de cada ponto
+        self.lixo = np.array([ponto.quantidade_lixo for ponto in pontos.values()], dtype=np.float64)
+        self.altitude = np.array([ponto.altitude for ponto in pontos.values()], dtype=np.float64)
+
+        # As ligações são listadas nas duas direções, na ordem das chaves das arestas paralelas
+        origens = []
+        destinos = []
+        pesos = []
+        ruas = []
+
+        # Ids das ruas, o índice de cada rua no array 'ruas' é a posição do seu id nesta lista
+        self.ids_ruas = []
+        indices_ruas = {}
+
+        for origem, vizinhos in grafo.adjacency():
+
+            for destino, arestas in vizinhos.items():
+
+                for dados in arestas.values():
+
+                    # A aresta pode armazenar o objeto Rua ou somente o seu id
+                    id_rua = getattr(dados.get('rua'), 'id', dados.get('rua'))
+
+                    if id_rua is not None and id_rua not in indices_ruas:
+
+                        indices_ruas[id_rua] = len(self.ids_ruas)
+                        self.ids_ruas.append(id_rua)
+
+                    origens.append(self.indices[origem])
+                    destinos.append(self.indices[destino])
+                    pesos.append(dados.get('weight', np.nan))
+                    ruas.append(indices_ruas[id_rua] if id_rua is not None else -1)
+
+        origens = np.array(origens, dtype=np.int32)
+
+        # Ordena as ligações pela origem, mantendo a ordem das arestas paralelas
+        ordem = np.argsort(origens, kind='stable')
+
+        self.vizinhos = np.array(destinos, dtype=np.int32)[ordem]
+        self.pesos = np.array(pesos, dtype=np.float64)[ordem]
+        self.ruas = np.array(ruas, dtype=np.int32)[ordem]
+        self.offsets = np.searchsorted(origens[ordem], np.arange(n_pontos + 1)).astype(np.int64)
+
+        # Chave única de cada ligação, ordenada para as buscas de pesos
+        # A ordenação estável faz com que a primeira ocorrência de cada par seja a aresta de chave 0
+        chaves = origens[ordem].astype(np.int64) * n_pontos + self.vizinhos
+        self.ordem_chaves = np.argsort(chaves, kind='stable')
+        self.chaves = chaves[self.ordem_chaves]
+
+        # Árvore de caminhos mínimos do depósito, com infinito e -1 para os pontos não alcançáveis
+        self.deposito = self.indices.get(deposito, -1)
+
+        self.distancias_deposito = np.full(n_pontos, np.inf)
+        self.predecessores_deposito = np.full(n_pontos, -1, dtype=np.int32)
+
+        for id_ponto, distancia in distancias_deposito.items():
+            self.distancias_deposito[self.indices[id_ponto]] = distancia
+
+        for id_ponto, predecessor in predecessores_deposito.items():
+            if predecessor is not None:
+                self.predecessores_deposito[self.indices[id_ponto]] = self.indices[predecessor]
+
+    # Recria o grafo a partir dos ids e dos arrays, sem copiá-los
+    @classmethod
+    def de_arrays(cls, ids, ids_ruas, deposito, arrays):
+
+        grafo = cls.__new__(cls)
+
+        grafo.ids = list(ids)
+        grafo.indices = {id_ponto: indice for indice, id_ponto in enumerate(grafo.ids)}
+        grafo.ids_ruas = list(ids_ruas)
+        grafo.deposito = deposito
+
+        for campo in cls.ARRAYS:
+            setattr(grafo, campo, arrays[campo])
+
+        return grafo
+
+    # Retorna uma cópia do grafo com outras quantidades de lixo nos pontos, compartilhando os demais arrays
+    def com_lixo(self, lixo):
+
+        arrays = {campo: getattr(self, campo) for campo in self.ARRAYS}
+        arrays['lixo'] = np.array(lixo, dtype=np.float64)
+
+        return GrafoCompilado.de_arrays(self.ids, self.ids_ruas, self.deposito, arrays)
+
+    # Impede que os arrays sejam alterados
+    def congela(self):
+
+        for campo in self.ARRAYS:
+            getattr(self, campo).flags.writeable = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Retorna os índices dos vizinhos de um ponto
+    def vizinhos_ponto(self, indice):
+
+        return self.vizinhos[self.offsets[indice]:self.offsets[indice + 1]]
+
+    # Retorna o peso da aresta de chave 0 entre cada par de pontos
+    # Pares que não estão ligados recebem NaN
+    def pesos_arestas(self, origens, destinos):
+
+        chaves = np.asarray(origens, dtype=np.int64) * len(self.ids) + np.asarray(destinos, dtype=np.int64)
+
+        if len(self.chaves) == 0:
+            return np.full(chaves.shape, np.nan)
+
+        posicoes = np.searchsorted(self.chaves, chaves)
+        posicoes_validas = np.minimum(posicoes, len(self.chaves) - 1)
+
+        encontrados = (posicoes < len(self.chaves)) & (self.chaves[posicoes_validas] == chaves)
+
+        return np.where(encontrados, self.pesos[self.ordem_chaves[posicoes_validas]], np.nan)
+
+    # Retorna o índice da rua da aresta de chave 0 entre os dois pontos, -1 se eles não estiverem ligados ou se a aresta
+    # não possuir rua
+    def rua_aresta(self, origem, destino):
+
+        chave = origem * len(self.ids) + destino
+        posicao = int(np.searchsorted(self.chaves, chave))
+
+        if posicao < len(self.chaves) and self.chaves[posicao] == chave:
+            return int(self.ruas[self.ordem_chaves[posicao]])
+
+        return -1
+
+    # Converte um array de índices para a lista dos ids do OSM
+    def ids_pontos(self, indices):
+
+        return [self.ids[indice] for indice in np.asarray(indices).tolist()]
+
+    # Retorna a distância mínima entre o ponto e o depósito
+    def distancia_deposito(self, indice):
+
+        distancia = self.distancias_deposito[indice]
+
+        if np.isinf(distancia):
+            raise ValueError(f"O ponto {self.ids[indice]} não é alcançável a partir do depósito")
+
+        return distancia
+
+    # Retorna a distância e os índices do caminho do depósito até o ponto
+    def caminho_do_deposito(self, indice):
+
+        distancia = self.distancia_deposito(indice)
+
+        caminho = [indice]
+
+        # Percorre a árvore de predecessores até chegar no depósito
+        while caminho[-1] != self.deposito:
+            caminho.append(int(self.predecessores_deposito[caminho[-1]]))
+
+        caminho.reverse()
+
+        return distancia, caminho
+
+    # Calcula o custo de um caminhão percorrer o circuito de um cluster, saindo do depósito e voltando a ele
+    # sequencia: Índices dos pontos percorridos pelo circuito
+    # pesos: Peso de cada aresta percorrida
+    # recolhido: Array booleano que indica os pontos onde o lixo já foi recolhido, atualizado no lugar
+    # capacidade: Capacidade do caminhão, quando ela seria atingida o caminhão vai ao depósito e volta
+    # lixo_inicial, variacao_inicial: Valores acumulados até o cluster anterior, que continuam sendo somados
+    # Retorna a distância percorrida, o lixo acumulado e a variação de altitude acumulada
+    # As somas são feitas sequencialmente, na mesma ordem da simulação passo a passo, para que os resultados sejam
+    # exatamente iguais aos dela
+    def custo_circuito(self, sequencia, pesos, recolhido, capacidade, lixo_inicial, variacao_inicial):
+
+        if len(pesos) == 0:
+            return 0, lixo_inicial, variacao_inicial
+
+        # Cada aresta visita seus dois pontos, na ordem origem e destino
+        candidatos = np.empty(2 * len(pesos), dtype=np.int64)
+        candidatos[0::2] = sequencia[:-1]
+        candidatos[1::2] = sequencia[1:]
+
+        # O lixo é recolhido somente na primeira visita a cada ponto ainda não recolhido
+        posicoes = np.flatnonzero(~recolhido[candidatos])
+        _, primeiras = np.unique(candidatos[posicoes], return_index=True)
+        coletas = np.sort(posicoes[primeiras])
+
+        pontos_coleta = candidatos[coletas]
+        lixo_coleta = self.lixo[pontos_coleta]
+
+        recolhido[pontos_coleta] = True
+
+        # Posições das coletas em que a capacidade seria atingida
+        # A carga é a soma acumulada desde a última ida ao depósito, e a coleta que dispara a ida não é verificada
+        gatilhos = []
+        inicio = 0
+        verifica = 0
+
+        while verifica < len(lixo_coleta):
+
+            carga = np.add.accumulate(lixo_coleta[inicio:])
+            excedidos = np.flatnonzero(carga[verifica - inicio:] >= capacidade)
+
+            if len(excedidos) == 0:
+                break
+
+            inicio = verifica + int(excedidos[0])
+            verifica = inicio + 1
+
+            gatilhos.append(inicio)
+
+        # Parcelas da distância de cada aresta: o peso e as idas e voltas ao depósito na origem e no destino
+        parcelas = np.zeros((len(pesos), 5))
+        parcelas[:, 0] = pesos
+
+        if gatilhos:
+
+            posicoes_gatilhos = coletas[gatilhos]
+            distancias = self.distancias_deposito[candidatos[posicoes_gatilhos]]
+
+            if np.any(np.isinf(distancias)):
+                self.distancia_deposito(int(candidatos[posicoes_gatilhos][np.isinf(distancias)][0]))
+
+            colunas = 1 + 2 * (posicoes_gatilhos % 2)
+
+            parcelas[posicoes_gatilhos // 2, colunas] = distancias
+            parcelas[posicoes_gatilhos // 2, colunas + 1] = distancias
+
+        ida = self.distancia_deposito(int(sequencia[0]))
+        volta = self.distancia_deposito(int(sequencia[-1]))
+
+        distancia = np.add.accumulate(np.concatenate(([ida], parcelas.ravel(), [volta])))[-1]
+
+        lixo = np.add.accumulate(np.concatenate(([lixo_inicial], lixo_coleta)))[-1]
+
+        gradientes = np.abs(self.altitude[sequencia[:-1]] - self.altitude[sequencia[1:]]) / pesos
+        variacao = np.add.accumulate(np.concatenate(([variacao_inicial], gradientes)))[-1]
+
+        return distancia, lixo, variacao
@@ -0,0 +1,301 @@
+# Classe que define o modelo imutável de uma cidade já processada
+# Reúne tudo o que o NSGA-II utiliza da cidade: o grafo compilado (com as demandas de lixo e as altitudes dos pontos),
+# os agrupamentos e os subgrafos eulerianos de cada quantidade de clusters, a capacidade dos caminhões e os dados
+# utilizados na geração dos resultados
+# Como o modelo não pode ser alterado depois de criado, ele pode ser utilizado por várias execuções ao mesmo tempo, em
+# threads ou em processos. Os seus dados podem ser copiados para um bloco de memória compartilhada (compartilha), ao
+# qual os outros processos se conectam sem copiar a cidade (anexa)
+
+import hashlib
+import os
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from RoteamentoTCC.GrafoCompilado import GrafoCompilado
+
+# Alinhamento, em bytes, do início de cada array no bloco de memória compartilhada
+ALINHAMENTO = 8
+
+
+# Copia o subgrafo de um cluster mantendo somente os pesos das arestas
+# As arestas são inseridas na mesma ordem em que o networkx as insere ao copiar um grafo, e como o circuito euleriano é
+# calculado sobre uma cópia do subgrafo, os circuitos da cópia são iguais aos do subgrafo original
+def _subgrafo_enxuto(grafo):
+
+    enxuto = grafo.__class__()
+
+    enxuto.add_nodes_from(grafo)
+    enxuto.add_edges_from((u, v, chave, {'weight': dados['weight']} if 'weight' in dados else {})
+                          for u, v, chave, dados in grafo.edges(keys=True, data=True))
+
+    return enxuto
+
+
+class ModeloCidade:
+
+    # grafo: Grafo compilado da cidade (GrafoCompilado), com as demandas de lixo já calculadas
+    # deposito: Id do ponto do depósito
+    # capacidade: Capacidade de cada caminhão
+    # quantidade_lixo: Quantidade total de lixo gerada na cidade
+    # clusters: Dicionário que associa cada número de clusters a um dicionário com os ids dos pontos de cada cluster
+    # subgrafos: Dicionário que associa cada número de clusters a um dicionário com o subgrafo euleriano de cada cluster
+    # coordenadas: Dicionário com as coordenadas de cada ponto, no formato 'longitude,latitude,altitude' do KML
+    # nomes_ruas: Dicionário que associa o id de cada rua ao seu nome
+    def __init__(self, grafo, deposito, capacidade, quantidade_lixo, clusters, subgrafos, coordenadas, nomes_ruas):
+
+        # Os clusters são guardados na ordem em que aparecem nos agrupamentos, que é a ordem em que as rotas são
+        # montadas, e os pontos de cada cluster são acessados pelo id do cluster
+        ordem_clusters = {n_cluster: tuple(int(id_cluster) for id_cluster in agrupamentos)
+                          for n_cluster, agrupamentos in clusters.items()}
+
+        pontos_clusters = {n_cluster: tuple(tuple(agrupamentos.get(id_cluster, ())) for id_cluster in
+                                            range(max(ordem_clusters[n_cluster], default=-1) + 1))
+                           for n_cluster, agrupamentos in clusters.items()}
+
+        grafo.congela()
+
+        self._inicia(grafo, deposito, capacidade, quantidade_lixo, ordem_clusters, pontos_clusters,
+                     {n_cluster: {int(id_cluster): _subgrafo_enxuto(grafo_cluster)
+                                  for id_cluster, grafo_cluster in grafos.items()}
+                      for n_cluster, grafos in subgrafos.items()},
+                     tuple(coordenadas[id_ponto] for id_ponto in grafo.ids),
+                     tuple(nomes_ruas.get(id_rua) for id_rua in grafo.ids_ruas), None, None)
+
+    def _inicia(self, grafo, deposito, capacidade, quantidade_lixo, ordem_clusters, pontos_clusters, subgrafos,
+                coordenadas, nomes_ruas, memoria, descritor):
+
+        atributos = {
+            'grafo': grafo,
+            'deposito': deposito,
+            'capacidade': capacidade,
+            'quantidade_lixo': quantidade_lixo,
+            '_ordem_clusters': ordem_clusters,
+            '_pontos_clusters': pontos_clusters,
+            # Subgrafos já carregados, os demais são lidos da memória compartilhada quando forem utilizados
+            '_subgrafos': subgrafos,
+            '_coordenadas': coordenadas,
+            '_nomes_ruas': nomes_ruas,
+            # Bloco de memória compartilhada com os dados do modelo, None se eles estiverem na memória do processo
+            '_memoria': memoria,
+            'descritor': descritor,
+            # Id do processo que criou o bloco, None se ele não foi criado por este modelo
+            '_dono': None
+        }
+
+        for atributo, valor in atributos.items():
+            object.__setattr__(self, atributo, valor)
+
+    def __setattr__(self, atributo, valor):
+        raise AttributeError("O modelo da cidade não pode ser alterado")
+
+    def __delattr__(self, atributo):
+        raise AttributeError("O modelo da cidade não pode ser alterado")
+
+    # Números de clusters disponíveis no modelo
+    @property
+    def numeros_clusters(self):
+        return tuple(sorted(self._ordem_clusters))
+
+    # Ids dos clusters de um número de clusters, na ordem em que as rotas são montadas
+    def ordem_clusters(self, n_cluster):
+        return self._ordem_clusters[n_cluster]
+
+    # Ids dos pontos de cada cluster de um número de clusters, indexados pelo id do cluster
+    def clusters(self, n_cluster):
+        return self._pontos_clusters[n_cluster]
+
+    # Subgrafo euleriano de um cluster
+    # O subgrafo não deve ser alterado, pois é compartilhado por todas as execuções que utilizam o modelo
+    def subgrafo(self, n_cluster, id_cluster):
+        return self._subgrafos_cluster(n_cluster)[id_cluster]
+
+    # Subgrafos eulerianos de todos os clusters de um número de clusters
+    def _subgrafos_cluster(self, n_cluster):
+
+        subgrafos = self._subgrafos.get(n_cluster)
+
+        if subgrafos is None:
+
+            inicio, fim = self.descritor['subgrafos'][n_cluster]
+
+            subgrafos = pickle.loads(self._memoria.buf[inicio:fim])
+
+            # Se duas threads lerem o mesmo número de clusters ao mesmo tempo, as duas leituras são iguais
+            self._subgrafos[n_cluster] = subgrafos
+
+        return subgrafos
+
+    # Coordenadas de um ponto, no formato 'longitude,latitude,altitude' do KML
+    def coordenada(self, id_ponto):
+        return self._coordenadas[self.grafo.indices[id_ponto]]
+
+    # Nome da rua da aresta entre os dois pontos, None se eles não estiverem ligados no grafo da cidade
+    def nome_rua(self, origem, destino):
+
+        indice_rua = self.grafo.rua_aresta(self.grafo.indices[origem], self.grafo.indices[destino])
+
+        return self._nomes_ruas[indice_rua] if indice_rua != -1 else None
+
+    # Identifica a cidade e os agrupamentos do modelo, sem considerar as demandas de lixo
+    def assinatura(self):
+
+        assinatura = hashlib.sha256()
+        assinatura.update(repr((self.deposito, self.numeros_clusters, self.grafo.ids,
+                                [self._pontos_clusters[n_cluster] for n_cluster in self.numeros_clusters])).encode())
+
+        return assinatura.hexdigest()
+
+    # Retorna um novo modelo da mesma cidade com outras demandas de lixo
+    # lixo: Quantidade de lixo de cada ponto, na ordem dos índices do grafo compilado
+    def com_demandas(self, lixo, quantidade_lixo):
+
+        grafo = self.grafo.com_lixo(lixo)
+        grafo.congela()
+
+        modelo = ModeloCidade.__new__(ModeloCidade)
+        modelo._inicia(grafo, self.deposito, self.capacidade, quantidade_lixo, self._ordem_clusters,
+                       self._pontos_clusters,
+                       {n_cluster: self._subgrafos_cluster(n_cluster) for n_cluster in self._ordem_clusters},
+                       self._coordenadas, self._nomes_ruas, None, None)
+
+        return modelo
+
+    # Copia o modelo para um bloco de memória compartilhada e retorna o modelo que utiliza esse bloco
+    # Ao ser serializado (por exemplo, ao ser enviado a um processo de um multiprocessing.Pool), o modelo retornado envia
+    # somente o nome do bloco e a posição de cada dado nele, e o processo que o recebe se conecta ao bloco
+    # O bloco deve ser liberado com o método libera quando não for mais utilizado
+    def compartilha(self):
+
+        arrays = {campo: getattr(self.grafo, campo) for campo in GrafoCompilado.ARRAYS}
+
+        dados = pickle.dumps({
+            'ids': self.grafo.ids,
+            'ids_ruas': self.grafo.ids_ruas,
+            'deposito_grafo': self.grafo.deposito,
+            'deposito': self.deposito,
+            'capacidade': self.capacidade,
+            'quantidade_lixo': self.quantidade_lixo,
+            'ordem_clusters': self._ordem_clusters,
+            'pontos_clusters': self._pontos_clusters,
+            'coordenadas': self._coordenadas,
+            'nomes_ruas': self._nomes_ruas
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Os subgrafos de cada número de clusters são serializados separadamente, para que cada processo leia somente
+        # os que utilizar
+        subgrafos = {n_cluster: pickle.dumps(self._subgrafos_cluster(n_cluster), protocol=pickle.HIGHEST_PROTOCOL)
+                     for n_cluster in self._ordem_clusters}
+
+        # Posição de cada dado no bloco
+        descritor = {'arrays': {}, 'subgrafos': {}}
+        tamanho = 0
+
+        for campo, array in arrays.items():
+
+            tamanho = -(-tamanho // ALINHAMENTO) * ALINHAMENTO
+            descritor['arrays'][campo] = (tamanho, array.dtype.str, array.shape)
+            tamanho += array.nbytes
+
+        descritor['dados'] = (tamanho, tamanho + len(dados))
+        tamanho += len(dados)
+
+        for n_cluster, blob in subgrafos.items():
+
+            descritor['subgrafos'][n_cluster] = (tamanho, tamanho + len(blob))
+            tamanho += len(blob)
+
+        memoria = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+
+        descritor['nome'] = memoria.name
+
+        for campo, array in arrays.items():
+
+            inicio, tipo, formato = descritor['arrays'][campo]
+            np.ndarray(formato, dtype=tipo, buffer=memoria.buf, offset=inicio)[...] = array
+
+        memoria.buf[descritor['dados'][0]:descritor['dados'][1]] = dados
+
+        for n_cluster, blob in subgrafos.items():
+
+            inicio, fim = descritor['subgrafos'][n_cluster]
+            memoria.buf[inicio:fim] = blob
+
+        modelo = ModeloCidade._de_memoria(memoria, descritor)
+
+        # Somente o processo que criou o bloco o remove do sistema, mesmo que o modelo seja herdado por um fork
+        object.__setattr__(modelo, '_dono', os.getpid())
+
+        return modelo
+
+    # Conecta-se ao bloco de memória compartilhada descrito e retorna o modelo que o utiliza
+    # O bloco é registrado no rastreador de recursos do multiprocessing, que é compartilhado com os processos criados
+    # por ele, então o processo que se conecta deve ter sido criado pelo multiprocessing
+    @staticmethod
+    def anexa(descritor):
+
+        return ModeloCidade._de_memoria(shared_memory.SharedMemory(name=descritor['nome']), descritor)
+
+    @staticmethod
+    def _de_memoria(memoria, descritor):
+
+        arrays = {}
+
+        for campo, (inicio, tipo, formato) in descritor['arrays'].items():
+
+            arrays[campo] = np.ndarray(formato, dtype=tipo, buffer=memoria.buf, offset=inicio)
+            arrays[campo].flags.writeable = False
+
+        dados = pickle.loads(memoria.buf[descritor['dados'][0]:descritor['dados'][1]])
+
+        grafo = GrafoCompilado.de_arrays(dados['ids'], dados['ids_ruas'], dados['deposito_grafo'], arrays)
+
+        modelo = ModeloCidade.__new__(ModeloCidade)
+        modelo._inicia(grafo, dados['deposito'], dados['capacidade'], dados['quantidade_lixo'], dados['ordem_clusters'],
+                       dados['pontos_clusters'], {}, dados['coordenadas'], dados['nomes_ruas'], memoria, descritor)
+
+        return modelo
+
+    # Desconecta o modelo do bloco de memória compartilhada e, se ele foi criado por este modelo no processo atual,
+    # remove o bloco
+    # O modelo não pode mais ser utilizado depois de liberado
+    def libera(self):
+
+        if self._memoria is None:
+            return
+
+        memoria = self._memoria
+
+        # Os arrays apontam para o bloco e precisam ser descartados antes que ele seja fechado
+        object.__setattr__(self, 'grafo', None)
+        object.__setattr__(self, '_memoria', None)
+
+        try:
+            memoria.close()
+        except BufferError:
+            # Ainda existem referências aos arrays, e o bloco é fechado quando elas forem descartadas
+            pass
+
+        if self._dono == os.getpid():
+            memoria.unlink()
+
+    # Os modelos em memória compartilhada são serializados somente pelo descritor do bloco
+    def __reduce__(self):
+
+        if self._memoria is not None:
+            return ModeloCidade.anexa, (self.descritor,)
+
+        return ModeloCidade._de_estado, (self.__dict__.copy(),)
+
+    @staticmethod
+    def _de_estado(estado):
+
+        modelo = ModeloCidade.__new__(ModeloCidade)
+
+        for atributo, valor in estado.items():
+            object.__setattr__(modelo, atributo, valor)
+
+        modelo.grafo.congela()
+
+        return modelo
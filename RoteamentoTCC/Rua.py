@@ -1,5 +1,9 @@
 # Classe que define uma rua do mapa
 
+# Biblioteca que contém úteis matemáticos
+import numpy as np
+
+
 class Rua:
 
     def __init__(self):
@@ -25,10 +29,34 @@ class Rua:
         # Tamanho total da rua
         self.tamanho_rua = 0
 
+        # Distância acumulada do primeiro ponto da rua até cada um dos seus pontos
+        # Assim a distância entre dois pontos quaisquer da rua é obtida com uma subtração
+        self.distancias_acumuladas = np.zeros(1)
+
+        # Dicionário que associa o id de cada ponto a sua primeira posição na lista de pontos da rua
+        self.posicoes = {}
+
     # Insere um ponto na lista de pontos que formam a rua
     def insere_ponto(self, ponto):
         self.pontos.append(ponto)
 
+    # Monta as distâncias acumuladas e as posições dos pontos, a partir das distâncias entre os pontos consecutivos
+    # Também define o tamanho total da rua
+    def monta_distancias(self, distancias_segmentos):
+
+        self.distancias_acumuladas = np.concatenate(([0.0], np.cumsum(distancias_segmentos)))
+
+        self.posicoes = {}
+
+        for posicao, ponto in enumerate(self.pontos):
+            self.posicoes.setdefault(ponto.id, posicao)
+
+        self.tamanho_rua = float(self.distancias_acumuladas[-1])
+
+    # Retorna a distância percorrida pela rua entre duas posições da lista de pontos
+    def distancia_trecho(self, posicao_inicial, posicao_final):
+        return float(self.distancias_acumuladas[posicao_final] - self.distancias_acumuladas[posicao_inicial])
+
     # Método que exibe os pontos da rua
     # O parâmetro indica se devem ser exibidos pelo id ou pelo label
     def printa_pontos(self, exibir):
@@ -0,0 +1,118 @@
+# Arquivo com o agrupamento (k-means) dos pontos da cidade para todos os números de clusters
+# As coordenadas são montadas uma única vez e projetadas em metros, e cada número de clusters pode partir dos centroides
+# do número anterior, evitando que cada agrupamento seja refeito do zero com várias reinicializações
+
+# Biblioteca que contém úteis matemáticos
+import numpy as np
+# Implementações do k-means
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+# Raio médio da Terra em metros, o mesmo utilizado no cálculo das distâncias
+from RoteamentoTCC.distancia import RAIO_MEDIO_TERRA
+
+# Modos de agrupamento disponíveis
+# 'completo': KMeans, que utiliza todos os pontos em cada iteração
+# 'minibatch': MiniBatchKMeans, que utiliza amostras dos pontos e é indicado para cidades grandes
+MODOS = ('completo', 'minibatch')
+
+# Quantidade de reinicializações do k-means quando ele não parte de centroides anteriores
+N_INICIALIZACOES = 10
+
+# Número máximo de iterações do k-means
+MAX_ITERACOES = 100
+
+# Quantidade de pontos de cada amostra do MiniBatchKMeans
+TAMANHO_LOTE = 4096
+
+
+# Projeta as coordenadas geográficas em coordenadas planas, em metros
+# É utilizada a projeção equiretangular centrada na latitude média dos pontos, que é precisa na escala de uma cidade e
+# faz com que as distâncias usadas pelo k-means sejam as mesmas nos dois eixos
+def coordenadas_metricas(latitudes, longitudes):
+
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+
+    if len(latitudes) == 0:
+        return np.zeros((0, 2))
+
+    latitude_media = latitudes.mean()
+
+    y = RAIO_MEDIO_TERRA * (latitudes - latitude_media)
+    x = RAIO_MEDIO_TERRA * np.cos(latitude_media) * (longitudes - longitudes.mean())
+
+    return np.column_stack((y, x))
+
+
+# Cria a instância do k-means do modo escolhido
+# 'inicio' é a matriz dos centroides iniciais, ou None para utilizar o k-means++ com várias reinicializações
+def _cria_modelo(n_cluster, modo, inicio, semente):
+
+    if modo not in MODOS:
+        raise ValueError(f"Modo de agrupamento desconhecido: {modo}. Modos disponíveis: {MODOS}")
+
+    init = 'k-means++' if inicio is None else inicio
+    n_init = N_INICIALIZACOES if inicio is None else 1
+
+    if modo == 'minibatch':
+        return MiniBatchKMeans(n_cluster, init=init, n_init=n_init, max_iter=MAX_ITERACOES, batch_size=TAMANHO_LOTE,
+                               random_state=semente)
+
+    return KMeans(n_cluster, init=init, n_init=n_init, max_iter=MAX_ITERACOES, random_state=semente)
+
+
+# Agrupa as coordenadas com um número de clusters, retornando o agrupamento de cada ponto e os centroides
+def agrupa(coordenadas, n_cluster, modo='completo', semente=None, inicio=None):
+
+    modelo = _cria_modelo(n_cluster, modo, inicio, semente)
+
+    rotulos = modelo.fit_predict(coordenadas)
+
+    return rotulos, modelo.cluster_centers_
+
+
+# Escolhe o centroide que será acrescentado aos centroides de um agrupamento para formar o próximo
+# Assim como no k-means++, o ponto é sorteado com probabilidade proporcional ao quadrado da distância até o seu centroide
+def _novo_centroide(coordenadas, rotulos, centroides, gerador):
+
+    distancias = np.square(coordenadas - centroides[rotulos]).sum(axis=1)
+    total = distancias.sum()
+
+    # Todos os pontos coincidem com os centroides, qualquer ponto serve
+    if total == 0:
+        return coordenadas[gerador.randint(len(coordenadas))]
+
+    return coordenadas[gerador.choice(len(coordenadas), p=distancias / total)]
+
+
+# Agrupa as coordenadas com cada um dos números de clusters
+# Se 'aquecimento' estiver habilitado, os números de clusters são percorridos em ordem crescente e cada agrupamento parte
+# dos centroides do anterior, acrescidos de um novo centroide. Senão, cada agrupamento é feito de forma independente
+# Retorna um dicionário com o array do agrupamento de cada ponto, para cada número de clusters
+def agrupa_todos(coordenadas, numeros_clusters, modo='completo', semente=None, aquecimento=True):
+
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+
+    gerador = np.random.RandomState(semente)
+
+    agrupamentos = {}
+
+    n_anterior = None
+    rotulos = centroides = None
+
+    for n_cluster in sorted(numeros_clusters):
+
+        # Cada agrupamento recebe a sua semente, sorteada em sequência para que o resultado seja reproduzível
+        semente_cluster = gerador.randint(2 ** 31 - 1)
+
+        inicio = None
+
+        if aquecimento and n_anterior is not None and n_anterior == n_cluster - 1:
+            inicio = np.vstack((centroides, _novo_centroide(coordenadas, rotulos, centroides, gerador)))
+
+        rotulos, centroides = agrupa(coordenadas, n_cluster, modo, semente_cluster, inicio)
+
+        agrupamentos[n_cluster] = rotulos
+        n_anterior = n_cluster
+
+    return agrupamentos
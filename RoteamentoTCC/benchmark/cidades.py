@@ -0,0 +1,111 @@
+# Cidades utilizadas no benchmark: os mapas OSM que acompanham o projeto e cidades sintéticas em forma de grade
+# As grades permitem medir como cada etapa cresce com o tamanho da cidade, sem depender de novos arquivos do OSM
+
+import os
+
+import numpy as np
+
+# Diretório com os arquivos de entrada do projeto
+DIRETORIO_ENTRADA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "entrada")
+
+# Mapas do projeto: nome, arquivo OSM, arquivo de altitudes (None se não existir) e id do depósito
+# Se o depósito não fizer parte do mapa, é escolhido o ponto mais próximo do centro da cidade
+MAPAS = {
+    'teste': ("teste.osm", None, None),
+    'lagoa': ("entrada_lagoa.osm", "alturas_lagoa.osm", '353304393'),
+    'formiga': ("entrada.osm", None, '3627233002'),
+}
+
+# Lados das grades sintéticas utilizadas por padrão
+LADOS_GRADES = (10, 20, 40)
+
+# Distância aproximada entre dois cruzamentos vizinhos da grade, em graus (cerca de 100 metros)
+ESPACAMENTO_GRADE = 0.0009
+
+# Coordenadas do canto da grade, próximas às das cidades reais para que as distâncias sejam comparáveis
+ORIGEM_GRADE = (-20.60, -45.60)
+
+# Primeiros ids utilizados pelos pontos e ruas das grades, distantes dos ids reais do OSM
+ID_INICIAL_PONTOS = 9000000000
+ID_INICIAL_RUAS = 8000000000
+
+
+# Classe que descreve uma cidade do benchmark
+class Cidade:
+
+    def __init__(self, nome, arquivo_osm, arquivo_alturas, deposito):
+
+        self.nome = nome
+
+        self.arquivo_osm = arquivo_osm
+
+        # Arquivo com as altitudes dos pontos, None se a cidade não possuir altitudes
+        self.arquivo_alturas = arquivo_alturas
+
+        # Id do depósito, None para que ele seja escolhido depois da leitura
+        self.deposito = deposito
+
+
+# Retorna a cidade de um dos mapas do projeto
+def mapa(nome):
+
+    arquivo_osm, arquivo_alturas, deposito = MAPAS[nome]
+
+    return Cidade(nome, os.path.join(DIRETORIO_ENTRADA, arquivo_osm),
+                  os.path.join(DIRETORIO_ENTRADA, arquivo_alturas) if arquivo_alturas is not None else None, deposito)
+
+
+# Gera uma cidade em forma de grade com 'lado' x 'lado' cruzamentos, ligados por ruas horizontais e verticais
+# Os arquivos OSM e de altitudes são escritos no diretório passado, e as altitudes formam um relevo suave com ruído
+# gerado a partir da semente, para que a mesma grade seja sempre igual
+def gera_grade(lado, diretorio, semente=0):
+
+    nome = f"grade_{lado}x{lado}"
+
+    arquivo_osm = os.path.join(diretorio, nome + ".osm")
+    arquivo_alturas = os.path.join(diretorio, nome + "_alturas.osm")
+
+    gerador = np.random.RandomState(semente)
+
+    linhas, colunas = np.divmod(np.arange(lado * lado), lado)
+
+    latitudes = ORIGEM_GRADE[0] + linhas * ESPACAMENTO_GRADE
+    longitudes = ORIGEM_GRADE[1] + colunas * ESPACAMENTO_GRADE
+
+    altitudes = (720 + 15 * np.sin(linhas / max(lado, 1) * np.pi) * np.cos(colunas / max(lado, 1) * np.pi)
+                 + gerador.normal(0, 0.5, lado * lado))
+
+    ids = [str(ID_INICIAL_PONTOS + indice) for indice in range(lado * lado)]
+
+    with open(arquivo_osm, "w") as arq:
+
+        arq.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6">\n')
+
+        for id_ponto, latitude, longitude in zip(ids, latitudes.tolist(), longitudes.tolist()):
+            arq.write(f'  <node id="{id_ponto}" lat="{latitude:.7f}" lon="{longitude:.7f}"/>\n')
+
+        # Uma rua para cada linha e para cada coluna da grade
+        for indice in range(2 * lado):
+
+            if indice < lado:
+                pontos_rua = ids[indice * lado:(indice + 1) * lado]
+            else:
+                pontos_rua = ids[indice - lado::lado]
+
+            arq.write(f'  <way id="{ID_INICIAL_RUAS + indice}">\n')
+
+            for id_ponto in pontos_rua:
+                arq.write(f'    <nd ref="{id_ponto}"/>\n')
+
+            arq.write(f'    <tag k="highway" v="residential"/>\n    <tag k="name" v="Rua {indice}"/>\n  </way>\n')
+
+        arq.write('</osm>\n')
+
+    # Mesmo formato do arquivo de altitudes das cidades reais
+    with open(arquivo_alturas, "w") as arq:
+
+        for id_ponto, altitude in zip(ids, altitudes.tolist()):
+            arq.write(f'id = "{id_ponto}" altitude = "{altitude}"\n')
+
+    # O depósito fica no centro da grade
+    return Cidade(nome, arquivo_osm, arquivo_alturas, ids[(lado // 2) * lado + lado // 2])
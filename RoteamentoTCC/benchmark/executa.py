@@ -0,0 +1,412 @@
+# Benchmark das etapas do roteamento
+# Cada cidade passa por todo o processamento, e cada etapa tem o seu tempo medido separadamente
+# Os resultados são gravados em um arquivo JSON, que pode ser comparado com o de outro commit para encontrar regressões
+#
+# Uso (a partir do diretório pai de RoteamentoTCC):
+#   python -m RoteamentoTCC.benchmark.executa
+#   python -m RoteamentoTCC.benchmark.executa --cidades lagoa --grades 10 20 --geracoes 10
+#   python -m RoteamentoTCC.benchmark.executa --compara saida/benchmark/anterior.json
+#   python -m RoteamentoTCC.benchmark.executa --compara anterior.json atual.json
+
+import argparse
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+# As figuras são somente gravadas em arquivo, sem necessidade de uma interface gráfica
+import matplotlib
+matplotlib.use('Agg')
+
+import networkx as nx
+import numpy as np
+
+import RoteamentoTCC.util as util
+import RoteamentoTCC.benchmark.cidades as cidades
+from RoteamentoTCC.nsga.nsga2 import NSGA2
+from RoteamentoTCC.nsga.individual import Individual
+
+# Diretório do projeto, onde os resultados são gravados por padrão
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Versão do formato do arquivo de resultados
+VERSAO_RESULTADOS = 1
+
+# Diretórios de saída que as etapas esperam encontrar
+DIRETORIOS_SAIDA = ("saida/Resultados", "saida/resultados/melhor_ind_geral/rotas", "saida/resultados/melhor_ind_km/rotas",
+                    "saida/resultados/melhor_ind_cam/rotas", "entrada")
+
+
+# Mede o tempo de uma etapa
+# 'prepara' é executada antes de cada repetição, fora da medição, e o seu retorno é passado para 'funcao'
+# Se 'perfil' for informado, as repetições também são perfiladas pelo cProfile e o resultado é gravado nesse arquivo
+def mede(funcao, repeticoes=1, prepara=None, perfil=None):
+
+    tempos = []
+
+    perfilador = cProfile.Profile() if perfil is not None else None
+
+    for _ in range(repeticoes):
+
+        argumentos = (prepara(),) if prepara is not None else ()
+
+        # As mensagens das etapas são descartadas para não poluir a saída do benchmark
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+
+            if perfilador is not None:
+                perfilador.enable()
+
+            inicio = time.perf_counter()
+            retorno = funcao(*argumentos)
+            tempos.append(time.perf_counter() - inicio)
+
+            if perfilador is not None:
+                perfilador.disable()
+
+    if perfilador is not None:
+        perfilador.dump_stats(perfil)
+
+    return tempos, retorno
+
+
+# Retorna os pontos otimizados do maior trecho conexo da cidade
+# Os pontos otimizados são ligados pelas ruas da mesma forma que no grafo otimizado
+def maior_trecho_conexo():
+
+    grafo = nx.Graph()
+    grafo.add_nodes_from(util.pontos_otimizados)
+
+    for rua in util.ruas.values():
+
+        ids_rua = [ponto.id for ponto in rua.pontos if ponto.id in util.pontos_otimizados]
+        grafo.add_edges_from(zip(ids_rua[:-1], ids_rua[1:]))
+
+    return max(nx.connected_components(grafo), key=len)
+
+
+# Escolhe como depósito o ponto otimizado mais próximo do centro da cidade
+def escolhe_deposito():
+
+    candidatos = list(util.pontos_otimizados)
+
+    latitudes = np.array([float(util.pontos_otimizados[id_ponto].latitude) for id_ponto in candidatos])
+    longitudes = np.array([float(util.pontos_otimizados[id_ponto].longitude) for id_ponto in candidatos])
+
+    distancias = (latitudes - latitudes.mean()) ** 2 + (longitudes - longitudes.mean()) ** 2
+
+    return candidatos[int(np.argmin(distancias))]
+
+
+# Executa todas as etapas para uma cidade, retornando um registro para cada etapa medida
+def executa_cidade(cidade, parametros, diretorio_perfis=None):
+
+    registros = []
+
+    def registra(etapa, tempos, **extras):
+
+        registro = {
+            'cidade': cidade.nome,
+            'etapa': etapa,
+            'repeticoes': len(tempos),
+            'tempos': tempos,
+            'minimo': min(tempos),
+            'mediana': statistics.median(tempos),
+            'pontos': len(util.pontos),
+            'pontos_otimizados': len(util.pontos_otimizados)
+        }
+
+        registro.update(extras)
+        registros.append(registro)
+
+        print(f"\t{etapa:<32} {registro['mediana']:10.4f} s")
+
+    def etapa(nome, funcao, repeticoes=1, prepara=None, **extras):
+
+        perfil = os.path.join(diretorio_perfis, f"{cidade.nome}_{nome}.cprof") if diretorio_perfis else None
+
+        tempos, retorno = mede(funcao, repeticoes, prepara, perfil)
+        registra(nome, tempos, **extras)
+
+        return retorno
+
+    print(f"Cidade {cidade.nome}")
+
+    util.limpa_cidade()
+
+    random.seed(parametros['semente'])
+    np.random.seed(parametros['semente'])
+
+    # O arquivo de altitudes é colocado onde o util espera encontrá-lo
+    if cidade.arquivo_alturas is not None:
+        shutil.copyfile(cidade.arquivo_alturas, util.arquivo_alturas())
+    else:
+        open(util.arquivo_alturas(), "w").close()
+
+    etapa('le_arquivo', lambda: util.le_arquivo(cidade.arquivo_osm))
+    etapa('mapeia_ruas', lambda: util.mapeia_ruas("saida/saida.osm"))
+    etapa('monta_grafo', lambda: util.monta_grafo("saida/GrafoCidade.png"))
+    etapa('otimiza_grafo', util.otimiza_grafo)
+
+    # O roteamento exige que a cidade seja conexa, então os trechos isolados de mapas recortados são descartados
+    trecho = maior_trecho_conexo()
+
+    for id_ponto in [id_ponto for id_ponto in util.pontos_otimizados if id_ponto not in trecho]:
+        del util.pontos_otimizados[id_ponto]
+
+    if cidade.deposito is None or cidade.deposito not in util.pontos_otimizados:
+        util.DEPOSITO = escolhe_deposito()
+    else:
+        util.DEPOSITO = cidade.deposito
+
+    etapa('adiciona_alturas', util.adiciona_alturas)
+    etapa('monta_grafo_otimizado',
+          lambda: util.monta_grafo_otimizado(util.pontos_otimizados, "saida/GrafoCidadeOtimizado.png"))
+    etapa('monta_cache_mapas', lambda: util.monta_cache_mapas(parametros['processos']))
+    etapa('calcula_demandas', lambda: util.calcula_demandas("saida/GrafoCidadeDemandas.png"))
+    modelo = etapa('monta_modelo_cidade', util.monta_modelo_cidade)
+
+    nsga = NSGA2(1, parametros['populacao'], 0.4, 0.6, util.MAX_CAMINHOES, 2, util.MAX_CLUSTERS, 1, 0,
+                 city_model=modelo)
+
+    # Genomas sorteados para a avaliação individual, com os pontos de início escolhidos na primeira avaliação
+    genomas = [[random.randint(1, util.MAX_CAMINHOES), random.randint(2, util.MAX_CLUSTERS), []]
+               for _ in range(parametros['repeticoes'])]
+
+    avaliados = iter(genomas)
+
+    def prepara_sem_cache():
+
+        nsga.circuitos.limpa()
+
+        return Individual.avulso(next(avaliados))
+
+    # Sem os circuitos no 'cache', a avaliação inclui o cálculo dos circuitos eulerianos pelo networkx
+    individuos = []
+
+    def avalia(individual):
+
+        individuos.append(individual)
+
+        return nsga.evaluate_individual(individual)
+
+    etapa('evaluate_individual_sem_cache', avalia, parametros['repeticoes'], prepara_sem_cache)
+
+    # Com os circuitos já calculados, como acontece na maior parte das avaliações do NSGA-II
+    reavaliados = iter(individuos)
+
+    def prepara_com_cache():
+
+        individual = next(reavaliados)
+
+        for id_cluster, ponto in enumerate(individual.pontos_inicio):
+            nsga.circuitos.circuito(individual.genome[1], id_cluster, ponto)
+
+        return Individual.avulso([individual.genome[0], individual.genome[1], list(individual.pontos_inicio)])
+
+    etapa('evaluate_individual', nsga.evaluate_individual, parametros['repeticoes'], prepara_com_cache)
+
+    # Ordenação por dominância de uma população completa já avaliada
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+
+        nsga.population.initiate(parametros['populacao'])
+        nsga.evaluate(nsga.population)
+
+    etapa('fast_non_dominated_sort', nsga.fast_non_dominated_sort, parametros['repeticoes'],
+          tamanho_populacao=nsga.population.size)
+
+    # Execução completa do NSGA-II com semente fixa
+    random.seed(parametros['semente'])
+    np.random.seed(parametros['semente'])
+
+    nsga = NSGA2(parametros['geracoes'], parametros['populacao'], 0.4, 0.6, util.MAX_CAMINHOES, 2, util.MAX_CLUSTERS,
+                 1, util.TAMANHO_CACHE_AVALIACAO, util.MODO_NORMALIZACAO, city_model=modelo, hypervolume_plot=None)
+
+    fronteira = etapa('nsga2', nsga.run, geracoes=parametros['geracoes'], populacao=parametros['populacao'])
+
+    # O hypervolume final permite verificar se uma otimização alterou os resultados
+    registros[-1]['hipervolume'] = nsga.hipervolume.ultimo()
+    registros[-1]['tamanho_fronteira'] = fronteira.size
+
+    return registros
+
+
+# Retorna o commit atual do repositório, ou None se ele não puder ser obtido
+def commit_atual():
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=DIRETORIO_PROJETO, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Executa o benchmark em todas as cidades e grava os resultados no arquivo de saída
+def executa(nomes_mapas, lados_grades, parametros, arquivo_saida, diretorio_perfis=None):
+
+    diretorio_original = os.getcwd()
+    diretorio_trabalho = tempfile.mkdtemp(prefix="benchmark_")
+
+    # Os valores globais alterados pelo benchmark são restaurados ao final
+    globais = {nome: getattr(util, nome) for nome in ('DEPOSITO', 'MAX_CLUSTERS', 'MAPA')}
+
+    registros = []
+
+    try:
+
+        os.chdir(diretorio_trabalho)
+
+        for diretorio in DIRETORIOS_SAIDA:
+            os.makedirs(diretorio, exist_ok=True)
+
+        util.MAX_CLUSTERS = parametros['max_clusters']
+
+        lista_cidades = [cidades.mapa(nome) for nome in nomes_mapas]
+        lista_cidades += [cidades.gera_grade(lado, diretorio_trabalho, parametros['semente']) for lado in lados_grades]
+
+        for cidade in lista_cidades:
+            registros.extend(executa_cidade(cidade, parametros, diretorio_perfis))
+
+    finally:
+
+        os.chdir(diretorio_original)
+        shutil.rmtree(diretorio_trabalho, ignore_errors=True)
+
+        for nome, valor in globais.items():
+            setattr(util, nome, valor)
+
+        util.limpa_cidade()
+
+    resultados = {
+        'versao': VERSAO_RESULTADOS,
+        'commit': commit_atual(),
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'networkx': nx.__version__,
+            'plataforma': platform.platform(),
+            'processador': platform.processor(),
+            'nucleos': os.cpu_count()
+        },
+        'parametros': parametros,
+        'resultados': registros
+    }
+
+    diretorio = os.path.dirname(arquivo_saida)
+
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    with open(arquivo_saida, "w") as arq:
+        json.dump(resultados, arq, indent=2)
+
+    print(f"Resultados gravados em {arquivo_saida}")
+
+    return resultados
+
+
+# Compara dois arquivos de resultados, exibindo a razão entre as medianas de cada etapa em cada cidade
+# Razões maiores que 1 indicam que a etapa ficou mais lenta no arquivo atual
+def compara(arquivo_base, arquivo_atual):
+
+    with open(arquivo_base) as arq:
+        base = json.load(arq)
+
+    with open(arquivo_atual) as arq:
+        atual = json.load(arq)
+
+    medianas_base = {(registro['cidade'], registro['etapa']): registro for registro in base['resultados']}
+
+    print(f"Base: {base.get('commit')} ({base.get('data')})")
+    print(f"Atual: {atual.get('commit')} ({atual.get('data')})")
+    print(f"{'cidade':<16} {'etapa':<32} {'base (s)':>10} {'atual (s)':>10} {'razão':>8}")
+
+    razoes = {}
+
+    for registro in atual['resultados']:
+
+        chave = (registro['cidade'], registro['etapa'])
+
+        if chave not in medianas_base:
+            continue
+
+        mediana_base = medianas_base[chave]['mediana']
+        razao = registro['mediana'] / mediana_base if mediana_base > 0 else float('inf')
+
+        razoes[chave] = razao
+
+        print(f"{chave[0]:<16} {chave[1]:<32} {mediana_base:10.4f} {registro['mediana']:10.4f} {razao:8.2f}")
+
+        # Uma mudança no hypervolume indica que os resultados do NSGA-II também mudaram
+        if 'hipervolume' in registro and registro['hipervolume'] != medianas_base[chave].get('hipervolume'):
+            print(f"{'':<16} {'':<32} hypervolume alterado: {medianas_base[chave].get('hipervolume')} -> "
+                  f"{registro['hipervolume']}")
+
+    return razoes
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do roteamento")
+
+    parser.add_argument("--cidades", nargs="*", default=list(cidades.MAPAS), choices=list(cidades.MAPAS),
+                        help="mapas do projeto que serão utilizados")
+    parser.add_argument("--grades", nargs="*", type=int, default=list(cidades.LADOS_GRADES),
+                        help="lados das cidades sintéticas em forma de grade")
+    parser.add_argument("--max-clusters", type=int, default=10, help="número máximo de clusters")
+    parser.add_argument("--populacao", type=int, default=20, help="tamanho da população do NSGA-II")
+    parser.add_argument("--geracoes", type=int, default=5, help="número de gerações do NSGA-II")
+    parser.add_argument("--repeticoes", type=int, default=20,
+                        help="repetições das etapas rápidas (avaliação e ordenação por dominância)")
+    parser.add_argument("--processos", type=int, default=util.PROCESSOS_CACHE,
+                        help="processos utilizados na geração do 'cache' dos mapas (0 utiliza todos os núcleos)")
+    parser.add_argument("--semente", type=int, default=1, help="semente dos geradores aleatórios")
+    parser.add_argument("--saida", help="arquivo JSON dos resultados")
+    parser.add_argument("--perfis", help="diretório onde são gravados os perfis do cProfile de cada etapa")
+    parser.add_argument("--compara", nargs="+", metavar="ARQUIVO",
+                        help="arquivo de resultados base para a comparação; se um segundo arquivo for informado, os "
+                             "dois são comparados sem executar o benchmark")
+
+    argumentos = parser.parse_args()
+
+    if argumentos.compara is not None and len(argumentos.compara) > 1:
+
+        compara(argumentos.compara[0], argumentos.compara[1])
+        return
+
+    commit = commit_atual()
+
+    arquivo_saida = argumentos.saida or os.path.join(
+        DIRETORIO_PROJETO, "saida", "benchmark",
+        f"benchmark_{(commit or 'sem_commit')[:8]}_{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+
+    parametros = {
+        'max_clusters': argumentos.max_clusters,
+        'populacao': argumentos.populacao,
+        'geracoes': argumentos.geracoes,
+        'repeticoes': argumentos.repeticoes,
+        'processos': argumentos.processos,
+        'semente': argumentos.semente
+    }
+
+    diretorio_perfis = os.path.abspath(argumentos.perfis) if argumentos.perfis else None
+
+    if diretorio_perfis is not None:
+        os.makedirs(diretorio_perfis, exist_ok=True)
+
+    executa(argumentos.cidades, argumentos.grades, parametros, os.path.abspath(arquivo_saida), diretorio_perfis)
+
+    if argumentos.compara is not None:
+        compara(argumentos.compara[0], os.path.abspath(arquivo_saida))
+
+
+if __name__ == '__main__':
+    main()
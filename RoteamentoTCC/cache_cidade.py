@@ -0,0 +1,172 @@
+# Arquivo que salva e carrega do disco a cidade já pré-processada
+# Assim o arquivo OSM, as altitudes e o 'cache' dos mapas eulerizados não precisam ser processados a cada execução
+# O arquivo salvo é identificado por um hash do conteúdo das entradas e das constantes utilizadas no pré-processamento,
+# então qualquer alteração nelas faz com que a cidade seja processada novamente
+
+# Biblioteca para a geração do hash das entradas
+import hashlib
+# Biblioteca com comandos úteis do sistema operacional
+import os
+# Biblioteca para a serialização binária dos dados
+import pickle
+# Métodos úteis e dados globais da cidade
+import RoteamentoTCC.util as util
+# Classe que define um ponto no mapa
+from RoteamentoTCC.Ponto import Ponto
+# Classe que define uma rua no mapa
+from RoteamentoTCC.Rua import Rua
+
+# Versão do formato do arquivo, deve ser incrementada sempre que os dados salvos mudarem
+VERSAO_CACHE = 2
+
+# Diretório onde os arquivos são salvos
+DIRETORIO_CACHE = "saida/cache"
+
+
+# Gera a chave que identifica a cidade pré-processada
+# A chave considera o conteúdo dos arquivos de entrada e as constantes que alteram o resultado do pré-processamento
+def gera_chave(arquivo_osm, arquivo_alturas, *extras):
+
+    hash_entradas = hashlib.sha256()
+
+    for arquivo in (arquivo_osm, arquivo_alturas):
+
+        with open(arquivo, "rb") as arq:
+
+            for bloco in iter(lambda: arq.read(1 << 20), b""):
+                hash_entradas.update(bloco)
+
+    constantes = (VERSAO_CACHE, util.MAX_CLUSTERS, util.DEPOSITO, util.MODO_DISTANCIA, util.MODO_AGRUPAMENTO,
+                  util.AQUECIMENTO_AGRUPAMENTO, util.remover,
+                  util.ruas_retirar_manual, util.pontos_retirar_manual, extras)
+
+    hash_entradas.update(repr(constantes).encode())
+
+    return hash_entradas.hexdigest()
+
+
+# Retorna o caminho do arquivo da cidade pré-processada
+def caminho_cache(arquivo_osm, arquivo_alturas, *extras):
+
+    return os.path.join(DIRETORIO_CACHE, f"cidade_{gera_chave(arquivo_osm, arquivo_alturas, *extras)[:16]}.pkl")
+
+
+# Salva a cidade pré-processada que está nos dados globais do módulo util
+def salva(caminho):
+
+    # Os grafos são copiados para que as ruas de suas arestas possam ser trocadas pelos ids
+    grafo_simplificado = util.grafo_cidade_simplificado.copy()
+    util.substitui_ruas_por_ids(grafo_simplificado)
+
+    mapas = {}
+
+    for n_cluster, (pontos_clusterizados, subgrafos) in util.cache_mapas_eulerizados.items():
+
+        # Os agrupamentos são salvos somente como o agrupamento de cada ponto, na ordem de 'pontos_otimizados'
+        rotulos = {ponto.id: id_cluster for id_cluster, cluster in pontos_clusterizados.items() for ponto in cluster}
+        rotulos = [rotulos[id_ponto] for id_ponto in util.pontos_otimizados if id_ponto != util.DEPOSITO]
+
+        subgrafos_salvos = {}
+
+        for id_cluster, grafo_cluster in subgrafos.items():
+
+            grafo_cluster = grafo_cluster.copy()
+            util.substitui_ruas_por_ids(grafo_cluster)
+            subgrafos_salvos[id_cluster] = grafo_cluster
+
+        mapas[n_cluster] = (rotulos, subgrafos_salvos)
+
+    dados = {
+        'versao': VERSAO_CACHE,
+        'pontos': [(ponto.id, ponto.latitude, ponto.longitude, ponto.altitude,
+                    [vizinho.id for vizinho in ponto.pontos_vizinhos]) for ponto in util.pontos.values()],
+        'ruas': [(rua.id, rua.nome, [ponto.id for ponto in rua.pontos], rua.distancias_acumuladas)
+                 for rua in util.ruas.values()],
+        'pontos_otimizados': list(util.pontos_otimizados),
+        'grafo_cidade': util.grafo_cidade,
+        'grafo_cidade_simplificado': grafo_simplificado,
+        'mapas': mapas
+    }
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+    # O arquivo é escrito em um temporário e depois renomeado, para que uma execução interrompida não deixe um arquivo
+    # corrompido para trás
+    with open(caminho + ".tmp", "wb") as arq:
+        pickle.dump(dados, arq, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(caminho + ".tmp", caminho)
+
+    print(f"Cidade pré-processada salva em {caminho}")
+
+
+# Carrega a cidade pré-processada para os dados globais do módulo util
+# Retorna False se o arquivo não existir ou for de uma versão diferente
+def carrega(caminho):
+
+    if not os.path.exists(caminho):
+        return False
+
+    with open(caminho, "rb") as arq:
+        dados = pickle.load(arq)
+
+    if dados.get('versao') != VERSAO_CACHE:
+        return False
+
+    util.pontos.clear()
+
+    for id_ponto, latitude, longitude, altitude, _ in dados['pontos']:
+
+        ponto = Ponto()
+        ponto.id = id_ponto
+        ponto.latitude = latitude
+        ponto.longitude = longitude
+        ponto.altitude = altitude
+
+        util.pontos[id_ponto] = ponto
+
+    # As ligações só são feitas depois que todos os pontos existem
+    for id_ponto, _, _, _, vizinhos in dados['pontos']:
+        util.pontos[id_ponto].pontos_vizinhos = [util.pontos[id_vizinho] for id_vizinho in vizinhos]
+
+    util.ruas.clear()
+
+    for id_rua, nome, ids_pontos, distancias_acumuladas in dados['ruas']:
+
+        rua = Rua()
+        rua.id = id_rua
+        rua.nome = nome
+        rua.pontos = [util.pontos[id_ponto] for id_ponto in ids_pontos]
+
+        # As distâncias acumuladas salvas são convertidas de volta para as distâncias dos segmentos
+        rua.monta_distancias(distancias_acumuladas[1:] - distancias_acumuladas[:-1])
+        rua.distancias_acumuladas = distancias_acumuladas
+
+        util.ruas[id_rua] = rua
+
+    util.pontos_otimizados.clear()
+
+    for id_ponto in dados['pontos_otimizados']:
+        util.pontos_otimizados[id_ponto] = util.pontos[id_ponto]
+
+    # Os grafos globais são atualizados no lugar, pois outros módulos podem já possuir referências a eles
+    util.grafo_cidade.clear()
+    util.grafo_cidade.update(dados['grafo_cidade'])
+
+    util.recupera_ruas(dados['grafo_cidade_simplificado'])
+    util.grafo_cidade_simplificado.clear()
+    util.grafo_cidade_simplificado.update(dados['grafo_cidade_simplificado'])
+
+    util.cache_mapas_eulerizados.clear()
+
+    for n_cluster, (rotulos, subgrafos) in dados['mapas'].items():
+
+        for grafo_cluster in subgrafos.values():
+            util.recupera_ruas(grafo_cluster)
+
+        util.cache_mapas_eulerizados[n_cluster] = [util.agrupa_pontos(rotulos), subgrafos]
+
+    # A árvore de caminhos mínimos do depósito é recalculada, pois é rápida de ser obtida
+    util.monta_arvore_deposito()
+
+    return True
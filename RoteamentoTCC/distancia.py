@@ -0,0 +1,130 @@
+# Arquivo com o cálculo vetorizado de distâncias entre coordenadas geográficas
+# Todas as funções recebem arrays de latitudes e longitudes em graus e retornam as distâncias em metros
+
+# Biblioteca que contém úteis matemáticos
+import numpy as np
+# Biblioteca para cálculos utilizando coordenadas geográficas, usada como referência de precisão
+import geopy.distance
+
+# Raio médio da Terra em metros, utilizado pela fórmula de haversine
+RAIO_MEDIO_TERRA = 6371008.8
+
+# Parâmetros do elipsoide WGS-84, o mesmo utilizado pelo geopy
+SEMI_EIXO_MAIOR = 6378137.0
+ACHATAMENTO = 1 / 298.257223563
+SEMI_EIXO_MENOR = (1 - ACHATAMENTO) * SEMI_EIXO_MAIOR
+
+# Modos de cálculo disponíveis
+# 'haversine': considera a Terra uma esfera, é o mais rápido e possui erro de até 0,5%
+# 'vincenty': considera o elipsoide WGS-84, possui erro submilimétrico em relação ao geopy
+MODOS = ('haversine', 'vincenty')
+
+# Número máximo de iterações da fórmula de Vincenty
+MAX_ITERACOES_VINCENTY = 200
+
+
+# Calcula as distâncias utilizando a fórmula de haversine
+def distancias_haversine(lat1, lon1, lat2, lon2):
+
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * RAIO_MEDIO_TERRA * np.arcsin(np.sqrt(a))
+
+
+# Calcula as distâncias utilizando a fórmula inversa de Vincenty
+# Todos os pares são iterados ao mesmo tempo, até que todos tenham convergido
+def distancias_vincenty(lat1, lon1, lat2, lon2):
+
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    # Latitudes reduzidas
+    u1 = np.arctan((1 - ACHATAMENTO) * np.tan(lat1))
+    u2 = np.arctan((1 - ACHATAMENTO) * np.tan(lat2))
+
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    diferenca_lon = lon2 - lon1
+    lam = diferenca_lon
+
+    for _ in range(MAX_ITERACOES_VINCENTY):
+
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+
+        sin_sigma = np.sqrt((cos_u2 * sin_lam) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam) ** 2)
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+
+        # Pontos coincidentes possuem sin_sigma igual a zero, e a distância entre eles é zero
+        coincidentes = sin_sigma == 0
+        sin_alpha = np.where(coincidentes, 0.0, cos_u1 * cos_u2 * sin_lam / np.where(coincidentes, 1.0, sin_sigma))
+        cos2_alpha = 1 - sin_alpha ** 2
+
+        # Pontos sobre a linha do equador possuem cos2_alpha igual a zero
+        equatoriais = cos2_alpha == 0
+        cos_2sigma_m = np.where(equatoriais, 0.0,
+                                cos_sigma - 2 * sin_u1 * sin_u2 / np.where(equatoriais, 1.0, cos2_alpha))
+
+        c = ACHATAMENTO / 16 * cos2_alpha * (4 + ACHATAMENTO * (4 - 3 * cos2_alpha))
+
+        lam_anterior = lam
+        lam = diferenca_lon + (1 - c) * ACHATAMENTO * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+
+        if np.all(np.abs(lam - lam_anterior) < 1e-12):
+            break
+
+    u_quadrado = cos2_alpha * (SEMI_EIXO_MAIOR ** 2 - SEMI_EIXO_MENOR ** 2) / SEMI_EIXO_MENOR ** 2
+    a = 1 + u_quadrado / 16384 * (4096 + u_quadrado * (-768 + u_quadrado * (320 - 175 * u_quadrado)))
+    b = u_quadrado / 1024 * (256 + u_quadrado * (-128 + u_quadrado * (74 - 47 * u_quadrado)))
+
+    delta_sigma = b * sin_sigma * (cos_2sigma_m + b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)))
+
+    return SEMI_EIXO_MENOR * a * (sigma - delta_sigma)
+
+
+# Calcula as distâncias entre os pares de coordenadas com o modo escolhido
+def calcula_distancias(lat1, lon1, lat2, lon2, modo='vincenty'):
+
+    lat1, lon1, lat2, lon2 = (np.asarray(valor, dtype=np.float64) for valor in (lat1, lon1, lat2, lon2))
+
+    if modo == 'haversine':
+        return distancias_haversine(lat1, lon1, lat2, lon2)
+
+    if modo == 'vincenty':
+        return distancias_vincenty(lat1, lon1, lat2, lon2)
+
+    raise ValueError(f"Modo de cálculo de distância desconhecido: {modo}. Modos disponíveis: {MODOS}")
+
+
+# Calcula as distâncias entre pontos consecutivos de várias linhas de uma só vez
+# 'latitudes' e 'longitudes' são as coordenadas de todas as linhas concatenadas e 'inicios' indica o índice onde cada
+# linha começa
+# Retorna um array com os segmentos de todas as linhas concatenados, cada linha com n - 1 segmentos
+def distancias_consecutivas(latitudes, longitudes, inicios, modo='vincenty'):
+
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    distancias = calcula_distancias(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:], modo)
+
+    # Os segmentos que ligam o último ponto de uma linha ao primeiro da próxima são descartados
+    fronteiras = np.asarray(inicios, dtype=np.int64)
+    fronteiras = fronteiras[(fronteiras > 0) & (fronteiras < len(latitudes))] - 1
+
+    return np.delete(distancias, fronteiras)
+
+
+# Retorna o maior erro absoluto (em metros) do modo escolhido em relação ao geopy
+def erro_geopy(lat1, lon1, lat2, lon2, modo='vincenty'):
+
+    calculadas = calcula_distancias(lat1, lon1, lat2, lon2, modo)
+
+    referencias = np.array([geopy.distance.geodesic((a, b), (c, d)).m
+                            for a, b, c, d in zip(np.ravel(lat1), np.ravel(lon1), np.ravel(lat2), np.ravel(lon2))])
+
+    return float(np.max(np.abs(calculadas - referencias))) if len(referencias) else 0.0
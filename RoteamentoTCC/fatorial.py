@@ -0,0 +1,409 @@
+# Arquivo que executa o projeto fatorial do NSGA-II
+# Cada par (configuração, réplica) é uma execução independente, com a sua própria semente, e as execuções são
+# distribuídas entre vários processos
+# O andamento fica registrado em um banco SQLite, que é atualizado de forma transacional a cada execução iniciada ou
+# concluída. Assim, se o projeto for interrompido, as execuções já concluídas são mantidas e as demais são retomadas (a
+# partir do checkpoint da execução, se houver) na próxima vez que ele for executado
+
+# Biblioteca com comandos úteis do sistema operacional
+import os
+# Biblioteca de números aleatórios, utilizada pelo NSGA-II
+import random
+# Biblioteca para a execução de tarefas em paralelo
+import multiprocessing
+# Conjunto de processos que detecta a morte de um processo filho, em vez de esperar por ele para sempre
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# Banco de dados do andamento do projeto
+import sqlite3
+# Biblioteca para o cálculo das medianas
+import statistics
+# Biblioteca para a medição do tempo das execuções
+import time
+# Biblioteca para o registro dos erros das execuções que falharem
+import traceback
+# Biblioteca para a serialização dos parâmetros das configurações
+import json
+# Biblioteca que contém úteis matemáticos
+import numpy as np
+# Métodos úteis e dados globais da cidade
+import RoteamentoTCC.util as util
+# Classe que define e executa o Non-dominated Sorting Genetic Algorithm II
+from RoteamentoTCC.nsga.nsga2 import NSGA2
+
+# Configurações do projeto fatorial: gerações, tamanho da população, taxa de mutação e taxa de crossover
+# a1, a2 = 300, 400  # Gerações
+# b1, b2 = 100, 150  # Tamanho da população
+# c1, c2 = 0.45, 0.5  # Taxa de mutação
+# d1, d2 = 0.65, 0.7  # Taxa de crossover
+CONFIGURACOES = {"1": [500, 100, 0.4, 0.6]}
+"""CONFIGURACOES = {
+    "1": [a2, b2, c2, d2],
+    "2": [a2, b2, c2, d1],
+    "3": [a2, b2, c1, d2],
+    "4": [a2, b2, c1, d1],
+    "5": [a2, b1, c2, d2],
+    "6": [a2, b1, c2, d1],
+    "7": [a2, b1, c1, d2],
+    "8": [a2, b1, c1, d1],
+    "9": [a1, b2, c2, d2],
+    "10": [a1, b2, c2, d1],
+    "11": [a1, b2, c1, d2],
+    "12": [a1, b2, c1, d1],
+    "13": [a1, b1, c2, d2],
+    "14": [a1, b1, c2, d1],
+    "15": [a1, b1, c1, d2],
+    "16": [a1, b1, c1, d1]
+}"""
+
+# Número de vezes que cada configuração é executada
+REPLICAS = 3
+
+# Semente a partir da qual as sementes de cada execução são geradas
+SEMENTE = 0
+
+# Quantidade máxima de execuções simultâneas, 0 utiliza todos os núcleos disponíveis
+PROCESSOS = 0
+
+# Diretório com o banco do andamento do projeto e os checkpoints, gráficos do hypervolume e resultados das execuções
+DIRETORIO_FATORIAL = "saida/fatorial"
+
+# Intervalo, em gerações, entre os checkpoints de cada execução
+INTERVALO_CHECKPOINT = 25
+
+# Estados possíveis de uma execução
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+FALHOU = 'falhou'
+
+
+# Gera a semente de uma execução, que depende somente da semente do projeto, da configuração e da réplica
+# Assim o resultado de cada execução não depende da ordem nem do processo em que ela é executada
+def semente_execucao(semente, indice_configuracao, replica):
+
+    return int(np.random.SeedSequence([semente, indice_configuracao, replica]).generate_state(1)[0])
+
+
+# Classe que armazena o andamento do projeto fatorial em um banco SQLite
+# Cada processo deve abrir a sua própria conexão
+class ArmazemExecucoes:
+
+    def __init__(self, caminho):
+
+        diretorio = os.path.dirname(caminho)
+
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.caminho = caminho
+
+        # O tempo de espera permite que vários processos atualizem o banco ao mesmo tempo
+        self.conexao = sqlite3.connect(caminho, timeout=60)
+
+        # Cada transação é gravada no disco antes de ser confirmada
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=FULL")
+
+        with self.conexao:
+
+            self.conexao.execute("""CREATE TABLE IF NOT EXISTS configuracoes (
+                                        configuracao TEXT PRIMARY KEY,
+                                        parametros TEXT NOT NULL)""")
+
+            self.conexao.execute("""CREATE TABLE IF NOT EXISTS execucoes (
+                                        configuracao TEXT NOT NULL,
+                                        replica INTEGER NOT NULL,
+                                        ordem INTEGER NOT NULL,
+                                        semente INTEGER NOT NULL,
+                                        estado TEXT NOT NULL,
+                                        hipervolume REAL,
+                                        tempo REAL,
+                                        inicio REAL,
+                                        fim REAL,
+                                        erro TEXT,
+                                        PRIMARY KEY (configuracao, replica))""")
+
+    def fecha(self):
+
+        self.conexao.close()
+
+    # Registra as execuções do projeto que ainda não existem no banco
+    # As execuções são embaralhadas para que as réplicas de uma configuração não sejam executadas uma após a outra
+    def registra_projeto(self, configuracoes, replicas, semente):
+
+        gerador = np.random.RandomState(semente)
+
+        with self.conexao:
+
+            for configuracao, parametros in configuracoes.items():
+
+                registrada = self.conexao.execute("SELECT parametros FROM configuracoes WHERE configuracao = ?",
+                                                  (configuracao,)).fetchone()
+
+                if registrada is None:
+
+                    self.conexao.execute("INSERT INTO configuracoes VALUES (?, ?)",
+                                         (configuracao, json.dumps(parametros)))
+
+                elif json.loads(registrada[0]) != list(parametros):
+
+                    raise ValueError(f"A configuração {configuracao} já foi registrada com outros parâmetros "
+                                     f"({registrada[0]}) em {self.caminho}")
+
+            execucoes = [(configuracao, replica, semente_execucao(semente, indice, replica))
+                         for indice, configuracao in enumerate(configuracoes) for replica in range(replicas)]
+
+            for ordem, posicao in enumerate(gerador.permutation(len(execucoes))):
+
+                configuracao, replica, semente_replica = execucoes[posicao]
+
+                self.conexao.execute("INSERT OR IGNORE INTO execucoes (configuracao, replica, ordem, semente, estado) "
+                                     "VALUES (?, ?, ?, ?, ?)", (configuracao, replica, ordem, semente_replica, PENDENTE))
+
+    # As execuções que estavam em andamento quando o projeto foi interrompido voltam a ficar pendentes
+    # As que falharam também são executadas novamente
+    def recupera_interrompidas(self):
+
+        with self.conexao:
+
+            return self.conexao.execute("UPDATE execucoes SET estado = ?, erro = NULL WHERE estado IN (?, ?)",
+                                        (PENDENTE, EXECUTANDO, FALHOU)).rowcount
+
+    # Retorna as execuções pendentes, na ordem em que devem ser executadas
+    def pendentes(self):
+
+        return self.conexao.execute("""SELECT e.configuracao, e.replica, e.semente, c.parametros
+                                       FROM execucoes e JOIN configuracoes c USING (configuracao)
+                                       WHERE e.estado = ? ORDER BY e.ordem""", (PENDENTE,)).fetchall()
+
+    def inicia(self, configuracao, replica):
+
+        with self.conexao:
+            self.conexao.execute("UPDATE execucoes SET estado = ?, inicio = ? WHERE configuracao = ? AND replica = ?",
+                                 (EXECUTANDO, time.time(), configuracao, replica))
+
+    def conclui(self, configuracao, replica, hipervolume, tempo):
+
+        with self.conexao:
+            self.conexao.execute("UPDATE execucoes SET estado = ?, hipervolume = ?, tempo = ?, fim = ? "
+                                 "WHERE configuracao = ? AND replica = ?",
+                                 (CONCLUIDA, hipervolume, tempo, time.time(), configuracao, replica))
+
+    def falha(self, configuracao, replica, erro):
+
+        with self.conexao:
+            self.conexao.execute("UPDATE execucoes SET estado = ?, erro = ?, fim = ? "
+                                 "WHERE configuracao = ? AND replica = ?",
+                                 (FALHOU, erro, time.time(), configuracao, replica))
+
+    # Retorna a quantidade de execuções em cada estado
+    def andamento(self):
+
+        return dict(self.conexao.execute("SELECT estado, COUNT(*) FROM execucoes GROUP BY estado").fetchall())
+
+    # Retorna, para cada configuração, os parâmetros, a quantidade de execuções concluídas e as medianas do hypervolume
+    # e do tempo de execução delas
+    def medianas(self):
+
+        resultados = {}
+
+        for configuracao, parametros in self.conexao.execute("SELECT configuracao, parametros FROM configuracoes"):
+
+            linhas = self.conexao.execute("SELECT hipervolume, tempo FROM execucoes "
+                                          "WHERE configuracao = ? AND estado = ?", (configuracao, CONCLUIDA)).fetchall()
+
+            if not linhas:
+                continue
+
+            hipervolumes, tempos = zip(*linhas)
+
+            resultados[configuracao] = (json.loads(parametros), len(linhas), statistics.median(hipervolumes),
+                                        statistics.median(tempos))
+
+        return resultados
+
+
+# Caminho do banco do andamento do projeto
+def arquivo_execucoes(diretorio=DIRETORIO_FATORIAL):
+
+    return os.path.join(diretorio, "execucoes.sqlite")
+
+
+# Realiza uma execução do projeto, registrando o seu início e o seu resultado no banco
+# O modelo da cidade é recebido pela tarefa, e nos processos filhos ele utiliza a memória compartilhada pelo processo
+# principal
+def _executa_tarefa(tarefa):
+
+    configuracao, replica, semente, parametros, diretorio, modelo, limites, libera_modelo = tarefa
+
+    armazem = ArmazemExecucoes(arquivo_execucoes(diretorio))
+
+    try:
+
+        armazem.inicia(configuracao, replica)
+
+        geracoes, populacao, mutacao, crossover = parametros
+        max_caminhoes, max_clusters = limites
+
+        checkpoint_file = os.path.join(diretorio, "checkpoints", f"{configuracao}_{replica}.ckpt")
+
+        # Cada réplica possui o seu próprio gráfico, assim execuções simultâneas não escrevem no mesmo arquivo
+        hypervolume_plot = os.path.join(diretorio, "graficos", f"{configuracao}_{replica}_hypervolume.png")
+
+        # Pelo mesmo motivo, as rotas e a evolução das fronteiras são gravadas em um diretório próprio de cada réplica
+        diretorio_resultados = os.path.join(diretorio, f"{configuracao}_{replica}")
+
+        # Cada execução já ocupa um processo, então os indivíduos são avaliados em série
+        if os.path.exists(checkpoint_file):
+
+            nsga = NSGA2.resume(checkpoint_file, 1, checkpoint_interval=INTERVALO_CHECKPOINT, city_model=modelo,
+                                hypervolume_plot=hypervolume_plot, output_directory=diretorio_resultados)
+        else:
+
+            random.seed(semente)
+            np.random.seed(semente)
+
+            nsga = NSGA2(geracoes, populacao, mutacao, crossover, max_caminhoes, 2, max_clusters, 1,
+                         util.TAMANHO_CACHE_AVALIACAO, util.MODO_NORMALIZACAO, checkpoint_file=checkpoint_file,
+                         checkpoint_interval=INTERVALO_CHECKPOINT, city_model=modelo,
+                         hypervolume_plot=hypervolume_plot, output_directory=diretorio_resultados)
+
+        nsga.run()
+
+        armazem.conclui(configuracao, replica, nsga.hipervolume.ultimo(), nsga.runtime)
+
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+
+        return configuracao, replica, CONCLUIDA
+
+    except Exception:
+
+        armazem.falha(configuracao, replica, traceback.format_exc())
+
+        return configuracao, replica, FALHOU
+
+    finally:
+
+        armazem.fecha()
+
+        if libera_modelo:
+            modelo.libera()
+
+
+# Executa todas as execuções pendentes do projeto fatorial
+# A cidade e as demandas já devem ter sido geradas, e o modelo da cidade é montado uma única vez e compartilhado por
+# todas as execuções
+# Se 'processos' não for informado, é utilizado o valor de PROCESSOS
+def executa(configuracoes=None, replicas=REPLICAS, processos=None, diretorio=DIRETORIO_FATORIAL, semente=SEMENTE):
+
+    if configuracoes is None:
+        configuracoes = CONFIGURACOES
+
+    if processos is None:
+        processos = PROCESSOS
+
+    # Monta o 'cache' dos mapas eulerizados, se ele ainda não existir
+    util.monta_cache_mapas()
+
+    armazem = ArmazemExecucoes(arquivo_execucoes(diretorio))
+
+    armazem.registra_projeto(configuracoes, replicas, semente)
+
+    recuperadas = armazem.recupera_interrompidas()
+
+    if recuperadas:
+        print(f"{recuperadas} execuções interrompidas ou com falha serão executadas novamente")
+
+    pendentes = armazem.pendentes()
+
+    armazem.fecha()
+
+    if processos <= 0:
+        processos = os.cpu_count()
+
+    processos = min(processos, len(pendentes))
+
+    print(f"Executando {len(pendentes)} execuções do projeto fatorial em {max(processos, 1)} processo(s)")
+
+    # O modelo é copiado para a memória compartilhada, e cada processo recebe somente a localização dos dados nela
+    modelo = util.monta_modelo_cidade().compartilha()
+
+    tarefas = [(configuracao, replica, semente_replica, json.loads(parametros), diretorio, modelo,
+                (util.MAX_CAMINHOES, util.MAX_CLUSTERS), processos > 1)
+               for configuracao, replica, semente_replica, parametros in pendentes]
+
+    try:
+
+        # Cada processo realiza uma única execução, para que os dados globais de uma não interfiram na seguinte
+        # Processos que realizam uma única execução não podem ser criados por fork, então o forkserver é preferido por
+        # criar os processos a partir de um processo que já carregou os módulos. Como a cidade não é herdada, qualquer
+        # modo de criação dos processos pode ser utilizado, mas o script principal deve estar protegido por
+        # if __name__ == '__main__', como o main.py
+        # Se um processo for morto (por falta de memória, por exemplo), o conjunto de processos é interrompido com
+        # BrokenProcessPool. As execuções que ficaram marcadas como em andamento são executadas novamente na próxima vez
+        # que o projeto for executado
+        if processos > 1:
+
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+
+                contexto = multiprocessing.get_context('forkserver')
+                contexto.set_forkserver_preload([__name__])
+            else:
+
+                contexto = multiprocessing.get_context('spawn')
+
+            with ProcessPoolExecutor(processos, mp_context=contexto, max_tasks_per_child=1) as executor:
+
+                futuros = [executor.submit(_executa_tarefa, tarefa) for tarefa in tarefas]
+
+                resultados = list(_acompanha((futuro.result() for futuro in as_completed(futuros)), len(tarefas)))
+        else:
+
+            resultados = list(_acompanha(map(_executa_tarefa, tarefas), len(tarefas)))
+
+    finally:
+
+        modelo.libera()
+
+    return resultados
+
+
+# Exibe o andamento das execuções conforme elas terminam
+def _acompanha(resultados, total):
+
+    for concluidas, (configuracao, replica, estado) in enumerate(resultados, 1):
+
+        print(f"Configuração {configuracao}, réplica {replica}: {estado} ({concluidas}/{total})")
+
+        yield configuracao, replica, estado
+
+
+# Calcula as medianas do hypervolume e do tempo de execução de cada configuração e grava em um arquivo CSV
+def calcula_medianas(diretorio=DIRETORIO_FATORIAL, arquivo_saida="saida/Resultados/medianas_fatorial.csv"):
+
+    armazem = ArmazemExecucoes(arquivo_execucoes(diretorio))
+
+    medianas = armazem.medianas()
+    andamento = armazem.andamento()
+
+    armazem.fecha()
+
+    diretorio_saida = os.path.dirname(arquivo_saida)
+
+    if diretorio_saida:
+        os.makedirs(diretorio_saida, exist_ok=True)
+
+    with open(arquivo_saida, "w") as arq:
+
+        arq.write("configuracao,geracoes,populacao,mutacao,crossover,execucoes,hypervolume,tempo\n")
+
+        for configuracao, (parametros, execucoes, hipervolume, tempo) in medianas.items():
+
+            arq.write(f"{configuracao},{','.join(str(parametro) for parametro in parametros)},{execucoes},"
+                      f"{hipervolume!r},{tempo!r}\n")
+
+    print(f"Andamento do projeto: {andamento}")
+    print(f"Medianas gravadas em {arquivo_saida}")
+
+    return medianas
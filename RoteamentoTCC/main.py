@@ -8,7 +8,11 @@ Link: https://www.openstreetmap.org/about
 
 """
 
+import os
+
 import RoteamentoTCC.util as util
+import RoteamentoTCC.cache_cidade as cache_cidade
+import RoteamentoTCC.fatorial as fatorial
 
 
 def main():
@@ -16,37 +20,69 @@ def main():
     # Variável que define se o projeto fatorial será executado
     projeto_fatorial = False
 
-    # Leitura de arquivo e geração de arquivo sem tags desnecessárias
-    # Invoca função para leitura do arquivo OSM
-    util.le_arquivo(nome_arquivo)
+    # Variável que define se o arquivo será lido em fluxo, sem gerar e reler o arquivo intermediário
+    leitura_streaming = True
+
+    # Variável que define se a cidade pré-processada será salva e carregada do disco
+    usar_cache_cidade = True
+
+    # Variável que define se o NSGA-II continuará a execução salva no checkpoint (util.ARQUIVO_CHECKPOINT), se existir
+    retomar_execucao = False
+
+    # Arquivo da cidade pré-processada, identificado pelo conteúdo das entradas
+    arquivo_cache = cache_cidade.caminho_cache(nome_arquivo, util.arquivo_alturas(), leitura_streaming)
+
+    if usar_cache_cidade and cache_cidade.carrega(arquivo_cache):
+
+        print(f"Cidade pré-processada carregada de {arquivo_cache}")
+    else:
+
+        if leitura_streaming:
+
+            # Lê o arquivo OSM em uma única passada, já mapeando as ruas e as ligações entre os pontos
+            util.le_arquivo_streaming(nome_arquivo)
+
+            # Plota um mapa dos pontos e das ruas
+            util.plota_mapa("saida/mapa.html")
+        else:
+
+            # Leitura de arquivo e geração de arquivo sem tags desnecessárias
+            # Invoca função para leitura do arquivo OSM
+            util.le_arquivo(nome_arquivo)
 
-    print("Arquivo {} lido com sucesso!".format(nome_arquivo))
+            print("Arquivo {} lido com sucesso!".format(nome_arquivo))
 
-    # Lê o arquivo que contém somente as tags interessantes e plota um mapa dos pontos e das ruas
-    util.mapeia_ruas("saida/saida.osm")
+            # Lê o arquivo que contém somente as tags interessantes e plota um mapa dos pontos e das ruas
+            util.mapeia_ruas("saida/saida.osm")
 
-    print("Mapeamento das ruas realizado com sucesso!")
+        print("Mapeamento das ruas realizado com sucesso!")
 
-    # Monta o grafo com base no mapa da cidade
-    util.monta_grafo("saida/GrafoCidade.png")
+        # Monta o grafo com base no mapa da cidade
+        util.monta_grafo("saida/GrafoCidade.png")
 
-    print("Grafo da cidade gerado com sucesso!")
+        print("Grafo da cidade gerado com sucesso!")
 
-    # Monta o dicionário com os pontos otimizados
-    util.otimiza_grafo()
+        # Monta o dicionário com os pontos otimizados
+        util.otimiza_grafo()
 
-    print("Configurando altitude dos pontos...")
+        print("Configurando altitude dos pontos...")
 
-    # Obtém as alturas dos pontos
-    # util.captura_altitude()
+        # Obtém as alturas dos pontos
+        # util.captura_altitude()
 
-    # Adiciona as altitudes dos pontos
-    util.adiciona_alturas()
+        # Adiciona as altitudes dos pontos
+        util.adiciona_alturas()
 
-    # Monta um grafo otimizado, que contém apenas pontos de maior interesse
-    util.monta_grafo_otimizado(util.pontos_otimizados, "saida/GrafoCidadeOtimizado.png")
+        # Monta um grafo otimizado, que contém apenas pontos de maior interesse
+        util.monta_grafo_otimizado(util.pontos_otimizados, "saida/GrafoCidadeOtimizado.png")
 
-    print("Grafo otimizado da cidade gerado com sucesso!")
+        print("Grafo otimizado da cidade gerado com sucesso!")
+
+        # Monta o 'cache' dos mapas eulerizados
+        util.monta_cache_mapas()
+
+        if usar_cache_cidade:
+            cache_cidade.salva(arquivo_cache)
 
     # Gera as demandas aproximadas das ruas
     util.calcula_demandas("saida/GrafoCidadeDemandas.png")
@@ -58,15 +94,18 @@ def main():
     if projeto_fatorial:
 
         # Realiza os cálculos do projeto fatorial
-        util.projeto_fatorial()
+        fatorial.executa()
 
-        print("Calculando medianas dos arquivos...")
+        print("Calculando medianas das execuções...")
 
-        util.calcula_medianas()
-    else:
+        fatorial.calcula_medianas()
+    elif retomar_execucao and util.ARQUIVO_CHECKPOINT is not None and os.path.exists(util.ARQUIVO_CHECKPOINT):
 
-        # Monta o 'cache' dos mapas eulerizados
-        util.monta_cache_mapas()
+        melhor_front = util.retoma_processamento_rotas(util.ARQUIVO_CHECKPOINT)
+
+        for ind in melhor_front.individuals:
+            print(ind.genome)
+    else:
 
         melhor_front = util.processamento_rotas(150, 120, 0.4, 0.6)
         # melhor_front = util.processamento_rotas(30, 10, 0.4, 0.6)
@@ -0,0 +1,153 @@
+# Pontos de restauração (checkpoints) das execuções do NSGA-II
+# O estado completo da execução é salvo em um arquivo binário a cada N gerações, e a execução pode ser retomada a partir
+# dele produzindo exatamente os mesmos resultados que a execução sem interrupção produziria
+# O estado inclui a população, a população filha já avaliada, as fronteiras guardadas para os resultados, os estados dos
+# geradores aleatórios, o contador de gerações, o histórico de hypervolume, os normalizadores, o 'cache' das avaliações e
+# as demandas de lixo do modelo da cidade, que são sorteadas a cada execução
+
+import gzip
+import os
+import pickle
+import random
+
+import numpy as np
+
+from RoteamentoTCC.nsga.individual import Individual
+from RoteamentoTCC.nsga.population import Population
+
+# Versão do formato do arquivo, deve ser incrementada sempre que os dados salvos mudarem
+VERSAO_CHECKPOINT = 3
+
+# Nível de compressão do arquivo, o menor nível já reduz bastante as rotas salvas e quase não atrasa o salvamento
+NIVEL_COMPRESSAO = 1
+
+
+# Retorna o estado de uma população
+def _estado_populacao(population):
+
+    return {
+        'parametros': (population.max_caminhoes, population.min_clusters, population.max_clusters),
+        'size': population.size,
+        'colunas': {coluna: getattr(population, coluna)[:population.size].copy() for coluna in Population.COLUNAS},
+        'pontos_inicio': [list(pontos) for pontos in population.pontos_inicio],
+        'quilometragem_caminhoes': population.quilometragem_caminhoes,
+        'rotas': population.rotas
+    }
+
+
+# Recria uma população a partir do seu estado
+def _restaura_populacao(estado):
+
+    population = Population(*estado['parametros'])
+
+    population.reserva(estado['size'])
+
+    for coluna, valores in estado['colunas'].items():
+        getattr(population, coluna)[:estado['size']] = valores
+
+    population.pontos_inicio = [list(pontos) for pontos in estado['pontos_inicio']]
+    population.quilometragem_caminhoes = estado['quilometragem_caminhoes']
+    population.rotas = estado['rotas']
+    population.size = estado['size']
+
+    return population
+
+
+# Retorna o modelo da cidade com o qual a execução salva continua: o modelo passado, com as demandas de lixo salvas
+# O modelo deve ser da mesma cidade e com os mesmos agrupamentos da execução salva
+def modelo_da_execucao(modelo, dados):
+
+    if dados['cidade'] != modelo.assinatura():
+        raise ValueError("O ponto de restauração foi gerado para uma cidade diferente da do modelo")
+
+    return modelo.com_demandas(dados['demandas'], dados['quantidade_lixo_cidade'])
+
+
+# Salva o estado da execução
+# proxima_geracao: Índice da geração que será executada depois da restauração
+# offspring_population, best_front, evolucao_fronts: Variáveis locais do laço de gerações do NSGA2.run
+def salva(nsga, caminho, proxima_geracao, offspring_population, best_front, evolucao_fronts, tempo_decorrido):
+
+    dados = {
+        'versao': VERSAO_CHECKPOINT,
+        'cidade': nsga.modelo.assinatura(),
+        'parametros': nsga.parametros,
+        'proxima_geracao': proxima_geracao,
+        'geracao': nsga.geracao,
+        'tempo_decorrido': tempo_decorrido,
+        'id_individuo': Individual.id,
+        'estado_random': random.getstate(),
+        'estado_numpy': np.random.get_state(),
+        'population': _estado_populacao(nsga.population),
+        'offspring_population': _estado_populacao(offspring_population),
+        'best_front': _estado_populacao(best_front) if best_front is not None else None,
+        'evolucao_fronts': [_estado_populacao(front) for front in evolucao_fronts],
+        'hipervolume': nsga.hipervolume.historico[:nsga.hipervolume.tamanho].copy(),
+        'normalizador': (nsga.normalizador.escala, nsga.normalizador.atualizacoes),
+        'normalizador_hipervolume': (nsga.normalizador_hipervolume.escala, nsga.normalizador_hipervolume.atualizacoes),
+        'cache_avaliacoes': nsga.cache_avaliacoes.estado(),
+        'avaliacoes': (nsga.avaliacoes_solicitadas, nsga.avaliacoes_simuladas),
+        'tamanhos_fronteiras': nsga.tamanhos_fronteiras,
+        # As demandas de lixo são sorteadas a cada execução, e as rotas dependem delas
+        'demandas': np.array(nsga.modelo.grafo.lixo),
+        'quantidade_lixo_cidade': nsga.modelo.quantidade_lixo,
+        # Os circuitos rotacionados dependem do primeiro circuito calculado de cada cluster
+        'circuitos_base': dict(nsga.circuitos.base)
+    }
+
+    diretorio = os.path.dirname(caminho)
+
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    # O arquivo é escrito em um temporário e depois renomeado, para que uma interrupção durante a escrita não corrompa o
+    # último ponto de restauração
+    with gzip.open(caminho + ".tmp", "wb", compresslevel=NIVEL_COMPRESSAO) as arq:
+        pickle.dump(dados, arq, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(caminho + ".tmp", caminho)
+
+
+# Lê o arquivo do ponto de restauração
+def le(caminho):
+
+    with gzip.open(caminho, "rb") as arq:
+        dados = pickle.load(arq)
+
+    if dados.get('versao') != VERSAO_CHECKPOINT:
+        raise ValueError(f"O ponto de restauração {caminho} é de uma versão diferente ({dados.get('versao')})")
+
+    return dados
+
+
+# Restaura no NSGA-II o estado salvo
+# O NSGA-II deve ter sido criado com o modelo retornado por modelo_da_execucao
+# Retorna o estado do laço de gerações: próxima geração, população filha, melhor fronteira, evolução das fronteiras e o
+# tempo já decorrido
+def restaura(nsga, dados):
+
+    nsga.circuitos.limpa()
+    nsga.circuitos.base.update(dados['circuitos_base'])
+
+    nsga.population = _restaura_populacao(dados['population'])
+    nsga.geracao = dados['geracao']
+
+    nsga.hipervolume.restaura(dados['hipervolume'])
+
+    nsga.normalizador.escala, nsga.normalizador.atualizacoes = dados['normalizador']
+    nsga.normalizador_hipervolume.escala, nsga.normalizador_hipervolume.atualizacoes = dados['normalizador_hipervolume']
+
+    nsga.cache_avaliacoes.restaura(dados['cache_avaliacoes'])
+
+    nsga.avaliacoes_solicitadas, nsga.avaliacoes_simuladas = dados['avaliacoes']
+    nsga.tamanhos_fronteiras = dados['tamanhos_fronteiras']
+
+    Individual.id = dados['id_individuo']
+
+    random.setstate(dados['estado_random'])
+    np.random.set_state(dados['estado_numpy'])
+
+    best_front = _restaura_populacao(dados['best_front']) if dados['best_front'] is not None else None
+
+    return (dados['proxima_geracao'], _restaura_populacao(dados['offspring_population']), best_front,
+            [_restaura_populacao(front) for front in dados['evolucao_fronts']], dados['tempo_decorrido'])
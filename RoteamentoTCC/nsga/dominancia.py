@@ -0,0 +1,120 @@
+# Funções vetorizadas da ordenação por dominância do NSGA-II
+# Trabalham sobre a matriz de objetivos da população, com uma linha por indivíduo e uma coluna por objetivo
+
+import numpy as np
+
+# Quantidade de linhas da matriz de dominância calculadas de uma só vez, limita a memória usada em populações grandes
+TAMANHO_BLOCO = 512
+
+
+# Monta a matriz de dominância, onde [i, j] é verdadeiro se o indivíduo i domina o indivíduo j
+# Um indivíduo domina outro se não é pior em nenhum objetivo e é melhor em pelo menos um (minimização)
+def matriz_dominancia(objetivos):
+
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    n_individuos = len(objetivos)
+
+    dominancia = np.empty((n_individuos, n_individuos), dtype=bool)
+
+    for inicio in range(0, n_individuos, TAMANHO_BLOCO):
+
+        bloco = objetivos[inicio:inicio + TAMANHO_BLOCO, None, :]
+
+        dominancia[inicio:inicio + TAMANHO_BLOCO] = (np.all(bloco <= objetivos[None, :, :], axis=2)
+                                                     & np.any(bloco < objetivos[None, :, :], axis=2))
+
+    return dominancia
+
+
+# Separa os indivíduos em fronteiras não dominadas
+# Retorna uma lista de arrays com os índices dos indivíduos de cada fronteira, da melhor para a pior
+# A ordem dos indivíduos dentro de cada fronteira é a mesma da ordenação de Deb: a primeira fronteira segue a ordem da
+# população, e um indivíduo das demais entra quando o último dos seus dominantes da fronteira anterior é processado
+def fronteiras_nao_dominadas(objetivos):
+
+    dominancia = matriz_dominancia(objetivos)
+
+    # Quantidade de indivíduos que dominam cada indivíduo
+    contagem_dominacao = dominancia.sum(axis=0)
+
+    fronteiras = []
+    fronteira = np.flatnonzero(contagem_dominacao == 0)
+
+    while len(fronteira) > 0:
+
+        fronteiras.append(fronteira)
+
+        # Indivíduos dominados pela fronteira atual
+        dominados_fronteira = dominancia[fronteira]
+
+        contagem_anterior = contagem_dominacao
+        contagem_dominacao = contagem_dominacao - dominados_fronteira.sum(axis=0)
+
+        # A próxima fronteira é formada pelos indivíduos que deixaram de ser dominados
+        proxima = np.flatnonzero((contagem_dominacao == 0) & (contagem_anterior > 0))
+
+        # Posição, na fronteira atual, do último dominante de cada indivíduo da próxima fronteira
+        posicoes = np.arange(1, len(fronteira) + 1)[:, None]
+        ultimo_dominante = (dominados_fronteira[:, proxima] * posicoes).max(axis=0, initial=0)
+
+        fronteira = proxima[np.lexsort((proxima, ultimo_dominante))]
+
+    return fronteiras
+
+
+# Retorna o rank de cada indivíduo, começando em 1 para a primeira fronteira
+def ranks(objetivos):
+
+    rank = np.zeros(len(objetivos), dtype=np.int64)
+
+    for indice, fronteira in enumerate(fronteiras_nao_dominadas(objetivos)):
+        rank[fronteira] = indice + 1
+
+    return rank
+
+
+# Retorna os índices dos indivíduos na ordem do operador de crowding: menor rank primeiro e, dentro do mesmo rank,
+# maior crowding distance primeiro
+# Indivíduos empatados nos dois critérios mantêm a ordem original
+# Se 'quantidade' for informada, somente os primeiros índices são retornados
+def ordem_crowding(ranks_individuos, distancias_crowding, quantidade=None):
+
+    ranks_individuos = np.asarray(ranks_individuos, dtype=np.float64)
+    distancias_crowding = np.asarray(distancias_crowding, dtype=np.float64)
+
+    # O lexsort é estável e usa a última chave como a principal
+    ordem = np.lexsort((-distancias_crowding, ranks_individuos))
+
+    return ordem if quantidade is None else ordem[:quantidade]
+
+
+# Calcula o crowding distance dos indivíduos de uma fronteira a partir da sua matriz de objetivos
+# Para cada objetivo os indivíduos são ordenados, os extremos recebem infinito e os demais somam a distância entre seus
+# vizinhos, normalizada pela amplitude do objetivo na fronteira
+# As ordenações são encadeadas, cada uma partindo da ordem deixada pela anterior, e essa ordem final também é retornada
+def distancias_crowding(objetivos):
+
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    n_individuos = len(objetivos)
+
+    distancias = np.zeros(n_individuos)
+    ordem = np.arange(n_individuos)
+
+    if n_individuos == 0:
+        return distancias, ordem
+
+    for coluna in range(objetivos.shape[1]):
+
+        ordem = ordem[np.argsort(objetivos[ordem, coluna], kind='stable')]
+        valores = objetivos[ordem, coluna]
+
+        # Evita casos de divisão por 0
+        amplitude = valores[-1] - valores[0]
+        amplitude = amplitude if amplitude != 0 else 1
+
+        distancias[ordem[1:-1]] += (valores[2:] - valores[:-2]) / amplitude
+
+        # O primeiro e último indivíduo recebem infinito como valor no crowding
+        distancias[ordem[[0, -1]]] = np.inf
+
+    return distancias, ordem
@@ -0,0 +1,180 @@
+# Cálculo exato do hypervolume de fronteiras com três objetivos e acompanhamento da sua evolução durante o NSGA-II
+# Todos os objetivos são de minimização, e o hypervolume é o volume dominado pela fronteira e limitado pelo ponto de
+# referência
+
+import bisect
+import os
+
+import numpy as np
+
+# Formatos em que o histórico pode ser gravado
+# 'csv': uma linha de texto por geração
+# 'binario': registros de três float64 (geração, hypervolume, tamanho da fronteira), que podem ser lidos com np.fromfile
+FORMATOS = ('csv', 'binario')
+
+
+# Calcula a área dominada por uma fronteira de dois objetivos
+# 'xs' está em ordem crescente e 'ys' em ordem decrescente, formando uma escada
+def _area_escada(xs, ys, referencia_x, referencia_y):
+
+    if not xs:
+        return 0.0
+
+    larguras = np.diff(np.append(xs, referencia_x))
+
+    return float(np.dot(larguras, referencia_y - np.asarray(ys)))
+
+
+# Calcula o hypervolume exato de um conjunto de pontos com três objetivos
+# Os pontos são percorridos em ordem crescente do terceiro objetivo e, a cada ponto, a escada não dominada dos dois
+# primeiros objetivos é atualizada. O volume é a soma das áreas das escadas multiplicadas pela espessura de cada fatia
+def hipervolume_3d(pontos, referencia):
+
+    pontos = np.asarray(pontos, dtype=np.float64).reshape(-1, 3)
+    referencia = np.asarray(referencia, dtype=np.float64)
+
+    # Somente os pontos que dominam a referência contribuem para o volume
+    pontos = pontos[np.all(pontos < referencia, axis=1)]
+
+    if len(pontos) == 0:
+        return 0.0
+
+    pontos = pontos[np.lexsort((pontos[:, 1], pontos[:, 0], pontos[:, 2]))]
+
+    xs = []
+    ys = []
+
+    area = 0.0
+    volume = 0.0
+
+    for indice, (x, y, z) in enumerate(pontos):
+
+        posicao = bisect.bisect_right(xs, x)
+
+        # O ponto só altera a escada se não for dominado pelo ponto anterior a ele
+        if posicao == 0 or ys[posicao - 1] > y:
+
+            # Remove os pontos da escada que passam a ser dominados pelo novo ponto
+            fim = posicao
+
+            while fim < len(xs) and ys[fim] >= y:
+                fim += 1
+
+            xs[posicao:fim] = [x]
+            ys[posicao:fim] = [y]
+
+            area = _area_escada(xs, ys, referencia[0], referencia[1])
+
+        proximo_z = pontos[indice + 1, 2] if indice + 1 < len(pontos) else referencia[2]
+
+        volume += area * (proximo_z - z)
+
+    return volume
+
+
+# Classe que acompanha o hypervolume da melhor fronteira a cada geração
+class RastreadorHipervolume:
+
+    # referencia: Ponto de referência do hypervolume
+    # arquivo: Caminho do arquivo onde o histórico é gravado a cada geração, None mantém o histórico só em memória
+    # formato: Formato do arquivo, 'csv' ou 'binario'
+    def __init__(self, referencia, arquivo=None, formato='csv'):
+
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato do histórico desconhecido: {formato}. Formatos disponíveis: {FORMATOS}")
+
+        self.referencia = np.asarray(referencia, dtype=np.float64)
+
+        self.arquivo = arquivo
+
+        self.formato = formato
+
+        # Histórico com uma linha por geração: geração, hypervolume e tamanho da fronteira
+        self.historico = np.zeros((0, 3))
+
+        self.tamanho = 0
+
+        if self.arquivo is not None:
+
+            diretorio = os.path.dirname(self.arquivo)
+
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+
+            # O arquivo é recriado a cada execução
+            with open(self.arquivo, "w" if self.formato == 'csv' else "wb") as arq:
+
+                if self.formato == 'csv':
+                    arq.write("geracao,hypervolume,tamanho_fronteira\n")
+
+    # Calcula o hypervolume da fronteira, registra no histórico e retorna o valor
+    def registra(self, geracao, objetivos):
+
+        objetivos = np.asarray(objetivos, dtype=np.float64)
+
+        valor = hipervolume_3d(objetivos, self.referencia)
+
+        # O histórico dobra de capacidade quando fica cheio
+        if self.tamanho == len(self.historico):
+
+            historico = np.zeros((max(2 * len(self.historico), 64), 3))
+            historico[:self.tamanho] = self.historico[:self.tamanho]
+            self.historico = historico
+
+        registro = (geracao, valor, len(objetivos))
+
+        self.historico[self.tamanho] = registro
+        self.tamanho += 1
+
+        if self.arquivo is not None:
+
+            if self.formato == 'csv':
+
+                with open(self.arquivo, "a") as arq:
+                    arq.write(f"{geracao},{valor!r},{len(objetivos)}\n")
+            else:
+
+                with open(self.arquivo, "ab") as arq:
+                    np.asarray(registro, dtype=np.float64).tofile(arq)
+
+        return valor
+
+    # Substitui o histórico pelo passado, regravando o arquivo, utilizado na retomada de uma execução
+    def restaura(self, historico):
+
+        self.historico = np.array(historico, dtype=np.float64).reshape(-1, 3)
+        self.tamanho = len(self.historico)
+
+        if self.arquivo is not None:
+
+            if self.formato == 'csv':
+
+                with open(self.arquivo, "w") as arq:
+
+                    arq.write("geracao,hypervolume,tamanho_fronteira\n")
+
+                    for geracao, valor, tamanho in self.historico.tolist():
+                        arq.write(f"{int(geracao)},{valor!r},{int(tamanho)}\n")
+            else:
+
+                with open(self.arquivo, "wb") as arq:
+                    self.historico.tofile(arq)
+
+    # Retorna os valores de hypervolume registrados, na ordem das gerações
+    def valores(self):
+
+        return self.historico[:self.tamanho, 1].copy()
+
+    # Retorna o último hypervolume registrado
+    def ultimo(self):
+
+        return float(self.historico[self.tamanho - 1, 1]) if self.tamanho else 0.0
+
+    # Lê um histórico gravado em arquivo, retornando a mesma matriz do atributo 'historico'
+    @staticmethod
+    def le_arquivo(arquivo, formato='csv'):
+
+        if formato == 'csv':
+            return np.loadtxt(arquivo, delimiter=",", skiprows=1, ndmin=2)
+
+        return np.fromfile(arquivo, dtype=np.float64).reshape(-1, 3)
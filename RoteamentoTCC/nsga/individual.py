@@ -9,60 +9,161 @@ Este projeto também utiliza dados obtidos pelo projeto Open Street Map
 Link: https://www.openstreetmap.org/about
 """
 
+import numpy as np
 
+
+# Classe que define um indivíduo
+# Os dados do indivíduo ficam armazenados nos arrays da população, e o indivíduo é somente uma visão da sua linha
+# A visão deixa de ser válida se a população for reordenada ou se algum indivíduo for removido dela
 class Individual:
 
+    # Contador utilizado para gerar o nome dos indivíduos
     id = 1
 
-    def __init__(self, genome):
+    __slots__ = ('population', 'indice')
 
-        self.name = "i~" + str(Individual.id)
-        Individual.id += 1
+    def __init__(self, population, indice):
 
-        # Lista que descreve o genoma do indivíduo
-        self.genome = genome
+        # População que armazena os dados do indivíduo
+        self.population = population
 
-        # List of solutions
-        self.solutions = list()
+        # Linha do indivíduo nos arrays da população
+        self.indice = indice
 
-        # Lista de soluções ainda não normalizadas
-        # [0] Quilometragem/tempo do caminhão
-        # [1] Variação de altitude
-        # [2] Número de caminhões
-        self.non_normalized_solutions = list()
+    # Cria um indivíduo fora de uma população, que recebe uma população própria contendo somente ele
+    @staticmethod
+    def avulso(genome):
 
-        # Quantity of individuals which dominate this individual
-        self.domination_count = 0
+        from .population import Population
 
-        # List of individuals that are dominated by this individual
-        self.dominated_by = list()
+        return Population(0, 0, 0).new_individual(genome)
 
-        # Lista com a quilometragem percorrida por cada caminhão
-        self.quilometragem_caminhoes = []
+    def __eq__(self, other):
 
-        self.rank = None
+        return isinstance(other, Individual) and self.population is other.population and self.indice == other.indice
 
-        self.crowding_distance = None
+    def __hash__(self):
 
-        # Quantidade de lixo recolhida pelo indivíduo
-        self.quantidade_lixo = 0
+        return hash((id(self.population), self.indice))
 
-        # Dicionário que armazena a rota realizada por cada caminhão
-        self.rotas = {}
+    @property
+    def name(self):
+        return "i~" + str(self.population.ids[self.indice])
 
-    # Verifica se um indivíduo domina outro
-    def dominates(self, individual):
+    # Tupla que descreve o genoma do indivíduo
+    # [0] Número de caminhões
+    # [1] Número de clusters
+    # [2] Pontos de início de cada cluster
+    # A tupla é montada a partir da linha da população a cada acesso, por isso é imutável: o genoma é alterado
+    # atribuindo um novo genoma ao indivíduo
+    @property
+    def genome(self):
+
+        return (int(self.population.genomes[self.indice, 0]), int(self.population.genomes[self.indice, 1]),
+                self.population.pontos_inicio[self.indice])
+
+    @genome.setter
+    def genome(self, genome):
+
+        self.population.genomes[self.indice] = genome[:2]
+        self.population.pontos_inicio[self.indice] = genome[2]
+
+    # Lista com os pontos de início de cada cluster, que corresponde à posição 2 do genoma
+    @property
+    def pontos_inicio(self):
+        return self.population.pontos_inicio[self.indice]
+
+    @pontos_inicio.setter
+    def pontos_inicio(self, pontos_inicio):
+        self.population.pontos_inicio[self.indice] = pontos_inicio
+
+    # Tuple of solutions
+    # Tupla vazia se o indivíduo ainda não foi avaliado
+    # Assim como o genoma, é uma cópia imutável da linha da população, alterada somente por atribuição
+    @property
+    def solutions(self):
+
+        if not self.population.avaliados[self.indice]:
+            return ()
+
+        return tuple(self.population.solutions[self.indice].tolist())
+
+    @solutions.setter
+    def solutions(self, solutions):
+
+        self.population.avaliados[self.indice] = len(solutions) > 0
+
+        if len(solutions) > 0:
+            self.population.solutions[self.indice] = solutions
+
+    # Tupla de soluções ainda não normalizadas
+    # [0] Quilometragem/tempo do caminhão
+    # [1] Variação de altitude
+    # [2] Número de caminhões
+    @property
+    def non_normalized_solutions(self):
+        return tuple(self.population.non_normalized_solutions[self.indice].tolist())
+
+    @non_normalized_solutions.setter
+    def non_normalized_solutions(self, solutions):
+        self.population.non_normalized_solutions[self.indice] = solutions
+
+    @property
+    def rank(self):
+
+        rank = int(self.population.ranks[self.indice])
+
+        return rank if rank > 0 else None
+
+    @rank.setter
+    def rank(self, rank):
+        self.population.ranks[self.indice] = rank if rank is not None else 0
 
-        first_half = True
-        second_half = False
+    @property
+    def crowding_distance(self):
 
-        # Compara todas as soluções do indivíduo atual com as do indivíduo passado por parâmetro
-        for i, solution in enumerate(self.solutions):
+        distancia = float(self.population.crowding_distances[self.indice])
 
-            first_half = first_half and bool(solution <= individual.solutions[i])
-            second_half = second_half or bool(solution < individual.solutions[i])
+        return None if np.isnan(distancia) else distancia
 
-        return first_half and second_half
+    @crowding_distance.setter
+    def crowding_distance(self, distancia):
+        self.population.crowding_distances[self.indice] = distancia if distancia is not None else np.nan
+
+    # Quantidade de lixo recolhida pelo indivíduo
+    @property
+    def quantidade_lixo(self):
+        return float(self.population.quantidade_lixo[self.indice])
+
+    @quantidade_lixo.setter
+    def quantidade_lixo(self, quantidade_lixo):
+        self.population.quantidade_lixo[self.indice] = quantidade_lixo
+
+    # Lista com a quilometragem percorrida por cada caminhão
+    @property
+    def quilometragem_caminhoes(self):
+        return self.population.quilometragem_caminhoes[self.indice]
+
+    @quilometragem_caminhoes.setter
+    def quilometragem_caminhoes(self, quilometragem):
+        self.population.quilometragem_caminhoes[self.indice] = quilometragem
+
+    # Dicionário que armazena a rota realizada por cada caminhão
+    @property
+    def rotas(self):
+        return self.population.rotas[self.indice]
+
+    @rotas.setter
+    def rotas(self, rotas):
+        self.population.rotas[self.indice] = rotas
+
+    # Verifica se um indivíduo domina outro
+    def dominates(self, individual):
+
+        solucoes = self.population.solutions[self.indice]
+        outras_solucoes = individual.population.solutions[individual.indice]
+
+        return bool(np.all(solucoes <= outras_solucoes) and np.any(solucoes < outras_solucoes))
 
     def __str__(self):
 
@@ -78,20 +179,22 @@ class Individual:
         if not self.genome:
             return "[]"
 
-        return str(self.genome)
+        return str(list(self.genome))
 
     def __str_solutions__(self):
 
-        if not self.solutions:
+        solutions = self.solutions
+
+        if not solutions:
             return "[]"
 
         result = "["
 
-        for i in range(len(self.solutions) - 1):
+        for i in range(len(solutions) - 1):
 
-            result += '%.6f' % (self.solutions[i]) + ", "
+            result += '%.6f' % (solutions[i]) + ", "
 
-        result += '%.6f' % (self.solutions[-1]) + "]"
+        result += '%.6f' % (solutions[-1]) + "]"
 
         return result
 
@@ -102,23 +205,6 @@ class Individual:
 
         return '%.4f' % self.crowding_distance
 
-    def __str_dominated_by__(self):
-
-        if not self.dominated_by:
-            return "[]"
-
-        dominated_by_size = len(self.dominated_by)
-
-        if dominated_by_size > 1:
-            result = "["
-            for i in range(dominated_by_size - 1):
-                result += str(self.dominated_by[i].name) + ", "
-            result += str(self.dominated_by[-1].name) + "]"
-        else:
-            result = "[" + str(self.dominated_by[0].name) + "]"
-
-        return result
-
     # Função que calcula o tempo aproximado de coleta na cidade
     # Cálculo realizado  com base numa velocidade mpedia de 10km/h
     def calcula_tempo_coleta(self):
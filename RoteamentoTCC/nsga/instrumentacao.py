@@ -0,0 +1,247 @@
+# Instrumentação das gerações do NSGA-II
+# Cada fase de uma geração é medida e gera um evento, que é entregue aos observadores ('hooks') registrados no NSGA2
+# Um observador é qualquer objeto com os métodos abaixo (todos opcionais, herdando de Observador):
+#   inicio_execucao(nsga): chamado antes da população inicial ser criada
+#   fase(evento): chamado ao final de cada fase
+#   fim_geracao(evento): chamado ao final de cada geração, com o resumo das fases dela
+#   fim_execucao(nsga): chamado depois da última geração
+
+import json
+import os
+import time
+
+# Biblioteca para a obtenção do pico de memória, disponível somente em sistemas Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Fases de uma geração, na ordem em que são executadas
+FASES = ('uniao', 'ordenacao', 'crowding', 'selecao', 'cruzamento', 'avaliacao')
+
+
+# Retorna o pico de memória residente (RSS) do processo em bytes, ou None se não puder ser obtido
+def pico_memoria():
+
+    if resource is None:
+        return None
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # O Linux informa o valor em kilobytes e o macOS em bytes
+    return pico if os.uname().sysname == 'Darwin' else pico * 1024
+
+
+# Classe base dos observadores, que não fazem nada em nenhum dos eventos
+class Observador:
+
+    def inicio_execucao(self, nsga):
+        pass
+
+    def fase(self, evento):
+        pass
+
+    def fim_geracao(self, evento):
+        pass
+
+    def fim_execucao(self, nsga):
+        pass
+
+
+# Classe que mede as fases das gerações do NSGA-II e entrega os eventos aos observadores
+# Sem observadores, nenhuma medição é feita
+class Instrumentacao:
+
+    def __init__(self, nsga, observadores=None):
+
+        self.nsga = nsga
+
+        self.observadores = list(observadores) if observadores else []
+
+        # Geração atual, 0 corresponde à população inicial
+        self.geracao = 0
+
+        # Eventos das fases da geração atual
+        self.eventos_geracao = []
+
+    @property
+    def ativa(self):
+        return len(self.observadores) > 0
+
+    def inicio_execucao(self):
+
+        for observador in self.observadores:
+            observador.inicio_execucao(self.nsga)
+
+    def fim_execucao(self):
+
+        for observador in self.observadores:
+            observador.fim_execucao(self.nsga)
+
+    def inicia_geracao(self, geracao):
+
+        self.geracao = geracao
+        self.eventos_geracao = []
+
+    # Mede uma fase, executando a função passada e retornando o seu resultado
+    def mede(self, fase, funcao, *argumentos):
+
+        if not self.ativa:
+            return funcao(*argumentos)
+
+        nsga = self.nsga
+
+        simuladas = nsga.avaliacoes_simuladas
+        solicitadas = nsga.avaliacoes_solicitadas
+
+        inicio = time.perf_counter()
+        retorno = funcao(*argumentos)
+        duracao = time.perf_counter() - inicio
+
+        evento = {
+            'geracao': self.geracao,
+            'fase': fase,
+            'duracao': duracao,
+            'avaliacoes': nsga.avaliacoes_solicitadas - solicitadas,
+            'simulacoes': nsga.avaliacoes_simuladas - simuladas,
+            'taxa_acertos_avaliacoes': nsga.cache_avaliacoes.taxa_acertos(),
+            'taxa_acertos_circuitos': nsga.circuitos.taxa_acertos(),
+            'tamanhos_fronteiras': list(nsga.tamanhos_fronteiras),
+            'tamanho_populacao': nsga.population.size,
+            'pico_memoria': pico_memoria()
+        }
+
+        self.eventos_geracao.append(evento)
+
+        for observador in self.observadores:
+            observador.fase(evento)
+
+        return retorno
+
+    # Encerra a geração, entregando o resumo das suas fases
+    def fim_geracao(self):
+
+        if not self.ativa or not self.eventos_geracao:
+            return
+
+        ultimo = self.eventos_geracao[-1]
+
+        # Uma fase pode ser medida mais de uma vez na mesma geração (na geração 0 são avaliadas a população inicial e a
+        # população filha), então as suas durações são somadas
+        duracoes = {}
+
+        for evento_fase in self.eventos_geracao:
+            duracoes[evento_fase['fase']] = duracoes.get(evento_fase['fase'], 0.0) + evento_fase['duracao']
+
+        evento = {
+            'geracao': self.geracao,
+            'duracao': sum(evento_fase['duracao'] for evento_fase in self.eventos_geracao),
+            'duracoes': duracoes,
+            'avaliacoes': sum(evento_fase['avaliacoes'] for evento_fase in self.eventos_geracao),
+            'simulacoes': sum(evento_fase['simulacoes'] for evento_fase in self.eventos_geracao),
+            'taxa_acertos_avaliacoes': ultimo['taxa_acertos_avaliacoes'],
+            'taxa_acertos_circuitos': ultimo['taxa_acertos_circuitos'],
+            'tamanhos_fronteiras': ultimo['tamanhos_fronteiras'],
+            'hipervolume': self.nsga.hipervolume.ultimo(),
+            'pico_memoria': ultimo['pico_memoria']
+        }
+
+        for observador in self.observadores:
+            observador.fim_geracao(evento)
+
+
+# Observador que grava cada evento como uma linha JSON
+# As linhas das fases possuem o campo 'fase', e as de resumo das gerações possuem o campo 'duracoes'
+class RegistradorJsonl(Observador):
+
+    # arquivo: Caminho do arquivo, que é recriado a cada execução
+    # fases: Se False, somente os resumos das gerações são gravados
+    def __init__(self, arquivo, fases=True):
+
+        self.arquivo = arquivo
+
+        self.fases = fases
+
+        self.saida = None
+
+    def inicio_execucao(self, nsga):
+
+        diretorio = os.path.dirname(self.arquivo)
+
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.saida = open(self.arquivo, "w")
+
+    def _escreve(self, evento):
+
+        self.saida.write(json.dumps(evento) + "\n")
+
+    def fase(self, evento):
+
+        if self.fases:
+            self._escreve(evento)
+
+    def fim_geracao(self, evento):
+
+        self._escreve(evento)
+
+        # Cada geração é gravada no disco, para que o arquivo possa ser acompanhado durante a execução
+        self.saida.flush()
+
+    def fim_execucao(self, nsga):
+
+        if self.saida is not None:
+
+            self.saida.close()
+            self.saida = None
+
+
+# Observador que acumula o tempo de cada fase e exibe um resumo
+# Durante a execução exibe uma linha a cada 'intervalo' gerações (0 para não exibir), e ao final exibe o tempo total e
+# a proporção de cada fase
+class ResumoGeracoes(Observador):
+
+    def __init__(self, intervalo=10):
+
+        self.intervalo = intervalo
+
+        self.duracoes = dict.fromkeys(FASES, 0.0)
+
+        self.avaliacoes = 0
+        self.simulacoes = 0
+
+        self.ultimo_evento = None
+
+    def fase(self, evento):
+
+        self.duracoes[evento['fase']] = self.duracoes.get(evento['fase'], 0.0) + evento['duracao']
+
+    def fim_geracao(self, evento):
+
+        self.avaliacoes += evento['avaliacoes']
+        self.simulacoes += evento['simulacoes']
+
+        self.ultimo_evento = evento
+
+        if self.intervalo and evento['geracao'] % self.intervalo == 0:
+
+            fase_dominante = max(evento['duracoes'], key=evento['duracoes'].get)
+
+            print(f"\t   {evento['duracao']:.3f} s (maior fase: {fase_dominante}), {evento['simulacoes']} simulações, "
+                  f"'cache' das avaliações {evento['taxa_acertos_avaliacoes']:.1%}, "
+                  f"fronteira {evento['tamanhos_fronteiras'][0] if evento['tamanhos_fronteiras'] else 0}")
+
+    def fim_execucao(self, nsga):
+
+        total = sum(self.duracoes.values())
+
+        print("Tempo por fase das gerações:")
+
+        for fase, duracao in self.duracoes.items():
+            print(f"\t{fase:<12} {duracao:10.3f} s ({duracao / total if total else 0:.1%})")
+
+        print(f"\tAvaliações: {self.avaliacoes}, simulações: {self.simulacoes}")
+
+        if self.ultimo_evento is not None and self.ultimo_evento['pico_memoria'] is not None:
+            print(f"\tPico de memória: {self.ultimo_evento['pico_memoria'] / 2 ** 20:.1f} MB")
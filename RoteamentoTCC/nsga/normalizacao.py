@@ -0,0 +1,61 @@
+# Classe que normaliza a matriz de objetivos da população
+# Cada objetivo é dividido pelo seu maior valor absoluto, assim como no MaxAbsScaler do sklearn
+
+import numpy as np
+
+# Modos de normalização disponíveis
+# 'geracao': a escala é recalculada a cada avaliação, com os extremos da população atual
+# 'maximo_acumulado': a escala só muda quando aparece um valor maior que todos os já vistos, mantendo o mesmo referencial
+#                     entre as gerações
+MODOS = ('geracao', 'maximo_acumulado')
+
+
+class Normalizador:
+
+    def __init__(self, modo='geracao'):
+
+        if modo not in MODOS:
+            raise ValueError(f"Modo de normalização desconhecido: {modo}. Modos disponíveis: {MODOS}")
+
+        self.modo = modo
+
+        # Maior valor absoluto de cada objetivo, None enquanto o normalizador não for ajustado
+        self.escala = None
+
+        # Quantidade de vezes que a escala foi alterada
+        self.atualizacoes = 0
+
+    # Ajusta a escala com a matriz de objetivos, com uma linha por indivíduo
+    # Retorna True se a escala foi alterada
+    def ajusta(self, objetivos):
+
+        maximos = np.abs(np.asarray(objetivos, dtype=np.float64)).max(axis=0)
+
+        if self.modo == 'maximo_acumulado' and self.escala is not None:
+
+            if np.all(maximos <= self.escala):
+                return False
+
+            maximos = np.maximum(maximos, self.escala)
+
+        if self.escala is not None and np.array_equal(maximos, self.escala):
+            return False
+
+        self.escala = maximos
+        self.atualizacoes += 1
+
+        return True
+
+    # Normaliza toda a matriz de objetivos de uma só vez
+    def transforma(self, objetivos):
+
+        # Objetivos que só possuem zeros não são alterados
+        escala = np.where(self.escala == 0, 1.0, self.escala)
+
+        return np.asarray(objetivos, dtype=np.float64) / escala
+
+    def ajusta_transforma(self, objetivos):
+
+        self.ajusta(objetivos)
+
+        return self.transforma(objetivos)
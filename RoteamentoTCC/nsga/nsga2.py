@@ -9,10 +9,7 @@ Link do GitHub: https://github.com/MateusSoares/Wireless-Access-Point-Optimizati
 Este projeto também utiliza dados obtidos pelo projeto Open Street Map
 Link: https://www.openstreetmap.org/about
 """
-import sys
 import random
-from pygmo import hypervolume
-import networkx as nx
 import matplotlib.pyplot as plt
 import RoteamentoTCC.util as util
 from RoteamentoTCC.Rota import *
@@ -21,11 +18,47 @@ import numpy as np
 # Importando métodos úteis da classe população
 from RoteamentoTCC.nsga.population import Population
 # Importação do normalizador de dados
-from sklearn.preprocessing import MaxAbsScaler
+from RoteamentoTCC.nsga.normalizacao import Normalizador
+# Acompanhamento do hypervolume da melhor fronteira
+from RoteamentoTCC.nsga.hipervolume import RastreadorHipervolume
+# Medição das fases das gerações
+from RoteamentoTCC.nsga.instrumentacao import Instrumentacao
+# Pontos de restauração da execução
+import RoteamentoTCC.nsga.checkpoint as checkpoint
 # Biblioteca para medição de tempo
 import time
 # Biblioteca com comandos úteis do sistema operacional
 import os
+# Biblioteca para a avaliação dos indivíduos em paralelo
+import multiprocessing
+# Classe que define um indivíduo, utilizada pelos processos da avaliação paralela
+from RoteamentoTCC.nsga.individual import Individual
+# 'Cache' das avaliações já realizadas
+from RoteamentoTCC.CacheLRU import CacheLRU
+# Ordenação vetorizada por dominância
+import RoteamentoTCC.nsga.dominancia as dominancia
+# Circuitos eulerianos dos clusters, calculados sobre o modelo da cidade
+from RoteamentoTCC.CircuitosEulerianos import CircuitosEulerianos
+
+# Instância do NSGA-II que é herdada pelos processos da avaliação paralela
+# Como os processos são criados por fork, eles herdam também o modelo da cidade utilizado por ela
+_nsga_processo = None
+
+
+# Avalia um indivíduo dentro de um processo filho
+def _avalia_em_processo(tarefa):
+
+    semente, caminhoes, clusters, ids_inicio = tarefa
+
+    # Cada indivíduo possui sua própria semente, assim o resultado não depende de qual processo o avaliou
+    random.seed(semente)
+
+    individual = Individual.avulso([caminhoes, clusters, ids_inicio])
+
+    solucoes = _nsga_processo.evaluate_individual(individual)
+
+    return (solucoes, individual.genome[2], individual.quilometragem_caminhoes, individual.quantidade_lixo,
+            individual.rotas)
 
 
 # Classe que define o algoritmo NSGA-II
@@ -38,8 +71,37 @@ class NSGA2:
     # crossover_rate: Probabilidade de ocorrer crossover
     # max_caminhoes: Quantidade máxima de caminhões que poderão ser gerados no gene de um indivíduo
     # max_clusters: Quantidade máxima de clusters que poderão ser gerados no gene de um indivíduo
+    # processes: Quantidade de processos utilizados na avaliação dos indivíduos, 1 avalia em série e 0 usa todos os núcleos
+    # cache_size: Quantidade máxima de genomas cujas avaliações são armazenadas, 0 desabilita o 'cache'
+    # normalization: Modo de normalização dos objetivos, 'geracao' ou 'maximo_acumulado'
+    # hypervolume_log: Arquivo onde o hypervolume de cada geração é gravado, None mantém o histórico só em memória
+    # hypervolume_log_format: Formato desse arquivo, 'csv' ou 'binario'
+    # hooks: Observadores que recebem as medições de cada fase das gerações (ver nsga/instrumentacao.py)
+    # checkpoint_file: Arquivo onde o estado da execução é salvo para que ela possa ser retomada, None não salva
+    # checkpoint_interval: Intervalo, em gerações, entre os salvamentos do estado
+    # city_model: Modelo imutável da cidade (ModeloCidade), None monta o modelo a partir dos dados globais do módulo util
+    # hypervolume_plot: Arquivo onde o gráfico do hypervolume é salvo, True usa o arquivo padrão ao lado deste módulo e
+    # None não gera o gráfico
+    # output_directory: Diretório onde são gravados os resultados (rotas dos melhores indivíduos e evolução das
+    # fronteiras)
     def __init__(self, generations, population_size, mutation_rate,
-                 crossover_rate, max_caminhoes, min_clusters, max_clusters):
+                 crossover_rate, max_caminhoes, min_clusters, max_clusters, processes=1, cache_size=4096,
+                 normalization='geracao', hypervolume_log=None, hypervolume_log_format='csv', hooks=None,
+                 checkpoint_file=None, checkpoint_interval=10, city_model=None, hypervolume_plot=True,
+                 output_directory='saida'):
+
+        # Parâmetros da execução, salvos junto com o estado para que ela seja retomada com os mesmos valores
+        self.parametros = {
+            'generations': generations,
+            'population_size': population_size,
+            'mutation_rate': mutation_rate,
+            'crossover_rate': crossover_rate,
+            'max_caminhoes': max_caminhoes,
+            'min_clusters': min_clusters,
+            'max_clusters': max_clusters,
+            'cache_size': cache_size,
+            'normalization': normalization
+        }
 
         self.generations = generations
 
@@ -55,9 +117,13 @@ class NSGA2:
 
         self.max_clusters = max_clusters
 
-        self.front = []
+        # Cidade em que as rotas são calculadas, que não é alterada pela execução
+        self.modelo = city_model if city_model is not None else util.monta_modelo_cidade()
+
+        # Circuitos eulerianos dos clusters já calculados nesta execução
+        self.circuitos = CircuitosEulerianos(self.modelo, util.TAMANHO_CACHE_CIRCUITOS, util.ROTACIONA_CIRCUITOS)
 
-        self.population_file_name = "population_evolution.txt"
+        self.front = []
 
         # Identifica a configuração do arquivo
         config_arquivo = ""
@@ -71,8 +137,16 @@ class NSGA2:
 
         self.runtime = 0
 
-        # self.create_front_file("[1.1, 1.1, 1.1, 1.1]")
-        self.create_front_file("[3, 3, 3]")
+        # Arquivo do gráfico do hypervolume, gerado ao final da execução
+        if hypervolume_plot is True:
+            hypervolume_plot = os.path.realpath(__file__)[:-2] + self.factorial_file_name + "_hypervolume.png"
+
+        self.hypervolume_plot = hypervolume_plot
+
+        self.output_directory = output_directory
+
+        # Calcula o hypervolume da melhor fronteira a cada geração, utilizando o ponto de referência [3, 3, 3]
+        self.hipervolume = RastreadorHipervolume([3, 3, 3], hypervolume_log, hypervolume_log_format)
 
         # Inicializacao da população
         self.population = Population(max_caminhoes, min_clusters, max_clusters)
@@ -80,88 +154,175 @@ class NSGA2:
         # Indica qual geração o algoritmo está executando
         self.geracao = 1
 
+        self.processes = processes if processes > 0 else os.cpu_count()
+
+        # Conjunto de processos da avaliação paralela, criado somente durante a execução
+        self.pool = None
+
+        # Avaliações já realizadas, indexadas pelo genoma canônico do indivíduo
+        # Assim indivíduos repetidos ou que não sofreram mutação não precisam ter suas rotas simuladas novamente
+        self.cache_avaliacoes = CacheLRU(cache_size)
+
+        # Normalizador dos objetivos, compartilhado por todas as gerações
+        self.normalizador = Normalizador(normalization)
+
+        # Normalizador utilizado somente no hypervolume, com o maior valor de cada objetivo entre todas as avaliações
+        # Assim o hypervolume das gerações é calculado no mesmo referencial, independente do modo de normalização
+        self.normalizador_hipervolume = Normalizador('maximo_acumulado')
+
+        # Quantidade de indivíduos avaliados e quantos deles tiveram suas rotas simuladas, sem vir do 'cache'
+        self.avaliacoes_solicitadas = 0
+        self.avaliacoes_simuladas = 0
+
+        # Tamanho de cada fronteira da última ordenação por dominância
+        self.tamanhos_fronteiras = []
+
+        # Observadores que recebem as medições de cada fase das gerações
+        self.instrumentacao = Instrumentacao(self, hooks)
+
+        self.checkpoint_file = checkpoint_file
+
+        self.checkpoint_interval = checkpoint_interval
+
+        # Estado do laço de gerações restaurado de um checkpoint, None para iniciar uma nova execução
+        self.retomada = None
+
+    # Cria um NSGA-II que continua a execução salva no checkpoint
+    # O modelo deve ser da mesma cidade da execução salva (None o monta a partir dos dados globais do módulo util), e a
+    # execução continua com as demandas de lixo salvas. Os parâmetros do algoritmo são os mesmos da execução salva
+    # Os demais parâmetros (processos, arquivos e observadores) podem ser escolhidos novamente
+    @staticmethod
+    def resume(checkpoint_file, processes=1, hypervolume_log=None, hypervolume_log_format='csv', hooks=None,
+               checkpoint_interval=10, city_model=None, hypervolume_plot=True, output_directory='saida'):
+
+        dados = checkpoint.le(checkpoint_file)
+
+        if city_model is None:
+            city_model = util.monta_modelo_cidade()
+
+        nsga = NSGA2(**dados['parametros'], processes=processes, hypervolume_log=hypervolume_log,
+                     hypervolume_log_format=hypervolume_log_format, hooks=hooks, checkpoint_file=checkpoint_file,
+                     checkpoint_interval=checkpoint_interval,
+                     city_model=checkpoint.modelo_da_execucao(city_model, dados), hypervolume_plot=hypervolume_plot,
+                     output_directory=output_directory)
+
+        nsga.retomada = checkpoint.restaura(nsga, dados)
+
+        return nsga
+
     # Método principal que executa o NSGA-II
     def run(self):
 
         start_time = time.time()
 
-        # Criando a população inicial Pt
-        self.population.initiate(self.population_size // 2)
+        instrumentacao = self.instrumentacao
+
+        instrumentacao.inicio_execucao()
+
+        # Cria os processos da avaliação paralela, se ela estiver habilitada
+        self.inicia_processos()
+
+        # Os processos são encerrados e os observadores notificados mesmo que a execução seja interrompida por um erro
+        concluida = False
+
+        try:
+
+            if self.retomada is None:
+
+                # Criando a população inicial Pt
+                self.population.initiate(self.population_size // 2)
 
-        # Avalia os indivíduos gerados na população
-        self.evaluate(self.population)
+                # Avalia os indivíduos gerados na população
+                instrumentacao.mede('avaliacao', self.evaluate, self.population)
 
-        # Armazena as fronteiras selecionadas pela ordenação de dominância
-        self.fast_non_dominated_sort()
+                # Armazena as fronteiras selecionadas pela ordenação de dominância
+                instrumentacao.mede('ordenacao', self.fast_non_dominated_sort)
 
-        # População originada do cruzamento dos indivíduos da primeira metade da população
-        offspring_population = self.usual_crossover()
+                # População originada do cruzamento dos indivíduos da primeira metade da população
+                offspring_population = instrumentacao.mede('cruzamento', self.usual_crossover)
 
-        self.evaluate(offspring_population)
+                instrumentacao.mede('avaliacao', self.evaluate, offspring_population)
 
-        # Variável que irá armazenar a melhor fronteira
-        best_front = None
+                instrumentacao.fim_geracao()
 
-        # Lista para armazenar a evolução da fronteira de Paretto
-        evolucao_fronts = []
+                # Variável que irá armazenar a melhor fronteira
+                best_front = None
 
-        # Passa pelo número de gerações definido
-        for i in range(self.generations):
+                # Lista para armazenar a evolução da fronteira de Paretto
+                evolucao_fronts = []
+
+                primeira_geracao = 0
+                tempo_anterior = 0
+            else:
 
-            print(f"\t-> Geração {i + 1}")
+                # Continua a execução a partir do estado salvo no checkpoint
+                primeira_geracao, offspring_population, best_front, evolucao_fronts, tempo_anterior = self.retomada
 
-            # Realiza a união entre as duas populações
-            # A população agora tem seu tamanho completo
-            self.population.union(offspring_population)
+                self.retomada = None
 
-            # Separa a população em fronteiras, onde cada fronteira tem populações
-            fronts = self.fast_non_dominated_sort()
+                print(f"Execução retomada a partir da geração {primeira_geracao + 1}")
 
-            # Cálculo do crowding distance
-            self.crowding_distance_assignment(fronts)
+            # Passa pelo número de gerações definido
+            for i in range(primeira_geracao, self.generations):
 
-            # Depois de realizadas as operações, é gerada a próxima população, que deve ter tamanho igual a primeira
-            # Essa população é chamada de Pt+1
-            next_population = self.new_population()
+                print(f"\t-> Geração {i + 1}")
 
-            # Obtém indivíduos das fronterias até que a quantidade de indivíduos necessária seja alcançada
-            for front in fronts:
+                instrumentacao.inicia_geracao(i + 1)
 
-                if next_population.size < self.population_size // 2:
+                # Realiza a união entre as duas populações
+                # A população agora tem seu tamanho completo
+                instrumentacao.mede('uniao', self.population.union, offspring_population)
 
-                    # Ordena os indivíduos do front pelo crowding distance
-                    self.sort_by_crowded_comparison(front)
+                # Separa a população em fronteiras, onde cada fronteira tem populações
+                fronts = instrumentacao.mede('ordenacao', self.fast_non_dominated_sort)
 
-                    for ind in front.individuals:
+                # Cálculo do crowding distance
+                instrumentacao.mede('crowding', self.crowding_distance_assignment, fronts)
 
-                        # Insere indivíduos na fronteira até que seu tamanho seja igual a Pt
-                        if next_population.size < self.population_size // 2:
+                # Depois de realizadas as operações, é gerada a próxima população, que deve ter tamanho igual a primeira
+                # Essa população é chamada de Pt+1
+                next_population = instrumentacao.mede('selecao', self.select_next_population, fronts)
 
-                            next_population.insert(ind)
-                        else:
+                # Como as fronteiras são ordenadas pelos melhores indivíduos
+                # A primeira fronteira sempre terá as populações com os melhores indivíduos
+                best_front = fronts[0]
 
-                            break
+                # Obtém a nova população Pt para a continuação do loop
+                self.population = next_population
 
-            # Como as fronteiras são ordenadas pelos melhores indivíduos
-            # A primeira fronteira sempre terá as populações com os melhores indivíduos
-            best_front = fronts[0]
+                # Monta a nova população Qt para a continuação do loop
+                offspring_population = instrumentacao.mede('cruzamento', self.usual_crossover)
+                instrumentacao.mede('avaliacao', self.evaluate, offspring_population)
 
-            # Obtém a nova população Pt para a continuação do loop
-            self.population = next_population
+                # Calcula o hypervolume da melhor fronteira
+                self.hipervolume.registra(i + 1, self.normalizador_hipervolume.transforma(
+                    best_front.non_normalized_solutions[:best_front.size]))
 
-            # Monta a nova população Qt para a continuação do loop
-            offspring_population = self.usual_crossover()
-            self.evaluate(offspring_population)
+                instrumentacao.fim_geracao()
 
-            # Armazena a melhor fronteira para ser calculado o hypervolume
-            self.add_population_to_file(best_front)
+                # Aramazena a evolução dos fronts de 30 em 30 gerações
+                if i % 30 == 0:
 
-            # Aramazena a evolução dos fronts de 30 em 30 gerações
-            if i % 30 == 0:
+                    evolucao_fronts.append(best_front)
 
-                evolucao_fronts.append(best_front)
+                # Salva o estado da execução ao final da geração, depois de todos os sorteios dela
+                if self.checkpoint_file is not None and self.checkpoint_interval > 0 \
+                        and (i + 1) % self.checkpoint_interval == 0:
 
-        self.runtime = time.time() - start_time
+                    checkpoint.salva(self, self.checkpoint_file, i + 1, offspring_population, best_front,
+                                     evolucao_fronts, tempo_anterior + time.time() - start_time)
+
+            concluida = True
+        finally:
+
+            self.encerra_processos(termina=not concluida)
+
+            instrumentacao.fim_execucao()
+
+        self.runtime = tempo_anterior + time.time() - start_time
+
+        print(f"'Cache' das avaliações: {self.cache_avaliacoes}")
+        print(f"'Cache' dos circuitos eulerianos: {self.circuitos}")
 
         self.calculate_hypervolume()
 
@@ -203,6 +364,23 @@ class NSGA2:
 
         return best_front
 
+    # Monta a próxima população com os melhores indivíduos das fronteiras, até que ela tenha o tamanho de Pt
+    def select_next_population(self, fronts):
+
+        next_population = self.new_population()
+
+        for front in fronts:
+
+            vagas = self.population_size // 2 - next_population.size
+
+            if vagas <= 0:
+                break
+
+            # Insere os melhores indivíduos do front pelo operador de crowding até que o tamanho seja igual a Pt
+            next_population.insert_rows(front, self.crowded_truncation(front, vagas))
+
+        return next_population
+
     # Função que avalia um indivíduo de acordo com as métricas propostas
     def evaluate_individual(self, individual):
 
@@ -210,269 +388,282 @@ class NSGA2:
         variacao_altitude = 0
 
         # Inicializa a lista de pontos que o trajeto se iniciará em cada cluster
-        individual.genome[2] = ([-1 for _ in range(individual.genome[1])])
+        # Se o genoma já possuir os pontos de início de todos os clusters, eles são mantidos
+        if len(individual.pontos_inicio) != individual.genome[1]:
+            individual.pontos_inicio = ([-1 for _ in range(individual.genome[1])])
 
         # Lista que representa o tempo gasto pelos caminhoes, a lista inicia com zero
         tempo_caminhoes = [0 for _ in range(individual.genome[0])]
 
-        pontos_clusterizados = util.cache_mapas_eulerizados[individual.genome[1]][0]
+        pontos_clusterizados = self.modelo.clusters(individual.genome[1])
 
         # Indica qual caminhão será analisado
         vez = 0
 
-        # Lista que indica os pontos onde o lixo já foi recolhido
-        recolhido = []
+        # Os pontos da rota são identificados pelos seus índices no grafo compilado
+        grafo = self.modelo.grafo
+
+        # Indica os pontos onde o lixo já foi recolhido
+        recolhido = np.zeros(len(grafo), dtype=bool)
+
+        # Quantidade de lixo recolhida pelo indivíduo
+        lixo_recolhido = individual.quantidade_lixo
 
         # Realiza o processamento de rota para cada um dos clusters
-        for id_cluster, cluster in pontos_clusterizados.items():
+        for id_cluster in self.modelo.ordem_clusters(individual.genome[1]):
+
+            cluster = pontos_clusterizados[id_cluster]
 
             distancia_cluster = 0
-            quantidade_lixo_caminhao = 0
 
             rota_caminhao = Rota()
 
+            ponto_inicio = individual.pontos_inicio[id_cluster]
+
             # Termina a montagem do indivíduo, selecionando os pontos de onde começarão os trajetos nos clusters
-            ponto_inicio = random.choice(cluster)
+            if ponto_inicio == -1:
 
-            individual.genome[2][id_cluster] = ponto_inicio
+                ponto_inicio = random.choice(cluster)
 
-            grafo_cluster = util.cache_mapas_eulerizados[individual.genome[1]][1][id_cluster]
+                individual.pontos_inicio[id_cluster] = ponto_inicio
 
-            # Realiza a rota euleriana pelo grafo
+            # Realiza a rota euleriana pelo grafo, obtida do 'cache' dos circuitos se já tiver sido calculada
             # Começa pelo ponto selecionado para início da rota
-            rota = list(util.nx.eulerian_path(grafo_cluster, source=ponto_inicio.id))
-            rota_caminhao.rota.extend(rota)
+            # A rota é formada pelos índices dos pontos no grafo compilado e pelos pesos das arestas percorridas
+            sequencia, pesos = self.circuitos.circuito(individual.genome[1], id_cluster, ponto_inicio)
+
+            ids_rota = grafo.ids_pontos(sequencia)
+            rota_caminhao.rota.extend(zip(ids_rota[:-1], ids_rota[1:]))
 
-            if len(rota) != 0:
-                # Calcula a ida do caminhão até o cluster
-                dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, util.DEPOSITO, rota[0][0])
+            if len(pesos) != 0:
 
-                rota_caminhao.ida.extend(caminho)
+                # Caminhos de ida do depósito até o cluster e de volta do cluster ao depósito
+                _, caminho = grafo.caminho_do_deposito(int(sequencia[0]))
+
+                rota_caminhao.ida.extend(grafo.ids_pontos(caminho))
                 rota_caminhao.formata_rota_ida()
 
-                # Incrementa a distância
-                distancia_cluster += dist
+                _, caminho = grafo.caminho_do_deposito(int(sequencia[-1]))
 
-            # Percorre a rota, calcula o tempo e verifica o lixo coletado
-            for pnt_coleta in rota:
+                rota_caminhao.volta.extend(grafo.ids_pontos(caminho[::-1]))
+                rota_caminhao.formata_rota_volta()
 
-                # Incrementa a distância percorrida na rua atual
-                distancia_cluster += grafo_cluster[pnt_coleta[0]][pnt_coleta[1]][0]["weight"]
+            # Calcula de uma só vez a distância percorrida (incluindo a ida, a volta e as viagens ao depósito quando o
+            # caminhão enche), o lixo coletado e a variação de altitude do circuito
+            distancia_cluster, lixo_recolhido, variacao_altitude = grafo.custo_circuito(
+                sequencia, pesos, recolhido, self.modelo.capacidade, lixo_recolhido, variacao_altitude)
 
-                # Verifica se esses pontos já não foram visitados por esse indivíduo e coleta
-                if pnt_coleta[0] not in recolhido:
+            # Registra a rota feita pelo veículo para depois ser exibida
+            if vez not in individual.rotas:
 
-                    individual.quantidade_lixo += util.pontos_otimizados[pnt_coleta[0]].quantidade_lixo
+                individual.rotas[vez] = [rota_caminhao]
+            else:
 
-                    # Verifica antes se a capacidade do veículo vai ser ultrapassada ao recolher aquele ponto
-                    if quantidade_lixo_caminhao + util.pontos_otimizados[
-                        pnt_coleta[0]].quantidade_lixo < util.CAPACIDADE_CAMINHAO:
+                individual.rotas[vez].append(rota_caminhao)
 
-                        quantidade_lixo_caminhao += util.pontos_otimizados[pnt_coleta[0]].quantidade_lixo
-                        recolhido.append(pnt_coleta[0])
-                    else:
+            # E incrementa no tempo do caminhão correspondente
+            if vez == len(tempo_caminhoes):
+                vez = 0
 
-                        # Se o caminhão encher, deve voltar ao depósito, depositar o lixo e voltar
-                        # Ida do caminhão ao depósito
-                        dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, pnt_coleta[0],
-                                                                  util.DEPOSITO)
+            # Realiza uma simulação do tempo gasto pelo caminhão para recolher o lixo com base na distância
+            tempo_caminhoes[vez] += distancia_cluster
+            vez += 1
 
-                        distancia_cluster += dist
+        individual.quantidade_lixo = lixo_recolhido
 
-                        # Volta do depósito até o ponto onde foi interrompida a coleta
-                        dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, util.DEPOSITO,
-                                                                  pnt_coleta[0])
+        # Armazena o tempo dos caminhoes(que também representa a quilometragem)
+        individual.quilometragem_caminhoes = tempo_caminhoes
 
-                        distancia_cluster += dist
+        # Retorna a soma de tempo dos caminhões: Métrica de minimização
+        # O valor absoluto da variação de altitude: Métrica de minimização
+        # A quantidade de caminhões: Métrica de minimização
+        return [max(tempo_caminhoes), variacao_altitude, individual.genome[0]]
 
-                        quantidade_lixo_caminhao = 0
+    # Cria os processos que avaliarão os indivíduos em paralelo
+    # Os processos são criados por fork para que herdem o modelo da cidade sem precisar serializá-lo
+    def inicia_processos(self):
 
-                        # Recolhe finalmente o lixo
-                        quantidade_lixo_caminhao += util.pontos_otimizados[pnt_coleta[0]].quantidade_lixo
-                        recolhido.append(pnt_coleta[0])
-                        # break
+        global _nsga_processo
 
-                if pnt_coleta[1] not in recolhido:
+        if self.processes <= 1:
+            return
 
-                    individual.quantidade_lixo += util.pontos_otimizados[pnt_coleta[1]].quantidade_lixo
+        if 'fork' not in multiprocessing.get_all_start_methods():
 
-                    # Verifica antes se a capacidade do veículo vai ser ultrapassada ao recolher aquele ponto
-                    if quantidade_lixo_caminhao + util.pontos_otimizados[
-                        pnt_coleta[1]].quantidade_lixo < util.CAPACIDADE_CAMINHAO:
+            print("Avaliação paralela indisponível neste sistema, os indivíduos serão avaliados em série")
+            return
 
-                        quantidade_lixo_caminhao += util.pontos_otimizados[pnt_coleta[1]].quantidade_lixo
-                        recolhido.append(pnt_coleta[1])
-                    else:
+        _nsga_processo = self
 
-                        # Se o caminhão encher, deve voltar ao depósito, depositar o lixo e voltar
-                        # Ida do caminhão ao depósito
-                        dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, pnt_coleta[1],
-                                                                  util.DEPOSITO)
+        self.pool = multiprocessing.get_context('fork').Pool(self.processes)
 
-                        distancia_cluster += dist
+    # Encerra os processos da avaliação paralela
+    # termina: Se True, os processos são interrompidos sem concluir as avaliações pendentes
+    def encerra_processos(self, termina=False):
 
-                        # Volta do depósito até o ponto onde foi interrompida a coleta
-                        dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, util.DEPOSITO,
-                                                                  pnt_coleta[1])
+        if self.pool is not None:
 
-                        distancia_cluster += dist
+            if termina:
+                self.pool.terminate()
+            else:
+                self.pool.close()
 
-                        quantidade_lixo_caminhao = 0
+            self.pool.join()
+            self.pool = None
 
-                        # Recolhe finalmente o lixo
-                        quantidade_lixo_caminhao += util.pontos_otimizados[pnt_coleta[1]].quantidade_lixo
-                        recolhido.append(pnt_coleta[1])
+    # Avalia em paralelo os indivíduos passados por parâmetro e reatribui os resultados a eles
+    def evaluate_parallel(self, individuals):
 
-                # Incrementa a variação de altitude
-                variacao_altitude += abs(util.pontos_otimizados[pnt_coleta[0]].altitude - util.pontos_otimizados[
-                    pnt_coleta[1]].altitude) / grafo_cluster[pnt_coleta[0]][pnt_coleta[1]][0]["weight"]
+        tarefas = []
 
-            if len(rota) != 0:
-                # Calcula a volta do caminhao ao depósito
-                dist, caminho = nx.single_source_dijkstra(util.grafo_cidade_simplificado, rota[-1][1], util.DEPOSITO)
+        for individual in individuals:
 
-                rota_caminhao.volta.extend(caminho)
-                rota_caminhao.formata_rota_volta()
+            tarefas.append((random.getrandbits(64), individual.genome[0], individual.genome[1],
+                            list(individual.genome[2])))
 
-                # Incrementa a distância
-                distancia_cluster += dist
+        tamanho_lote = max(1, len(tarefas) // (4 * self.processes))
 
-            # Registra a rota feita pelo veículo para depois ser exibida
-            if vez not in individual.rotas:
+        for individual, resultado in zip(individuals, self.pool.map(_avalia_em_processo, tarefas, tamanho_lote)):
 
-                individual.rotas[vez] = [rota_caminhao]
-            else:
+            solucoes, ids_inicio, quilometragem, quantidade_lixo, rotas = resultado
 
-                individual.rotas[vez].append(rota_caminhao)
+            individual.pontos_inicio = ids_inicio
+            individual.non_normalized_solutions = solucoes
+            individual.quilometragem_caminhoes = quilometragem
+            individual.quantidade_lixo += quantidade_lixo
+            individual.rotas = rotas
 
-            # E incrementa no tempo do caminhão correspondente
-            if vez == len(tempo_caminhoes):
-                vez = 0
+    # Retorna a chave que identifica o genoma no 'cache' das avaliações
+    # A chave é formada pela quantidade de caminhões, pela quantidade de clusters e pelos ids dos pontos de início
+    # Retorna None se algum ponto de início ainda não foi sorteado, pois a avaliação ainda não é determinada pelo genoma
+    @staticmethod
+    def chave_genoma(genome):
 
-            # Realiza uma simulação do tempo gasto pelo caminhão para recolher o lixo com base na distância
-            tempo_caminhoes[vez] += distancia_cluster
-            vez += 1
+        if len(genome[2]) != genome[1] or any(ponto == -1 for ponto in genome[2]):
+            return None
 
-        # Armazena o tempo dos caminhoes(que também representa a quilometragem)
-        individual.quilometragem_caminhoes = tempo_caminhoes
+        return genome[0], genome[1], tuple(genome[2])
 
-        # Retorna a soma de tempo dos caminhões: Métrica de minimização
-        # O valor absoluto da variação de altitude: Métrica de minimização
-        # A quantidade de caminhões: Métrica de minimização
-        return [max(tempo_caminhoes), variacao_altitude, individual.genome[0]]
+    # Atribui a um indivíduo uma avaliação armazenada no 'cache'
+    # As rotas são compartilhadas entre os indivíduos, pois não são alteradas depois de geradas
+    @staticmethod
+    def aplica_avaliacao(individual, avaliacao):
+
+        solucoes, quilometragem, quantidade_lixo, rotas = avaliacao
+
+        individual.non_normalized_solutions = list(solucoes)
+        individual.quilometragem_caminhoes = list(quilometragem)
+        individual.quantidade_lixo = quantidade_lixo
+        individual.rotas = rotas
 
     # Função que avalia os indivíduos gerados na população
     def evaluate(self, population):
 
-        # Para a normalização os dados precisam estar no formato de uma matriz
-        matrix_normalizar = []
+        # Indivíduos que ainda não foram avaliados
+        nao_avaliados = population.nao_avaliados()
 
-        # Iterando sobre todos os indivíduos gerados na população
-        for individual in population.individuals:
+        # Indivíduos que precisam ter suas rotas simuladas
+        pendentes = []
 
-            # Verifica se o indivíduo já foi avaliado antes
-            if not individual.solutions:
+        # Indivíduos com o mesmo genoma de um indivíduo pendente, que recebem a avaliação dele
+        repetidos = []
+        chaves_pendentes = set()
 
-                # Avalia e retorna as soluções não normalizadas
-                individual.non_normalized_solutions = self.evaluate_individual(individual)
+        for individual in nao_avaliados:
 
-            matrix_normalizar.append([individual.non_normalized_solutions[0],
-                                      individual.non_normalized_solutions[1],
-                                      individual.non_normalized_solutions[2]])
+            chave = self.chave_genoma(individual.genome)
 
-        # Instancia o escalar para fazer a normalização MIN/MAX dos dados
-        escalar = MaxAbsScaler()
+            if chave is not None and chave in chaves_pendentes:
 
-        escalar.fit(matrix_normalizar)
+                repetidos.append((individual, chave))
+                continue
 
-        # Percorre os indivíduos
-        for individual in population.individuals:
-            # Realiza a normalização dos dados do indivíduo em questão
-            # normalizado = escalar.transform(matrix_normalizar)
-            normalizado = escalar.transform([individual.non_normalized_solutions])
+            avaliacao = self.cache_avaliacoes.obtem(chave) if chave is not None else None
 
-            # Insere o resultado nas soluções normalizadas do indivíduo
-            individual.solutions = [normalizado[0][0], normalizado[0][1], normalizado[0][2]]
+            if avaliacao is not None:
 
-        self.geracao += 1
+                self.aplica_avaliacao(individual, avaliacao)
+            else:
 
-    # Retorna uma nova população vazia
-    def new_population(self):
+                pendentes.append(individual)
 
-        return Population(self.max_caminhoes, self.min_clusters, self.max_clusters)
+                if chave is not None:
+                    chaves_pendentes.add(chave)
 
-    # Ordena os indivíduos de acordo com suas dominâncias e os ordena em fronteiras
-    def fast_non_dominated_sort(self):
+        self.avaliacoes_solicitadas += len(nao_avaliados)
+        self.avaliacoes_simuladas += len(pendentes)
 
-        # Inicializa os indicadores de dominância de cada indivíduo
-        self.population.reset_fronts()
+        if self.pool is not None:
 
-        # Inicializando a lista de fronteiras e a primeira fronteira, que corresponde a primeira população
-        fronts = list()
-        fronts.append(self.new_population())
+            self.evaluate_parallel(pendentes)
+        else:
 
-        # Verificação de dominância entre todos os indivíduos
-        for i in range(self.population.size):
+            for individual in pendentes:
 
-            # Obtém o indivíduo atual que será comparado aos demais
-            individuo_atual = self.population.individuals[i]
+                # Avalia e retorna as soluções não normalizadas
+                individual.non_normalized_solutions = self.evaluate_individual(individual)
 
-            # Outro loop para passar por todos os indivíduos
-            for j in range(self.population.size):
+        # Armazena as avaliações realizadas, agora que todos os pontos de início estão definidos
+        avaliacoes_lote = {}
 
-                # Obtém os indivíduos que serão comparados
-                outro_individuo = self.population.individuals[j]
+        for individual in pendentes:
 
-                # Verificação para que o indivíduo não compare a si mesmo
-                if i != j:
+            chave = self.chave_genoma(individual.genome)
+            avaliacao = (individual.non_normalized_solutions, individual.quilometragem_caminhoes,
+                         individual.quantidade_lixo, individual.rotas)
 
-                    # Verifica se domina ou é dominado pelos outros indivíduos
-                    if individuo_atual.dominates(outro_individuo):
+            avaliacoes_lote[chave] = avaliacao
+            self.cache_avaliacoes.insere(chave, avaliacao)
 
-                        # Se ele domina, o outro indivíduo é inserido na lista de indivíduos dominados por ele
-                        individuo_atual.dominated_by.append(outro_individuo)
-                    elif outro_individuo.dominates(individuo_atual):
+        for individual, chave in repetidos:
 
-                        # Senão, a contagem de indivíduos que o dominam é incrementada
-                        individuo_atual.domination_count += 1
+            self.cache_avaliacoes.registra_acerto()
+            self.aplica_avaliacao(individual, avaliacoes_lote[chave])
 
-            # Checa se o indivíduo atual é bom o suficiente para entrar na primeira fronteira
-            # Na primeira fronteira estão os indivíduos que não são dominados por ninguém
-            if individuo_atual.domination_count == 0:
+        # As soluções não normalizadas de todos os indivíduos gerados na população já estão em uma matriz
+        matrix_normalizar = population.non_normalized_solutions[:population.size]
 
-                if individuo_atual not in fronts[0].individuals:
-                    individuo_atual.rank = 1
+        # Realiza a normalização de todos os indivíduos de uma só vez
+        escala_alterada = self.normalizador.ajusta(matrix_normalizar)
+        self.normalizador_hipervolume.ajusta(matrix_normalizar)
 
-                    fronts[0].insert(individuo_atual)
+        population.solutions[:population.size] = self.normalizador.transforma(matrix_normalizar)
+        population.avaliados[:population.size] = True
 
-        i = 0
+        # No modo 'maximo_acumulado' todas as soluções devem estar no mesmo referencial, então quando a escala muda a
+        # população Pt, que será unida a esta, também é normalizada novamente
+        if escala_alterada and self.normalizador.modo == 'maximo_acumulado' and population is not self.population:
 
-        # Loop que vai preenchendo as fronteiras com os indivíduos
-        # Quando todos os indivíduos forem distribuídos, a última fronteira terá 0 indivíduos, e então o loop para
-        while len(fronts[i].individuals) > 0:
+            self.population.solutions[:self.population.size] = self.normalizador.transforma(
+                self.population.non_normalized_solutions[:self.population.size])
+
+        self.geracao += 1
+
+    # Retorna uma nova população vazia
+    def new_population(self):
+
+        return Population(self.max_caminhoes, self.min_clusters, self.max_clusters)
+
+    # Ordena os indivíduos de acordo com suas dominâncias e os ordena em fronteiras
+    def fast_non_dominated_sort(self):
 
-            # Com a primeira fronteira montada, agora os indivíduos devem ser distribuídos nas demais
-            fronts.append(self.new_population())
+        # Inicializa os indicadores de dominância de cada indivíduo
+        self.population.reset_fronts()
 
-            for individual in fronts[i].individuals:
+        # A dominância entre todos os indivíduos é verificada de uma só vez sobre a matriz de objetivos
+        objetivos = self.population.solutions[:self.population.size]
+
+        fronts = list()
 
-                # Para cada indivíduo que é dominado por um membro da fronteira acima da atual
-                for dominated_individual in individual.dominated_by:
+        # Loop que vai preenchendo as fronteiras com os indivíduos
+        for i, indices_fronteira in enumerate(dominancia.fronteiras_nao_dominadas(objetivos)):
 
-                    # O seu rank é diminuído em 1
-                    dominated_individual.domination_count -= 1
+            # O rank começa em 1 para a primeira fronteira
+            self.population.ranks[indices_fronteira] = i + 1
 
-                    # Se seu rank - 1 for igual a zero, significa que ele não é dominado por mais ninguém
-                    if dominated_individual.domination_count == 0:
-                        # Então o seu rank é reestabelicido e ele é adicionado na fronteira
-                        # "+1" becasue "i" is index value, and rank starts from 1 and not 0
-                        # "+1" because the rank it's for the next front
-                        dominated_individual.rank = i + 2
-                        fronts[len(fronts) - 1].insert(dominated_individual)
-            i += 1
+            fronts.append(self.population.subset(indices_fronteira))
 
-        # Retira a última fronteira que está vazia, devido ao loop acima
-        del fronts[len(fronts) - 1]
+        self.tamanhos_fronteiras = [front.size for front in fronts]
 
         # Retorna todas as fronteiras com seus respectivos indivíduos
         return fronts
@@ -483,66 +674,34 @@ class NSGA2:
         # Percorre as populações presentes nas fronteiras
         for population in fronts:
 
-            last_individual_index = len(population.individuals) - 1
-
-            # Reseta o valor da crowding distance dos indivíduos
-            for individual in population.individuals:
-                individual.crowding_distance = 0
-
-            # Percorre as soluções do indivíduo
-            for solution_index in range(len(population.individuals[0].solutions)):
-
-                # Ordenando a população de acordo com a solução de cada um
-                population.individuals.sort(key=lambda x: x.solutions[solution_index])
-
-                # O primeiro e último indivíduo da população atual recebem infinito como valor no crowding
-                population.individuals[0].crowding_distance = sys.maxsize
-                population.individuals[last_individual_index].crowding_distance = sys.maxsize
+            distancias, ordem = dominancia.distancias_crowding(population.solutions[:population.size])
 
-                min_value, max_value = population.get_extreme_neighbours(solution_index)
+            population.crowding_distances[:population.size] = distancias
 
-                # Calcula o crowding distance de cada solução para todos os indivíduos
-                for i in range(1, last_individual_index):
-
-                    right_neighbour_value = population.individuals[i + 1].solutions[solution_index]
-                    left_neighbour_value = population.individuals[i - 1].solutions[solution_index]
-
-                    # Evita casos de divisão por 0
-                    if (max_value - min_value) == 0:
-
-                        population.individuals[i].crowding_distance += (
-                                (right_neighbour_value - left_neighbour_value) / 1)
-                    else:
-
-                        population.individuals[i].crowding_distance += (
-                                (right_neighbour_value - left_neighbour_value) / (max_value - min_value))
+            # Os indivíduos ficam ordenados pelo último objetivo, como ficavam com a ordenação feita a cada objetivo
+            population.reorder(ordem)
 
     # Retorna o melhor indivíduo de acordo com o operador de crowding
     def crowded_comparison(self, individual_A, individual_B):
 
         if ((individual_A.rank < individual_B.rank)
-                or ((individual_A == individual_B)
+                or ((individual_A.rank == individual_B.rank)
                     and (individual_A.crowding_distance > individual_B.crowding_distance))):
             return individual_A
         return individual_B
 
-    # Ordena a população de acordo com o operador de crowding, utilizando o bubble sort
+    # Ordena a população de acordo com o operador de crowding
+    # Os indivíduos ficam ordenados pelo rank e, dentro do mesmo rank, do maior para o menor crowding distance
     def sort_by_crowded_comparison(self, population):
 
-        for i in range(len(population.individuals) - 2):
-
-            worst = population.individuals[i]
+        population.reorder(dominancia.ordem_crowding(population.ranks[:population.size],
+                                                     population.crowding_distances[:population.size]))
 
-            for j in range(1, len(population.individuals) - i):
+    # Retorna as linhas dos 'quantidade' melhores indivíduos da população de acordo com o operador de crowding
+    def crowded_truncation(self, population, quantidade):
 
-                worst = self.crowded_comparison(worst, population.individuals[j])
-
-            population.individuals.remove(worst)
-            population.individuals.append(worst)
-
-        worst = population.individuals[0]
-        population.individuals.remove(worst)
-        population.individuals.append(worst)
+        return dominancia.ordem_crowding(population.ranks[:population.size],
+                                         population.crowding_distances[:population.size], quantidade)
 
     def tournament_selection(self):
         """Binary tournament selection according to crowded comparison operator"""
@@ -616,13 +775,14 @@ class NSGA2:
         if random.random() < 0.5:
 
             # O genoma de index 1 e 2, devem vir sempre do mesmo pai pois eles possuem relação
+            # Os pontos de início são copiados para que a mutação dos filhos não altere o genoma dos pais
             child1_genome.append(pai1.genome[0])
             child1_genome.append(pai2.genome[1])
-            child1_genome.append(pai2.genome[2])
+            child1_genome.append(list(pai2.genome[2]))
 
             child2_genome.append(pai2.genome[0])
             child2_genome.append(pai1.genome[1])
-            child2_genome.append(pai1.genome[2])
+            child2_genome.append(list(pai1.genome[2]))
 
             # Após a geração das proles, é feita a mutação
             child1_genome = self.mutation(child1_genome)
@@ -631,11 +791,11 @@ class NSGA2:
 
             child2_genome.append(pai1.genome[0])
             child2_genome.append(pai2.genome[1])
-            child2_genome.append(pai2.genome[2])
+            child2_genome.append(list(pai2.genome[2]))
 
             child1_genome.append(pai2.genome[0])
             child1_genome.append(pai1.genome[1])
-            child1_genome.append(pai1.genome[2])
+            child1_genome.append(list(pai1.genome[2]))
 
             child1_genome = self.mutation(child1_genome)
             child2_genome = self.mutation(child2_genome)
@@ -666,8 +826,8 @@ class NSGA2:
             # Se o crossover não for realizado, então é feita uma cópia dos pais que serão mantidos na população
             else:
 
-                child1_genome = parent1.genome
-                child2_genome = parent2.genome
+                child1_genome = [parent1.genome[0], parent1.genome[1], list(parent1.genome[2])]
+                child2_genome = [parent2.genome[0], parent2.genome[1], list(parent2.genome[2])]
 
             # Adiciona o genoma dos filhos na lista
             genomes_list.append(child1_genome)
@@ -714,8 +874,8 @@ class NSGA2:
 
                 genome[0] = self.max_caminhoes
 
-            # Busca pela clusterização armazenada em cache
-            pnts_clusterizados = util.cache_mapas_eulerizados[genome[1]][0]
+            # Busca pela clusterização armazenada no modelo da cidade
+            pnts_clusterizados = self.modelo.clusters(genome[1])
 
             # Percorre os pontos de início dos cluster para aplicar mutação
             for i, ponto_inicio in enumerate(genome[2]):
@@ -746,8 +906,8 @@ class NSGA2:
             genome[2] = []
             genome[2] = [-1 for _ in range(genome[1])]
 
-            # Busca pela clusterização armazenada em cache
-            pnts_clusterizados = util.cache_mapas_eulerizados[genome[1]][0]
+            # Busca pela clusterização armazenada no modelo da cidade
+            pnts_clusterizados = self.modelo.clusters(genome[1])
 
             # Realiza o sorteio dos pontos novamente
             for i in range(len(genome[2])):
@@ -755,43 +915,13 @@ class NSGA2:
 
         return genome
 
-    # Cria o arquivo do front e insere o ponto de referência para o cálculo do hypervolume
-    def create_front_file(self, reference_point):
-
-        with open(self.population_file_name, "w") as file_:
-            file_.write(reference_point + "\n")
-
-    # Insere no arquivo a melhor front para o formato que será utilizado no cálculo do hypervolume
-    def add_population_to_file(self, front):
-
-        with open(self.population_file_name, "a") as file_:
-            objectives = "["
-
-            for individual in front.individuals:
-                objectives += str(individual.solutions) + ", "
-
-            objectives = objectives[:-2] + "]\n"
-
-            file_.write(objectives)
-
-    # Executa o cálculo de hypervolume e salva num arquivo
+    # Gera o gráfico da evolução do hypervolume, calculado a cada geração
     def calculate_hypervolume(self):
 
-        population_file_name = "population_evolution.txt"
-        output_file_name = "saida/Resultados/output_" + self.factorial_file_name + ".txt"
-
-        fronts = []
-        result = []
+        output_file_name = os.path.join(self.output_directory, "Resultados",
+                                        "output_" + self.factorial_file_name + ".txt")
 
-        with open(population_file_name, 'r') as f:
-            hv_ref = eval(f.readline())
-            for line in f:
-                fronts.append(eval(line))
-
-        # Calcula o hypervolume dos fronts
-        for front in fronts:
-            hv = hypervolume(front)
-            result.append(hv.compute(hv_ref))
+        result = self.hipervolume.valores()
 
         # Gera o arquivo com os resultados
         # Primeira coluna representa o valor do hypervolume, segunda o tempo de execução
@@ -812,14 +942,18 @@ class NSGA2:
                 line = str(result[-1]) + "," + str(self.runtime) + "\n"
                 f.write(line)"""
 
-        file_path = os.path.realpath(__file__)
-        # directory = file_path[:-5]
-        directory = file_path[:-2]
+        if self.hypervolume_plot is None:
+            return
+
+        diretorio = os.path.dirname(self.hypervolume_plot)
+
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
 
         plt.plot(range(1, len(result) + 1), result, 'ro')
         plt.ylabel("hypervolume Score")
         plt.xlabel("Generations")
-        plt.savefig(directory + self.factorial_file_name + "_hypervolume.png")
+        plt.savefig(self.hypervolume_plot)
 
         # Limpa a figura para evitar que o matplotlib se "lembre" da figura
         plt.clf()
@@ -830,7 +964,11 @@ class NSGA2:
     # Gera um arquivo com os resultados obtidos pelo algoritmo
     def gera_resultados(self, individuo, diretorio):
 
-        with open(f"saida/resultados/{diretorio}/rotas/arquivo_rota_completa.kml", "w") as rota_completa:
+        diretorio = os.path.join(self.output_directory, "resultados", diretorio)
+
+        os.makedirs(os.path.join(diretorio, "rotas"), exist_ok=True)
+
+        with open(f"{diretorio}/rotas/arquivo_rota_completa.kml", "w") as rota_completa:
 
             rota_completa.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
                                 "<kml xmlns=\"http://www.opengis.net/kml/2.2\" "
@@ -904,7 +1042,7 @@ class NSGA2:
                 for num_rota, rota in enumerate(rotas_caminhao):
 
                     # Abre os arquivos que irão descrever a rota do caminhão
-                    with open(f"saida/resultados/{diretorio}/rotas/caminhao{caminhao}_rota_{num_rota}.txt", "w") as txt:
+                    with open(f"{diretorio}/rotas/caminhao{caminhao}_rota_{num_rota}.txt", "w") as txt:
 
                         # Adicona o depósito da rota
                         rota_completa.write(f"<Folder id=\"f{caminhao}\">\n"
@@ -914,7 +1052,7 @@ class NSGA2:
                                             "<name>Depósito</name>\n"
                                             "<styleUrl>#s1</styleUrl>\n"
                                             "<Point>\n"
-                                            f"<coordinates>{util.pontos[util.DEPOSITO].longitude},{util.pontos[util.DEPOSITO].latitude},{util.pontos[util.DEPOSITO].altitude}</coordinates>\n"
+                                            f"<coordinates>{self.modelo.coordenada(self.modelo.deposito)}</coordinates>\n"
                                             "</Point>\n"
                                             "</Placemark>\n"
                                             f"<Placemark id=\"r{caminhao}{num_rota}\">\n"
@@ -931,26 +1069,24 @@ class NSGA2:
                         # Em cada rota, percorre os pontos que a formam
                         for pnt in rota.rota:
 
-                            if util.grafo_cidade_simplificado.has_edge(pnt[0], pnt[1]):
-
-                                # Escreve os detalhes da rota num arquivo txt
-                                rua = util.grafo_cidade_simplificado[pnt[0]][pnt[1]][0]["rua"]
+                            # Escreve os detalhes da rota num arquivo txt
+                            nome_rua = self.modelo.nome_rua(pnt[0], pnt[1])
 
-                                if rua.nome is not None and rua.nome is not "":
-                                    txt.write(rua.nome + " -> ")
+                            if nome_rua:
+                                txt.write(nome_rua + " -> ")
 
                             if primeiro_pnt:
 
                                 rota_completa.write(
-                                    f"{util.pontos[pnt[0]].longitude},{util.pontos[pnt[0]].latitude},{util.pontos[pnt[0]].altitude} ")
+                                    f"{self.modelo.coordenada(pnt[0])} ")
                                 rota_completa.write(
-                                    f"{util.pontos[pnt[1]].longitude},{util.pontos[pnt[1]].latitude},{util.pontos[pnt[1]].altitude} ")
+                                    f"{self.modelo.coordenada(pnt[1])} ")
 
                                 primeiro_pnt = False
                             else:
 
                                 rota_completa.write(
-                                    f"{util.pontos[pnt[1]].longitude},{util.pontos[pnt[1]].latitude},{util.pontos[pnt[1]].altitude} ")
+                                    f"{self.modelo.coordenada(pnt[1])} ")
 
                         rota_completa.write("</coordinates>\n"
                                             "</LineString>\n"
@@ -972,15 +1108,15 @@ class NSGA2:
                                 if primeiro_pnt:
 
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_ida[0]].longitude},{util.pontos[ponto_ida[0]].latitude},{util.pontos[ponto_ida[0]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_ida[0])} ")
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_ida[1]].longitude},{util.pontos[ponto_ida[1]].latitude},{util.pontos[ponto_ida[1]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_ida[1])} ")
 
                                     primeiro_pnt = False
                                 else:
 
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_ida[1]].longitude},{util.pontos[ponto_ida[1]].latitude},{util.pontos[ponto_ida[1]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_ida[1])} ")
 
                             rota_completa.write("</coordinates>\n"
                                                 "</LineString>\n"
@@ -1002,15 +1138,15 @@ class NSGA2:
                                 if primeiro_pnt:
 
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_volta[0]].longitude},{util.pontos[ponto_volta[0]].latitude},{util.pontos[ponto_volta[0]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_volta[0])} ")
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_volta[1]].longitude},{util.pontos[ponto_volta[1]].latitude},{util.pontos[ponto_volta[1]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_volta[1])} ")
 
                                     primeiro_pnt = False
                                 else:
 
                                     rota_completa.write(
-                                        f"{util.pontos[ponto_volta[1]].longitude},{util.pontos[ponto_volta[1]].latitude},{util.pontos[ponto_volta[1]].altitude} ")
+                                        f"{self.modelo.coordenada(ponto_volta[1])} ")
 
                             rota_completa.write("</coordinates>\n"
                                                 "</LineString>\n"
@@ -1022,13 +1158,13 @@ class NSGA2:
                                 "</kml>\n")
 
         # Arquivo com algumas informações gerais da coleta
-        with open(f"saida/resultados/{diretorio}/dados_coleta.txt", "w") as arq:
+        with open(f"{diretorio}/dados_coleta.txt", "w") as arq:
 
             arq.write("*** RESULTADOS OBTIDOS DA COLETA ***\n")
 
             # Resultados de lixo recolhido
             arq.write(
-                f"\nQuantidade de lixo recolhido(kg): {individuo.quantidade_lixo:.0f} ({round((individuo.quantidade_lixo * 100) / util.quantidade_lixo_cidade)}%)")
+                f"\nQuantidade de lixo recolhido(kg): {individuo.quantidade_lixo:.0f} ({round((individuo.quantidade_lixo * 100) / self.modelo.quantidade_lixo)}%)")
 
             # Resultados sobre os parâmetros utilizados
             arq.write(
@@ -1049,6 +1185,10 @@ class NSGA2:
     # Gera uma imagem com a evolução das fronteiras de Paretto
     def gera_evolucao_paretto(self, lista_fronts):
 
+        diretorio = os.path.join(self.output_directory, "Resultados")
+
+        os.makedirs(diretorio, exist_ok=True)
+
         # Comparação dos resultados: Quantidade de caminhões x quilometragem
         tuplas_qtd_km = []
 
@@ -1086,7 +1226,7 @@ class NSGA2:
         plt.scatter(x, y, c=colorir)
         plt.ylabel("Variação de altitude")
         plt.xlabel("Quantidade de caminhões")
-        plt.savefig("saida/Resultados/evolucao_paretto0.png")
+        plt.savefig(os.path.join(diretorio, "evolucao_paretto0.png"))
 
         # Realiza a plotagem Quantidade de caminhões x quilometragem
         x, y = zip(*tuplas_qtd_km)
@@ -1094,7 +1234,7 @@ class NSGA2:
         plt.scatter(x, y, c=colorir)
         plt.ylabel("Quilometragem")
         plt.xlabel("Quantidade caminhões")
-        plt.savefig("saida/Resultados/evolucao_paretto1.png")
+        plt.savefig(os.path.join(diretorio, "evolucao_paretto1.png"))
 
         # Realiza a plotagem variação de altitude x quilometragem
         x, y = zip(*tuplas_alt_km)
@@ -1102,7 +1242,7 @@ class NSGA2:
         plt.scatter(x, y, c=colorir)
         plt.ylabel("Quilometragem")
         plt.xlabel("Variação de altitude")
-        plt.savefig("saida/Resultados/evolucao_paretto2.png")
+        plt.savefig(os.path.join(diretorio, "evolucao_paretto2.png"))
 
     def mapa_calor(self):
 
@@ -13,19 +13,30 @@ Link: https://www.openstreetmap.org/about
 import sys
 import random
 
+import numpy as np
+
 from .individual import Individual
+from .dominancia import matriz_dominancia
+
+# Quantidade de objetivos avaliados em cada indivíduo
+N_OBJETIVOS = 3
 
 
+# Classe que define uma população
+# Os dados dos indivíduos são armazenados em colunas, com uma linha por indivíduo
+# Os dados numéricos ficam em arrays e os demais em listas auxiliares, na mesma ordem
 class Population:
 
-    def __init__(self, max_caminhoes, min_clusters, max_clusters):
+    # Arrays com os dados numéricos dos indivíduos
+    COLUNAS = ('ids', 'genomes', 'non_normalized_solutions', 'solutions', 'avaliados', 'ranks', 'crowding_distances',
+               'quantidade_lixo')
 
-        # Semente para geração de valores aleatórios
-        random.seed()
+    # Listas com os dados dos indivíduos que não são numéricos ou possuem tamanho variável
+    TABELAS = ('pontos_inicio', 'quilometragem_caminhoes', 'rotas')
 
-        self.size = 0
+    def __init__(self, max_caminhoes, min_clusters, max_clusters):
 
-        self.individuals = list()
+        self.size = 0
 
         self.fronts = list()
 
@@ -35,6 +46,65 @@ class Population:
 
         self.max_clusters = max_clusters
 
+        # Os arrays possuem capacidade maior que o tamanho da população, que é dobrada quando ela fica cheia
+        self.capacidade = 0
+
+        # Número que identifica o indivíduo, utilizado no seu nome
+        self.ids = np.zeros(0, dtype=np.int64)
+
+        # Número de caminhões e número de clusters do genoma
+        self.genomes = np.zeros((0, 2), dtype=np.int64)
+
+        # Soluções não normalizadas e normalizadas
+        self.non_normalized_solutions = np.zeros((0, N_OBJETIVOS))
+        self.solutions = np.zeros((0, N_OBJETIVOS))
+
+        # Indica se o indivíduo já foi avaliado e teve suas soluções normalizadas
+        self.avaliados = np.zeros(0, dtype=bool)
+
+        # Rank do indivíduo, 0 indica que ele ainda não foi ordenado
+        self.ranks = np.zeros(0, dtype=np.int64)
+
+        # Crowding distance do indivíduo, NaN indica que ela ainda não foi calculada
+        self.crowding_distances = np.zeros(0)
+
+        self.quantidade_lixo = np.zeros(0)
+
+        # Pontos de início de cada cluster, que completam o genoma
+        self.pontos_inicio = []
+
+        self.quilometragem_caminhoes = []
+
+        self.rotas = []
+
+    # Tupla com os indivíduos da população
+    # Os indivíduos são visões das linhas dos arrays, geradas a cada acesso, por isso a tupla é imutável: a população é
+    # alterada pelos seus métodos (insert, reorder, etc.)
+    @property
+    def individuals(self):
+
+        return tuple(Individual(self, indice) for indice in range(self.size))
+
+    # Garante que os arrays possuem espaço para mais 'quantidade' indivíduos
+    def reserva(self, quantidade):
+
+        necessario = self.size + quantidade
+
+        if necessario <= self.capacidade:
+            return
+
+        capacidade = max(necessario, 2 * self.capacidade, 8)
+
+        for coluna in self.COLUNAS:
+
+            antigo = getattr(self, coluna)
+            novo = np.zeros((capacidade,) + antigo.shape[1:], dtype=antigo.dtype)
+            novo[:self.size] = antigo[:self.size]
+
+            setattr(self, coluna, novo)
+
+        self.capacidade = capacidade
+
     # Método que gera os indivíduos da população
     def initiate(self, n_individuals):
 
@@ -74,33 +144,94 @@ class Population:
     # Cria um novo indivíduo e insere na população
     def new_individual(self, genome):
 
-        self.insert(Individual(genome))
+        self.reserva(1)
 
-    # Insere um indivíduo na população
-    def insert(self, individual):
+        indice = self.size
+
+        self.ids[indice] = Individual.id
+        Individual.id += 1
+
+        self.genomes[indice] = genome[:2]
+        self.non_normalized_solutions[indice] = 0
+        self.solutions[indice] = 0
+        self.avaliados[indice] = False
+        self.ranks[indice] = 0
+        self.crowding_distances[indice] = np.nan
+        self.quantidade_lixo[indice] = 0
+
+        self.pontos_inicio.append(genome[2])
+        self.quilometragem_caminhoes.append([])
+        self.rotas.append({})
 
-        self.individuals.append(individual)
         self.size += 1
 
+        return Individual(self, indice)
+
+    # Insere um indivíduo na população, copiando os seus dados
+    def insert(self, individual):
+
+        self.insert_rows(individual.population, [individual.indice])
+
+    # Insere, de uma só vez, os indivíduos de outra população que estão nas linhas indicadas
+    def insert_rows(self, population, indices):
+
+        indices = np.asarray(indices, dtype=np.int64)
+
+        self.reserva(len(indices))
+
+        for coluna in self.COLUNAS:
+            getattr(self, coluna)[self.size:self.size + len(indices)] = getattr(population, coluna)[indices]
+
+        for tabela in self.TABELAS:
+
+            origem = getattr(population, tabela)
+            getattr(self, tabela).extend(origem[indice] for indice in indices)
+
+        self.size += len(indices)
+
+    # Retorna uma nova população com os indivíduos das linhas indicadas
+    def subset(self, indices):
+
+        population = Population(self.max_caminhoes, self.min_clusters, self.max_clusters)
+        population.insert_rows(self, indices)
+
+        return population
+
+    # Reordena os indivíduos da população de acordo com a ordem das linhas passada
+    # As linhas que não estiverem na ordem são descartadas
+    def reorder(self, ordem):
+
+        ordem = np.asarray(ordem, dtype=np.int64)
+
+        for coluna in self.COLUNAS:
+
+            array = getattr(self, coluna)
+            array[:len(ordem)] = array[:self.size][ordem]
+
+        for tabela in self.TABELAS:
+
+            lista = getattr(self, tabela)
+            setattr(self, tabela, [lista[indice] for indice in ordem])
+
+        self.size = len(ordem)
+
     def delete_individual(self, individual):
         """Delete "individual" from population"""
 
-        self.individuals.remove(individual)
-        self.size -= 1
+        self.reorder(np.flatnonzero(np.arange(self.size) != individual.indice))
 
     # Realiza a união entre uma população e outra
     def union(self, population):
 
-        for individual in population.individuals:
-            self.insert(individual)
+        self.insert_rows(population, np.arange(population.size))
 
-    # Reseta dados sobre as fronteiras e também das informações do domination sort dos indivíduos
-    def reset_fronts(self):
+    # Retorna os indivíduos que ainda não foram avaliados
+    def nao_avaliados(self):
 
-        for individual in self.individuals:
+        return [Individual(self, indice) for indice in np.flatnonzero(~self.avaliados[:self.size])]
 
-            individual.domination_count = 0
-            individual.dominated_by = list()
+    # Reseta dados sobre as fronteiras
+    def reset_fronts(self):
 
         self.fronts = list()
 
@@ -113,7 +244,7 @@ class Population:
 
         index = random.randint(0, self.size-1)
 
-        return self.individuals[index]
+        return Individual(self, index)
 
     def add_to_front(self, index, individual):
 
@@ -146,7 +277,8 @@ class Population:
 
         last_front = self.get_last_front()
 
-        for individual in last_front:
+        # Os indivíduos são removidos do último para o primeiro, para que os índices dos demais continuem válidos
+        for individual in sorted(last_front, key=lambda x: x.indice, reverse=True):
 
             self.delete_individual(individual)
 
@@ -181,12 +313,9 @@ class Population:
     # Retorna o maior e menor valor da solução de vizinhos
     def get_extreme_neighbours(self, solution_index):
 
-        genome_list = list()
+        valores = self.solutions[:self.size, solution_index]
 
-        for individual in self.individuals:
-            genome_list.append(individual.solutions[solution_index])
-
-        return min(genome_list), max(genome_list)
+        return valores.min(), valores.max()
 
     # Utils
     def _show_individuals(self):
@@ -235,12 +364,15 @@ class Population:
     def _show_general_domination_info(self):
         """Show all data of population"""
 
-        for individual in self.individuals:
+        dominancia = matriz_dominancia(self.solutions[:self.size])
+        individuals = self.individuals
+
+        for i, individual in enumerate(individuals):
             sys.stdout.write("  Individual: " + str(individual)
-                             + "\tdomination count: " + str(individual.domination_count)
+                             + "\tdomination count: " + str(dominancia[:, i].sum())
                              + "\tdominated by this: ")
-            for dominated_individual in individual.dominated_by:
-                sys.stdout.write(str(dominated_individual.name) + ", ")
+            for j in np.flatnonzero(dominancia[i]):
+                sys.stdout.write(str(individuals[j].name) + ", ")
             print("")
         print("")
 
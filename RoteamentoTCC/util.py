@@ -13,7 +13,6 @@ Link: https://www.openstreetmap.org/about
 # Arquivo com métodos úteis para a aplicação
 # Biblioteca para leitura do arquivo OSM
 import os
-import random
 import xml.etree.cElementTree as ET
 # Biblioteca para plotagem de dados no google maps
 import gmplot
@@ -23,23 +22,28 @@ from RoteamentoTCC.Ponto import *
 from RoteamentoTCC.Rua import *
 # Biblioteca que realiza operações com grafos
 import networkx as nx
-# Biblioteca para cálculos utilizando coordenadas geográficas
-import geopy.distance
+# Biblioteca para cálculos vetorizados utilizando coordenadas geográficas
+import RoteamentoTCC.distancia as distancia
 # Biblioteca para plotagem de gráficos e dados em geral
 from matplotlib import pyplot as plt
 # Biblioteca que contém úteis matemáticos
 import numpy as np
 # Biblioteca para a realização do agrupamento dos pontos
-from sklearn.cluster import KMeans
+import RoteamentoTCC.agrupamento as agrupamento
 # Biblioteca para limpeza de lixo de memória(garbage collector)
 import gc
 # Classe que define e executa o Non-dominated Sorting Genetic Algorithm II
 from RoteamentoTCC.nsga.nsga2 import NSGA2
-# Bibliotecas para criação de arquivos temporários
-import tempfile
-import shutil
-# Função de arredondamento para cima
-from math import ceil
+# Observadores das gerações do NSGA-II
+import RoteamentoTCC.nsga.instrumentacao as instrumentacao
+# Biblioteca para a execução de tarefas em paralelo
+import multiprocessing
+# Contador utilizado para indexar as ocorrências dos pontos nas ruas
+from collections import Counter
+# Grafo da cidade compilado em arrays, utilizado no cálculo das rotas
+from RoteamentoTCC.GrafoCompilado import GrafoCompilado
+# Modelo imutável da cidade, utilizado pelo NSGA-II
+from RoteamentoTCC.ModeloCidade import ModeloCidade
 # Bibliotecas necessárias para capturar a altitude dos pontos
 import requests
 import time
@@ -51,6 +55,55 @@ MAX_CLUSTERS = 30
 # Número máximo de caminhões
 MAX_CAMINHOES = 30
 
+# Quantidade de processos utilizados na geração do 'cache' dos mapas eulerizados
+# 1 gera em série e 0 utiliza todos os núcleos disponíveis
+PROCESSOS_CACHE = 0
+
+# Quantidade de processos utilizados na avaliação dos indivíduos do NSGA-II
+# 1 avalia em série e 0 utiliza todos os núcleos disponíveis
+PROCESSOS_AVALIACAO = 1
+
+# Quantidade máxima de genomas cujas avaliações ficam armazenadas durante a execução do NSGA-II
+# 0 desabilita o 'cache', fazendo com que todos os indivíduos tenham suas rotas simuladas
+TAMANHO_CACHE_AVALIACAO = 4096
+
+# Modo de normalização dos objetivos do NSGA-II
+# 'geracao' recalcula a escala a cada geração e 'maximo_acumulado' só a altera quando surge um novo extremo
+MODO_NORMALIZACAO = 'geracao'
+
+# Arquivo JSON-lines onde são gravadas as medições de cada fase das gerações do NSGA-II, None para não gravar
+ARQUIVO_INSTRUMENTACAO = None
+
+# Intervalo, em gerações, do resumo das fases exibido durante o NSGA-II
+# 0 exibe somente o resumo final e None desabilita o resumo
+RESUMO_GERACOES = None
+
+# Arquivo onde o estado do NSGA-II é salvo periodicamente, permitindo retomar uma execução interrompida
+# None desabilita os checkpoints
+ARQUIVO_CHECKPOINT = None
+
+# Intervalo, em gerações, entre os checkpoints do NSGA-II
+INTERVALO_CHECKPOINT = 10
+
+# Quantidade máxima de circuitos eulerianos armazenados no 'cache' dos circuitos
+TAMANHO_CACHE_CIRCUITOS = 20000
+
+# Define se um circuito de um cluster pode ser obtido rotacionando outro circuito do mesmo cluster já calculado
+# A rotação é mais rápida, mas gera um circuito diferente (igualmente válido) do que o networkx geraria a partir do
+# ponto de início, alterando os resultados em relação à execução sem ela
+ROTACIONA_CIRCUITOS = False
+
+# Modo do k-means utilizado no agrupamento dos pontos: 'completo' (KMeans) ou 'minibatch' (MiniBatchKMeans, indicado para
+# cidades grandes)
+MODO_AGRUPAMENTO = 'completo'
+
+# Define se o agrupamento de cada número de clusters parte dos centroides do número anterior, no lugar de ser refeito do
+# zero com várias reinicializações
+AQUECIMENTO_AGRUPAMENTO = True
+
+# Modo de cálculo das distâncias entre os pontos: 'vincenty' (elipsoide, preciso) ou 'haversine' (esfera, mais rápido)
+MODO_DISTANCIA = 'vincenty'
+
 # Indica qual mapa está sendo usado: F = Formiga; L = Lagoa da Prata
 # MAPA = 'F'
 MAPA = 'L'
@@ -90,6 +143,16 @@ pontos_retirar_manual = ['2386701666', '2386701653', '353461444', '8256516317',
                          '7105572020', '8405717762', '5420412669', '353460735', '1344104828', '1826545975',
                          '4055552318', '5420412934', '7802750044', '3545678179', '4055552327', '7872173741']
 
+# ID's de ruas que serão retiradas "manualmente" para que o grafo fique melhor organizado
+ruas_retirar_manual = ['171661658', '837763522', '844146081', '119717353', '835715874']
+
+# Lista de itens que serão removidos, esses itens não são interessantes para o trabalho
+# Ex: Rios, ferrovias, montanhas, morros, sinais de trânsito, estabelecimentos
+remover = ['traffic_signals', 'place_of_worship', 'church', 'supermarket', 'educational_institution', 'school',
+           'hospital', 'atm', 'bakery', 'bank', 'pharmacy', 'bus_station', 'hotel', 'convenience', 'taxi',
+           'restaurant', 'library', 'police', 'furniture', 'sports_centre', 'tower', 'fast_food', 'peak', 'river',
+           'rail', 'wood', 'statue', 'clothes', 'fuel', 'gate', 'cattle_grid', 'track', 'path', 'water', 'unpaved']
+
 # Quantidade total de lixo que foi gerada na cidade
 quantidade_lixo_cidade = 0
 
@@ -97,6 +160,13 @@ quantidade_lixo_cidade = 0
 # Utilizado para poupar tempo ao rodar o algoritmo
 cache_mapas_eulerizados = {}
 
+# Distância mínima de cada ponto do grafo simplificado até o depósito
+# Como o grafo não é direcionado, a distância de ida e de volta ao depósito é a mesma
+distancias_deposito = {}
+
+# Predecessor de cada ponto na árvore de caminhos mínimos que parte do depósito
+predecessores_deposito = {}
+
 
 def __init__():
     pass
@@ -109,17 +179,7 @@ def le_arquivo(arquivo_entrada: str):
     # Obtém a tag raiz do arquivo
     raiz = arvore.getroot()
     # Referencias de nós de caminhos para serem removidos
-    referencias_nos = []
-
-    # ID's de ruas que serão retiradas "manualmente" para que o grafo fique melhor organizado
-    ruas_retirar_manual = ['171661658', '837763522', '844146081', '119717353', '835715874']
-
-    # Lista de itens que serão removidos, esses itens não são interessantes para o trabalho
-    # Ex: Rios, ferrovias, montanhas, morros, sinais de trânsito, estabelecimentos
-    remover = ['traffic_signals', 'place_of_worship', 'church', 'supermarket', 'educational_institution', 'school',
-               'hospital', 'atm', 'bakery', 'bank', 'pharmacy', 'bus_station', 'hotel', 'convenience', 'taxi',
-               'restaurant', 'library', 'police', 'furniture', 'sports_centre', 'tower', 'fast_food', 'peak', 'river',
-               'rail', 'wood', 'statue', 'clothes', 'fuel', 'gate', 'cattle_grid', 'track', 'path', 'water', 'unpaved']
+    referencias_nos = set()
 
     # Armazena as tags que serão retiradas
     limpar = []
@@ -146,7 +206,7 @@ def le_arquivo(arquivo_entrada: str):
                     if v in remover:
 
                         # Verifica se o ramo já não foi colocado na lista
-                        if ramo not in limpar:
+                        if not isremovida:
                             limpar.append(ramo)
                             isremovida = True
 
@@ -197,13 +257,11 @@ def le_arquivo(arquivo_entrada: str):
             # Se a tag estiver marcada, ela é colocada na lista de limpeza
             if isremovida:
 
-                # Nós da lista de referencia são passados para a lista final
-                for no in aux_ref:
-                    referencias_nos.append(no)
+                # Nós da lista de referencia são passados para o conjunto final
+                referencias_nos.update(aux_ref)
 
-                # Se o ramo já não estiver na lista de limpeza, ele é adicionado
-                if ramo not in limpar:
-                    limpar.append(ramo)
+                # Cada ramo é visitado uma única vez, então ele é adicionado direto na lista de limpeza
+                limpar.append(ramo)
 
             # Senão a rua é inserida no dicionário de ruas
             else:
@@ -242,19 +300,12 @@ def le_arquivo(arquivo_entrada: str):
 
     # Verifica se alguma rua que não será retirada possui o nó analisado
     # Se existir tal rua, o nó não poderá ser retirado
-    for _, rua in ruas.items():
+    # O dicionário 'ruas' contém todas as ruas que serão utilizadas e já estão validadas
+    # Então se o ponto estiver em uma dessas ruas ele já não pode ser retirado
+    nos_ruas_mantidas = {rua_ponto.id for rua in ruas.values() for rua_ponto in rua.pontos}
 
-        # O dicionário 'ruas' contém todas as ruas que serão utilizadas e já estão validadas
-        # Então se o ponto estiver em uma dessas ruas ele já não pode ser retirado
-        for rua_ponto in rua.pontos:
-
-            # Passa por todos os nós da lista de limpeza, verificando se alguns deles compõe a rua
-            for no_limpar in limpar:
-
-                # Se identificar que algum nó está na rua
-                if no_limpar.attrib['id'] == rua_ponto.id:
-                    # Ele é retirado da lista de limpeza
-                    limpar.remove(no_limpar)
+    # Retira da lista de limpeza os nós que compõe alguma das ruas mantidas
+    limpar = [no_limpar for no_limpar in limpar if no_limpar.attrib['id'] not in nos_ruas_mantidas]
 
     # Passa pela lista de pontos retirando os nós que serão limpos
     # Como a lista 'limpar' foi verificada acima, todos os pontos que estão nessa lista com certeza serão eliminados
@@ -268,8 +319,9 @@ def le_arquivo(arquivo_entrada: str):
                 pontos.pop(no_limpar.attrib['id'])
 
     # Retira as tags do documento
-    for item in limpar:
-        raiz.remove(item)
+    # A raiz é reconstruída com as tags mantidas, evitando uma busca linear para cada remoção
+    tags_limpar = {id(item) for item in limpar}
+    raiz[:] = [ramo for ramo in raiz if id(ramo) not in tags_limpar]
 
     # Cria um documento de saída mais enxuto, sem tags que não serão utilizadas
     arvore.write('saida/saida.osm')
@@ -277,58 +329,185 @@ def le_arquivo(arquivo_entrada: str):
     print("Arquivo de saída gerado!")
 
 
-def otimiza_grafo():
-    # Percorre todos os nós que já foram obtidos
-    for id_ponto, ponto in pontos.items():
+# Realiza a leitura do arquivo de entrada em uma única passada, sem carregar o XML inteiro na memória
+# Os elementos são descartados assim que são processados, então o consumo de memória depende somente da malha viária
+# mantida, e não do tamanho do arquivo
+# Ao final, os dicionários 'pontos' e 'ruas' e as ligações entre os pontos ficam prontos, dispensando a 'mapeia_ruas'
+# O arquivo de saída enxuto só é gerado se 'arquivo_saida' for informado
+def le_arquivo_streaming(arquivo_entrada: str, arquivo_saida=None):
 
-        # Inicializa um contador para o ponto, se o mesmo aparecer mais de uma vez durante a iteração das ruas ele tem
-        # grandes chances de ser uma esquina
-        contador_ponto = 0
+    # Nós referenciados por caminhos que serão removidos
+    referencias_removidas = set()
 
-        # Verifica antes se o ponto é um dos que deve ser retirado "manualmente"
-        if id_ponto in pontos_retirar_manual:
+    # Nós referenciados por caminhos que serão mantidos
+    referencias_mantidas = set()
+
+    # Caminhos mantidos, guardados como (id, nome, referências dos nós)
+    # As ruas só são montadas no final, pois o arquivo pode trazer caminhos antes dos nós que os formam
+    caminhos_mantidos = []
+
+    # Obtém um iterador que entrega cada tag assim que ela é fechada
+    contexto = ET.iterparse(arquivo_entrada, events=('start', 'end'))
+
+    # O primeiro evento é a abertura da tag raiz, que é guardada para ser limpa durante a leitura
+    _, raiz = next(contexto)
+
+    for evento, ramo in contexto:
+
+        # Somente as tags já fechadas possuem todas as suas filhas disponíveis
+        if evento != 'end':
             continue
 
-        # Primeiramente verifica se o ponto é o final de uma rua, se for deve ser inserido
-        # O ponto que possui somente um vizinho, é considerado um final de rua
-        if len(ponto.pontos_vizinhos) == 1:
-            pontos_otimizados[id_ponto] = ponto
+        if ramo.tag == 'node':
+
+            # Se contiver alguma informação da lista de remoção, esse nó não é mapeado
+            isremovida = any(filha_ramo.get('v') in remover for filha_ramo in ramo.iter('tag'))
+
+            if not isremovida:
+                ponto = Ponto()
 
-        # Se o ponto não foi inserido acima, existem mais testes a serem realizados
-        if not pontos_otimizados.__contains__(ponto):
+                # Obtém o id do nó, latitude e longitude
+                ponto.id = ramo.get('id')
+                ponto.latitude = ramo.get('lat')
+                ponto.longitude = ramo.get('lon')
 
-            # Percorre todas as ruas, verificando se aquele ponto está contido nela
-            for id_rua, rua in ruas.items():
+                # Insere no dicionário de pontos
+                pontos[ponto.id] = ponto
 
-                # Verifica cada um dos pontos da rua, se bate com o ponto sendo analisado atualmente
-                for ponto_rua in rua.pontos:
+        elif ramo.tag == 'way':
 
-                    # Verifica se o ponto é válido
-                    if ponto_rua is not None and ponto_rua.id != -1:
+            # Guardando o id da rua
+            id_rua = ramo.get('id')
 
-                        # Verifica se o id dos pontos bate
-                        if ponto_rua.id == id_ponto:
-                            # Incrementa o contador, pois o ponto faz parte da rua
-                            contador_ponto = contador_ponto + 1
+            # Lista auxiliar para nós dos caminhos
+            aux_ref = [filha_ramo.get('ref') for filha_ramo in ramo.iter('nd')]
 
-                        # Verifica se o contador está maior que 1, o que indica que o ponto pode ser uma esquina
-                        if contador_ponto > 1:
-                            # Insere o ponto na lista de pontos otimizados
-                            pontos_otimizados[id_ponto] = ponto
+            isremovida = False
+            nome_rua = ""
 
-                            # Encerra o for, pois o ponto já está na lista de otimizados
-                            break
+            for filha_ramo in ramo.iter('tag'):
 
+                # Se contiver alguma informação da lista de remoção, o caminho será retirado
+                if filha_ramo.get('v') in remover or id_rua in ruas_retirar_manual:
+                    isremovida = True
 
-def adiciona_alturas():
+                # Identifica a chave nome, que indica o nome da rua
+                if filha_ramo.get('k') == 'name':
+                    nome_rua = filha_ramo.get('v')
+
+            if isremovida:
+
+                referencias_removidas.update(aux_ref)
+            else:
+
+                referencias_mantidas.update(aux_ref)
+                caminhos_mantidos.append((id_rua, nome_rua, aux_ref))
+
+        elif ramo.tag != 'relation':
+
+            # Tags filhas (nd, tag, member) são descartadas junto com a tag pai
+            continue
+
+        # Libera a memória da tag processada e das tags já lidas que ainda estão ligadas a raiz
+        ramo.clear()
+        raiz.clear()
+
+    # Retira os nós que pertencem somente a caminhos removidos
+    for id_no in referencias_removidas - referencias_mantidas:
+        pontos.pop(id_no, None)
+
+    # Monta as ruas e realiza a ligação entre os pontos vizinhos
+    for id_rua, nome_rua, aux_ref in caminhos_mantidos:
+
+        rua = Rua()
+        rua.id = id_rua
+        rua.nome = nome_rua
+
+        # Ponto anterior ao atual, usado para identificar vizinhos
+        ponto_anterior = None
+
+        for ref in aux_ref:
+
+            # Verifica se o nó existe na lista de nós
+            if ref in pontos:
+
+                ponto_atual = pontos[ref]
+                rua.insere_ponto(ponto_atual)
+
+                # Informa que o ponto atual possui ligação com o ponto anterior e vice-versa
+                if ponto_anterior is not None:
+                    ponto_atual.realiza_ligacao(ponto_anterior)
+                    ponto_anterior.realiza_ligacao(ponto_atual)
+
+                ponto_anterior = ponto_atual
+
+        # Assim como no mapeamento sem fluxo, somente as ruas com ao menos um ponto no arquivo são inseridas
+        if len(rua.pontos) != 0:
+            ruas[id_rua] = rua
+
+    if arquivo_saida is not None:
+        escreve_arquivo_saida(arquivo_saida)
+
+    print("Arquivo {} lido em fluxo!".format(arquivo_entrada))
+
+
+# Gera um arquivo OSM enxuto contendo somente os pontos e ruas que foram mantidos
+def escreve_arquivo_saida(arquivo_saida):
+
+    raiz = ET.Element('osm', version='0.6')
+
+    for ponto in pontos.values():
+        ET.SubElement(raiz, 'node', id=ponto.id, lat=ponto.latitude, lon=ponto.longitude)
+
+    for rua in ruas.values():
+
+        caminho = ET.SubElement(raiz, 'way', id=rua.id)
+
+        for ponto in rua.pontos:
+            ET.SubElement(caminho, 'nd', ref=ponto.id)
+
+        if rua.nome:
+            ET.SubElement(caminho, 'tag', k='name', v=rua.nome)
+
+    ET.ElementTree(raiz).write(arquivo_saida)
+
+
+def otimiza_grafo():
+
+    # Conta quantas vezes cada ponto aparece nas ruas, em uma única passada por todas elas
+    # Se o ponto aparecer mais de uma vez ele tem grandes chances de ser uma esquina
+    ocorrencias_pontos = Counter(ponto_rua.id for rua in ruas.values() for ponto_rua in rua.pontos
+                                 if ponto_rua is not None and ponto_rua.id != -1)
+
+    # Pontos que devem ser retirados "manualmente"
+    retirar_manual = set(pontos_retirar_manual)
+
+    # Percorre todos os nós que já foram obtidos
+    for id_ponto, ponto in pontos.items():
+
+        # Verifica antes se o ponto é um dos que deve ser retirado "manualmente"
+        if id_ponto in retirar_manual:
+            continue
+
+        # O ponto que possui somente um vizinho, é considerado um final de rua e deve ser inserido
+        # O ponto que aparece mais de uma vez nas ruas é considerado uma esquina e também deve ser inserido
+        if len(ponto.pontos_vizinhos) == 1 or ocorrencias_pontos[id_ponto] > 1:
+            pontos_otimizados[id_ponto] = ponto
+
+
+# Retorna o arquivo que contém as altitudes dos pontos do mapa utilizado
+def arquivo_alturas():
 
-    # Abre o arquivo que contém as altitudes dos pontos
     if MAPA == 'F':
+        return "entrada/alturas.osm"
+
+    return "entrada/alturas_lagoa.osm"
 
-        arq_altitudes = open("entrada/alturas.osm", "r")
-    else:
 
-        arq_altitudes = open("entrada/alturas_lagoa.osm", "r")
+def adiciona_alturas():
+
+    # Abre o arquivo que contém as altitudes dos pontos
+    arq_altitudes = open(arquivo_alturas(), "r")
 
     # Passa por todas as linhas do arquivo
     for linha in arq_altitudes:
@@ -350,20 +529,6 @@ def adiciona_alturas():
 
 # Função que faz a interligação dos pontos obtidos no mapa, forma as ruas e as plota
 def mapeia_ruas(arquivo):
-    lat = []
-    lon = []
-
-    tuplas_latlon = []
-
-    # Obtem os pontos para serem plotados
-    for id_pnt in pontos:
-
-        tuplas_latlon.append((pontos[id_pnt].latitude, pontos[id_pnt].longitude))
-        lat.append(pontos[id_pnt].latitude)
-        lon.append(pontos[id_pnt].longitude)
-
-    # Adiciona o local inicial a plotagem
-    mapa_plot = gmplot.GoogleMapPlotter(lat[0], lon[0], 13)
 
     # Criando uma instância para leitura do XML que foi passado como parâmetro
     arvore = ET.parse(arquivo)
@@ -382,9 +547,6 @@ def mapeia_ruas(arquivo):
             # Usa o mesmo id da rua do arquivo de parâmetro na rua instanciada
             rua.id = ramo.get('id')
 
-            # Lista de tuplas com latitudes e longitudes dos pontos das ruas
-            tuplas_rua = []
-
             # Ponto que está sendo analisado
             ponto_atual = Ponto(gera_label=False)
 
@@ -401,9 +563,8 @@ def mapeia_ruas(arquivo):
                     # Verifica se esse nó existe
                     if pontos.__contains__(filha_ramo.get('ref')):
 
-                        # Salva o ponto atual, e insere suas coordenadas na lista de tuplas
+                        # Salva o ponto atual
                         ponto_atual = pontos[filha_ramo.get('ref')]
-                        tuplas_rua.append((float(ponto_atual.latitude), float(ponto_atual.longitude)))
 
                         # Insere o ponto na lista de pontos da rua
                         rua.insere_ponto(ponto_atual)
@@ -431,17 +592,40 @@ def mapeia_ruas(arquivo):
             if len(rua.pontos) != 0:
                 ruas[rua.id] = rua
 
-            # Se existir algo na lista de tuplas, significa que existem dados a serem exibidos
-            if len(tuplas_rua) != 0:
-                # Adiciona ao mapa de plotagem as coordenadas das ruas
-                rua_lat, rua_lon = zip(*tuplas_rua)
-                mapa_plot.scatter(rua_lat, rua_lon, '#3B0B39', size=5, marker=False)
-                mapa_plot.plot(rua_lat, rua_lon, 'cornflowerblue', edge_width=3)
+    plota_mapa('saida/mapa.html')
+
+
+# Plota no google maps os pontos e as ruas que foram mapeados
+def plota_mapa(arquivo):
+    lat = []
+    lon = []
+
+    tuplas_latlon = []
+
+    # Obtem os pontos para serem plotados
+    for id_pnt in pontos:
+
+        tuplas_latlon.append((pontos[id_pnt].latitude, pontos[id_pnt].longitude))
+        lat.append(pontos[id_pnt].latitude)
+        lon.append(pontos[id_pnt].longitude)
+
+    # Adiciona o local inicial a plotagem
+    mapa_plot = gmplot.GoogleMapPlotter(lat[0], lon[0], 13)
+
+    for rua in ruas.values():
+
+        # Se a rua possuir pontos, significa que existem dados a serem exibidos
+        if len(rua.pontos) != 0:
+            # Adiciona ao mapa de plotagem as coordenadas das ruas
+            rua_lat = [float(ponto.latitude) for ponto in rua.pontos]
+            rua_lon = [float(ponto.longitude) for ponto in rua.pontos]
+            mapa_plot.scatter(rua_lat, rua_lon, '#3B0B39', size=5, marker=False)
+            mapa_plot.plot(rua_lat, rua_lon, 'cornflowerblue', edge_width=3)
 
     # Adiciona ao mapa de plotagem as coordenadas dos pontos e gera o arquivo
     draw_lat, draw_lon = zip(*tuplas_latlon)
     mapa_plot.scatter(draw_lat, draw_lon, '#3B0B39', size=5, marker=False)
-    mapa_plot.draw('saida/mapa.html')
+    mapa_plot.draw(arquivo)
 
 
 # Essa função atualiza os vizinhos dos pontos após a otimização do grafo
@@ -461,40 +645,36 @@ def atualiza_vizinhos():
 def monta_grafo_otimizado(pontos_grafo, nome_arquivo_saida):
     coordenadas_pontos = {}
 
+    # Calcula as distâncias acumuladas e o tamanho total de cada rua
+    prepara_distancias_ruas()
+
     # Percorre todas as ruas do grafo
-    for rua_id, rua in ruas.items():
+    for rua in ruas.values():
+
+        # Posição do último ponto válido encontrado na rua
+        posicao_anterior = None
 
         # Percorre cada um dos pontos que forma a rua
-        for ponto_rua in rua.pontos:
+        for posicao, ponto_rua in enumerate(rua.pontos):
 
             # Verifica se o ponto da rua que está sendo analisado é um ponto válido
-            if ponto_rua.id in pontos_grafo.keys():
-
-                # Esta variável indica qual o index do ponto que está sendo analisado
-                index_ponto = rua.pontos.index(ponto_rua)
-
-                # Insere cada um dos pontos no grafo para que sejam plotados
-                grafo_cidade_simplificado.add_node(ponto_rua.id)
+            if ponto_rua.id not in pontos_grafo:
+                continue
 
-                # Percorre novamente todos os pontos que formam aquela rua
-                for ponto_rua_ligar in rua.pontos:
+            # Insere cada um dos pontos no grafo para que sejam plotados
+            grafo_cidade_simplificado.add_node(ponto_rua.id)
 
-                    # Porem só serão analisados pontos que estão a frente do ponto analisado atualmente
-                    # E pontos válidos
-                    if (rua.pontos.index(ponto_rua_ligar) > index_ponto) and (
-                            ponto_rua_ligar.id in pontos_grafo.keys()):
+            # Liga o ponto ao último ponto válido encontrado antes dele na rua
+            if posicao_anterior is not None and rua.pontos[posicao_anterior].id != ponto_rua.id:
 
-                        # Se um ponto válido for encontrado para frente do que está sendo analisado
-                        if ponto_rua_ligar.id in pontos_grafo.keys():
-                            # Função que calcula a distância entre os pontos
-                            distancia_pontos = calcula_distancia_real(rua_id, ponto_rua, ponto_rua_ligar)
+                # A distância entre os pontos é obtida pelas distâncias acumuladas da rua
+                distancia_pontos = rua.distancia_trecho(posicao_anterior, posicao)
 
-                            # Insere a aresta no grafo
-                            grafo_cidade_simplificado.add_edge(ponto_rua.id, ponto_rua_ligar.id,
-                                                               weight=distancia_pontos, rua=rua)
+                # Insere a aresta no grafo
+                grafo_cidade_simplificado.add_edge(rua.pontos[posicao_anterior].id, ponto_rua.id,
+                                                   weight=distancia_pontos, rua=rua)
 
-                            # Para o for, pois a ligação desse ponto já foi encontrada
-                            break
+            posicao_anterior = posicao
 
     # Armazena as coordenadas dos pontos para que seja realizada a plotagem
     for node in nx.nodes(grafo_cidade_simplificado):
@@ -516,44 +696,80 @@ def monta_grafo_otimizado(pontos_grafo, nome_arquivo_saida):
 
     atualiza_vizinhos()
 
+    # Com o grafo simplificado pronto, monta a árvore de caminhos mínimos do depósito
+    monta_arvore_deposito()
 
-# Função que calcula a distância real entre dois pontos de uma rua
-# A distância real neste caso, é a distância considerando todos os pontos da rua, até os pontos que foram retirados pela
-# otimização
-def calcula_distancia_real(rua_id, ponto_inicial, ponto_final):
-    # Obtem a rua do dicionário de ruas
-    rua = ruas[rua_id]
 
-    # Inicia a variável que aramzena a distância total entre os pontos
-    distancia_total_pts = 0
+# Monta a árvore de caminhos mínimos que parte do depósito
+# Assim as idas e voltas ao depósito não precisam executar o Dijkstra novamente a cada avaliação
+def monta_arvore_deposito():
+
+    distancias_deposito.clear()
+    predecessores_deposito.clear()
+
+    # Se o depósito não estiver no mapa lido, não há árvore a ser montada
+    if DEPOSITO not in grafo_cidade_simplificado:
+        return
+
+    predecessores, distancias = nx.dijkstra_predecessor_and_distance(grafo_cidade_simplificado, DEPOSITO)
+
+    distancias_deposito.update(distancias)
+
+    # Guarda somente o primeiro predecessor, que é o mesmo utilizado pelo single_source_dijkstra
+    for no, lista_predecessores in predecessores.items():
+        predecessores_deposito[no] = lista_predecessores[0] if lista_predecessores else None
+
+
+# Retorna a distância e o caminho do depósito até o ponto passado por parâmetro
+def caminho_do_deposito(destino):
+
+    if destino not in distancias_deposito:
+        raise nx.NetworkXNoPath(f"O ponto {destino} não é alcançável a partir do depósito")
+
+    caminho = [destino]
+
+    # Percorre a árvore de predecessores até chegar no depósito
+    while caminho[-1] != DEPOSITO:
+        caminho.append(predecessores_deposito[caminho[-1]])
+
+    caminho.reverse()
+
+    return distancias_deposito[destino], caminho
+
+
+# Retorna a distância e o caminho do ponto passado por parâmetro até o depósito
+def caminho_ate_deposito(origem):
+
+    distancia, caminho = caminho_do_deposito(origem)
+
+    return distancia, caminho[::-1]
 
-    # Indica que o ponto inicial foi encontrado e que as distâncias podem começar a serem somadas
-    achou_ponto_inicial = False
 
-    # Percorre todos os pontos da rua, até achar o ponto inicial
-    for ponto_rua in rua.pontos:
+# Retorna somente a distância entre o ponto e o depósito
+def distancia_deposito(ponto):
 
-        # Verifica se o ponto corresponde ao ponto inicial
-        if ponto_rua.id == ponto_inicial.id:
-            achou_ponto_inicial = True
+    if ponto not in distancias_deposito:
+        raise nx.NetworkXNoPath(f"O ponto {ponto} não é alcançável a partir do depósito")
 
-        # Se o ponto inicial foi encontrado, as distâncias podem ser somadas
-        if achou_ponto_inicial:
+    return distancias_deposito[ponto]
 
-            # Vai adicionando as distâncias até o próximo ponto a distância total final
-            distancia_total_pts += calcula_distancia_pontos(ponto_inicial.latitude, ponto_inicial.longitude,
-                                                            ponto_rua.latitude, ponto_rua.longitude)
 
-            # Se o ponto sendo analisado atualmente for o ponto final, então deve ser parada a iteração
-            if ponto_rua.id == ponto_final.id:
-                break
+# Calcula as distâncias acumuladas de todas as ruas, utilizando as distâncias de seus segmentos
+def prepara_distancias_ruas():
 
-    # Adiciona o tamanho do segmento de rua calculado, ao total da rua
-    # Ao final de todas as iteraçãoes dessa função, todas as ruas terão seus tamanhos totais já calculados
-    rua.tamanho_rua += distancia_total_pts
+    for id_rua, distancias_segmentos in calcula_distancias_ruas().items():
+        ruas[id_rua].monta_distancias(distancias_segmentos)
 
-    # Retorna a distância total
-    return distancia_total_pts
+
+# Função que calcula a distância real entre dois pontos de uma rua
+# A distância real neste caso, é a distância considerando todos os pontos da rua, até os pontos que foram retirados pela
+# otimização
+def calcula_distancia_real(rua_id, ponto_inicial, ponto_final):
+    # Obtem a rua do dicionário de ruas
+    rua = ruas[rua_id]
+
+    # A distância é a diferença entre as distâncias acumuladas dos dois pontos
+    return rua.distancia_trecho(rua.posicoes[ponto_inicial.id], rua.posicoes[ponto_final.id])
 
 
 # Função que monta o grafo que representa o mapa e o plota
@@ -561,6 +777,9 @@ def monta_grafo(nome_arquivo):
 
     coordenadas_pontos = {}
 
+    # Pares de pontos ligados, que formarão as arestas do grafo
+    ligacoes = []
+
     # Percorre todos os pontos definidos
     for pnt in pontos:
 
@@ -569,12 +788,18 @@ def monta_grafo(nome_arquivo):
 
         # Verifica cada vizinho de ponto para que sejam montadas as arestas
         for pnt_ligado in pontos[pnt].pontos_vizinhos:
-            # Calcula a distância entre os pontos, que será utilizada como peso para a aresta
-            distancia_pontos = calcula_distancia_pontos(pontos[pnt].latitude, pontos[pnt].longitude,
-                                                        pnt_ligado.latitude, pnt_ligado.longitude)
+            ligacoes.append((pontos[pnt], pnt_ligado))
+
+    # Calcula de uma só vez a distância entre os pontos de todas as ligações, que será utilizada como peso das arestas
+    distancias_ligacoes = distancia.calcula_distancias([float(pnt.latitude) for pnt, _ in ligacoes],
+                                                       [float(pnt.longitude) for pnt, _ in ligacoes],
+                                                       [float(pnt_ligado.latitude) for _, pnt_ligado in ligacoes],
+                                                       [float(pnt_ligado.longitude) for _, pnt_ligado in ligacoes],
+                                                       MODO_DISTANCIA)
 
-            # Insere a aresta no grafo
-            grafo_cidade.add_edge(pontos[pnt].id, pnt_ligado.id, weight=distancia_pontos)
+    # Insere as arestas no grafo
+    for (pnt, pnt_ligado), distancia_pontos in zip(ligacoes, distancias_ligacoes.tolist()):
+        grafo_cidade.add_edge(pnt.id, pnt_ligado.id, weight=distancia_pontos)
 
     # Armazena as coordenadas dos pontos para que seja realizada a plotagem
     for node in nx.nodes(grafo_cidade):
@@ -700,32 +925,37 @@ def calcula_demandas(nome_arquivo):
 
 
 # Função que realiza o agrupamento de pontos próximos
-def k_means(n_cluster):
+# A semente permite que o agrupamento seja reproduzido, independente de onde ele for executado
+def k_means(n_cluster, semente=None):
 
-    # Monta a matriz com as coordenadas
-    matriz = []
+    # Retorna os pontos divididos pelos agrupamentos
+    return agrupa_pontos(k_means_rotulos(n_cluster, semente))
 
-    # Passa por todos os pontos otimizados
-    for ponto in pontos_otimizados.values():
 
-        # Garante que o depósito não será levado em conta no agrupamento
-        if ponto.id == DEPOSITO:
-            continue
+# Monta a matriz com as coordenadas, em metros, de cada ponto otimizado, exceto o depósito, na ordem de
+# 'pontos_otimizados'
+def coordenadas_agrupamento():
+
+    pontos_agrupados = [ponto for ponto in pontos_otimizados.values() if ponto.id != DEPOSITO]
+
+    latitudes = np.array([float(ponto.latitude) for ponto in pontos_agrupados])
+    longitudes = np.array([float(ponto.longitude) for ponto in pontos_agrupados])
 
-        # Insere as coordenadas na matriz
-        matriz.append([float(ponto.latitude), float(ponto.longitude)])
+    return agrupamento.coordenadas_metricas(latitudes, longitudes)
 
-        # E reseta os agrupamentos dos pontos
-        ponto.id_agrupamento = -1
 
-    # Cria o array pela biblioteca do numpy
-    coordenadas_pontos = np.array(matriz)
+# Executa o k-means e retorna o agrupamento de cada ponto otimizado, exceto o depósito, na ordem de 'pontos_otimizados'
+# As coordenadas podem ser passadas já montadas, para que não sejam montadas novamente a cada agrupamento
+def k_means_rotulos(n_cluster, semente=None, coordenadas=None):
 
-    # Realiza uma instância do algoritmo do kmeans
-    kmeans = KMeans(n_cluster, init='k-means++', n_init=10, max_iter=100)
+    if coordenadas is None:
+        coordenadas = coordenadas_agrupamento()
 
-    # Executa o kmeans para encontrar a localização que devem ficar os agrupamentos
-    pred_y = kmeans.fit_predict(coordenadas_pontos)
+    return agrupamento.agrupa(coordenadas, n_cluster, MODO_AGRUPAMENTO, semente)[0]
+
+
+# Organiza os pontos otimizados de acordo com os agrupamentos retornados pelo k-means
+def agrupa_pontos(pred_y):
 
     # Dicionário que agrupa os pontos com base nos seus respectivos agrupamentos
     pontos_agrupados = {}
@@ -741,56 +971,102 @@ def k_means(n_cluster):
         if ponto.id == DEPOSITO:
             continue
 
-        # Verifica antes se o ponto já não está associado a um agrupamento
-        if ponto.id_agrupamento == -1:
+        ponto.id_agrupamento = pred_y[cont]
 
-            ponto.id_agrupamento = pred_y[cont]
+        # Se o dicionário que agrupa os pontos ainda não tiver aquela chave
+        # Significa que nenhum ponto daquele cluster foi inserido ainda
+        if ponto.id_agrupamento not in pontos_agrupados.keys():
 
-            # Se o dicionário que agrupa os pontos ainda não tiver aquela chave
-            # Significa que nenhum ponto daquele cluster foi inserido ainda
-            if ponto.id_agrupamento not in pontos_agrupados.keys():
-
-                # Insere a chave do cluster e o seu respectivo ponto
-                pontos_agrupados[ponto.id_agrupamento] = [ponto]
-            else:
+            # Insere a chave do cluster e o seu respectivo ponto
+            pontos_agrupados[ponto.id_agrupamento] = [ponto]
+        else:
 
-                # Senão o agrupamento já existe no dicionário
-                # Então o ponto é simplesmente inserido
-                pontos_agrupados[ponto.id_agrupamento].append(ponto)
+            # Senão o agrupamento já existe no dicionário
+            # Então o ponto é simplesmente inserido
+            pontos_agrupados[ponto.id_agrupamento].append(ponto)
 
         # Incrementa o contador
         cont += 1
 
-    # Gera uma imagem dos agrupamentos gerados pelo k-means
-    # Utilizada somente para testes
-    """plt.scatter(coordenadas_pontos[:, 1], coordenadas_pontos[:, 0], c=pred_y)
-
-    plt.grid()
-
-    plt.scatter(kmeans.cluster_centers_[:, 1], kmeans.cluster_centers_[:, 0], s=70, c='red', )
-
-    plt.show()"""
-
-    # Retorna os pontos divididos pelos agrupamentos
     return pontos_agrupados
 
 
 # Função que realiza o processamento das rotas nos agrupamentos gerados
 def processamento_rotas(geracoes, populacao, mutacao, crossover):
 
+    # O modelo da cidade é montado com as demandas atuais, antes que os processos da avaliação paralela sejam criados
+    modelo = monta_modelo_cidade()
+
     # O tamanho da população deve ser sempre par
-    nsga = NSGA2(geracoes, populacao, mutacao, crossover, MAX_CAMINHOES, 2, MAX_CLUSTERS)
+    nsga = NSGA2(geracoes, populacao, mutacao, crossover, MAX_CAMINHOES, 2, MAX_CLUSTERS, PROCESSOS_AVALIACAO,
+                  TAMANHO_CACHE_AVALIACAO, MODO_NORMALIZACAO, hooks=observadores_nsga(),
+                  checkpoint_file=ARQUIVO_CHECKPOINT, checkpoint_interval=INTERVALO_CHECKPOINT, city_model=modelo)
+
+    return nsga.run()
+
+
+# Continua a execução do NSGA-II salva no checkpoint
+# A cidade deve ser a mesma da execução salva, e as demandas de lixo dela são restauradas a partir do checkpoint
+def retoma_processamento_rotas(arquivo_checkpoint):
+
+    nsga = NSGA2.resume(arquivo_checkpoint, PROCESSOS_AVALIACAO, hooks=observadores_nsga(),
+                        checkpoint_interval=INTERVALO_CHECKPOINT, city_model=monta_modelo_cidade())
 
     return nsga.run()
 
 
-# Função que calcula a distância entre dois pontos, utilizando a função pronta da biblioteca geopy
+# Retorna os observadores das fases das gerações do NSGA-II, de acordo com as constantes da instrumentação
+def observadores_nsga():
+
+    hooks = []
+
+    if ARQUIVO_INSTRUMENTACAO is not None:
+        hooks.append(instrumentacao.RegistradorJsonl(ARQUIVO_INSTRUMENTACAO))
+
+    if RESUMO_GERACOES is not None:
+        hooks.append(instrumentacao.ResumoGeracoes(RESUMO_GERACOES))
+
+    return hooks
+
+
+# Função que calcula a distância entre dois pontos, utilizando o modo de cálculo definido em MODO_DISTANCIA
 def calcula_distancia_pontos(lat_ponto1, lon_ponto1, lat_ponto2, lon_ponto2):
-    # Converte as coordenadas em tuplas
-    coord_pnt1 = (lat_ponto1, lon_ponto1)
-    coord_pnt2 = (lat_ponto2, lon_ponto2)
 
-    return geopy.distance.geodesic(coord_pnt1, coord_pnt2).m
+    return float(distancia.calcula_distancias(float(lat_ponto1), float(lon_ponto1), float(lat_ponto2),
+                                              float(lon_ponto2), MODO_DISTANCIA))
+
+
+# Calcula, em uma única chamada vetorizada, as distâncias entre os pontos consecutivos de todas as ruas
+# Retorna um dicionário que associa o id de cada rua ao array com as distâncias dos seus segmentos
+def calcula_distancias_ruas():
+
+    latitudes = []
+    longitudes = []
+
+    # Índice onde começam os pontos de cada rua nos arrays de coordenadas
+    inicios = []
+
+    for rua in ruas.values():
+
+        inicios.append(len(latitudes))
+
+        for ponto_rua in rua.pontos:
+            latitudes.append(float(ponto_rua.latitude))
+            longitudes.append(float(ponto_rua.longitude))
+
+    segmentos = distancia.distancias_consecutivas(latitudes, longitudes, inicios, MODO_DISTANCIA)
+
+    # Separa os segmentos de cada rua, uma rua com n pontos possui n - 1 segmentos
+    distancias_ruas = {}
+    inicio_segmentos = 0
+
+    for id_rua, rua in ruas.items():
+
+        quantidade_segmentos = max(len(rua.pontos) - 1, 0)
+        distancias_ruas[id_rua] = segmentos[inicio_segmentos:inicio_segmentos + quantidade_segmentos]
+        inicio_segmentos += quantidade_segmentos
+
+    return distancias_ruas
 
 
 def retorna_maior_label():
@@ -841,197 +1117,237 @@ def conecta_grafo(grafo):
             primeiro_componente = componentes
 
 
-def get_configuration_for_execute():
-    with open("configurations.log", "r") as input_file:
+# Monta o subgrafo de um agrupamento e o converte para um grafo euleriano
+def monta_subgrafo_euleriano(ids_pontos):
 
-        for line in input_file:
+    # Monta um subgrafo com o agrupamento
+    grafo_cluster = grafo_cidade_simplificado.subgraph(ids_pontos).copy()
 
-            if not line.startswith("#"):
-                return eval(line)
+    # Verifica se o subgrafo é euleriano
+    if not nx.is_eulerian(grafo_cluster):
 
-    return False
+        # Transforma em um grafo euleriano
+        grafo_cluster = converte_grafo_euleriano(grafo_cluster)
 
+    return grafo_cluster
 
-def save_configuration_executed(config):
-    line_to_modify = f'{config}\n'
 
-    with open("configurations.log", "r") as input_file, tempfile.NamedTemporaryFile("w", delete=False) as output_file:
+# Executa o k-means de um número de clusters, utilizado como tarefa na geração do 'cache'
+def _rotulos_tarefa(tarefa):
 
-        for line in input_file:
+    n_cluster, semente, coordenadas = tarefa
 
-            if line == line_to_modify:
+    return n_cluster, k_means_rotulos(n_cluster, semente, coordenadas)
 
-                output_file.write("# " + line)
-            else:
 
-                output_file.write(line)
+# Monta o subgrafo euleriano de um agrupamento, utilizado como tarefa na geração do 'cache'
+def _subgrafo_tarefa(tarefa):
+
+    n_cluster, id_cluster, ids_pontos = tarefa
+
+    return n_cluster, id_cluster, monta_subgrafo_euleriano(ids_pontos)
+
+
+# Monta o subgrafo euleriano de um agrupamento dentro de um processo filho
+def _subgrafo_em_processo(tarefa):
+
+    n_cluster, id_cluster, grafo_cluster = _subgrafo_tarefa(tarefa)
+
+    # O subgrafo volta somente com os ids das ruas, e o processo principal recupera os objetos
+    substitui_ruas_por_ids(grafo_cluster)
+
+    return n_cluster, id_cluster, grafo_cluster
+
+
+# As arestas dos grafos guardam o objeto Rua, que referencia todo o grafo da cidade através dos pontos
+# Para que o grafo seja serializado, as ruas das arestas são trocadas pelos seus ids
+def substitui_ruas_por_ids(grafo):
+
+    for _, _, dados in grafo.edges(data=True):
+
+        if isinstance(dados.get('rua'), Rua):
+            dados['rua'] = dados['rua'].id
+
 
-    shutil.move(output_file.name, "configurations.log")
+# Troca os ids das ruas das arestas pelos respectivos objetos Rua
+def recupera_ruas(grafo):
 
+    for _, _, dados in grafo.edges(data=True):
 
-def projeto_fatorial():
+        if 'rua' in dados and not isinstance(dados['rua'], Rua):
+            dados['rua'] = ruas[dados['rua']]
+
+
+# Monta o 'cache'
+# Os agrupamentos de cada número de clusters, e os subgrafos de cada agrupamento, são independentes entre si
+# Então, se 'processos' for maior que 1 (ou 0, para usar todos os núcleos), eles são montados em paralelo
+# Se 'processos' não for informado, é utilizado o valor de PROCESSOS_CACHE
+def monta_cache_mapas(processos=None):
 
     global cache_mapas_eulerizados
 
-    # Monta o 'cache' dos mapas eulerizados
-    monta_cache_mapas()
-    # Fixados
-    # a1, a2 = 300, 400  # Gerações
-    ger = 500
+    # Vai do mínimo ao máximo de clusters
+    # O mínimo foi definido como 2 para abranger o mínimo possível em qualquer execução
+    numeros_clusters = list(range(2, MAX_CLUSTERS + 1))
+
+    # Se o 'cache' já estiver completo, por exemplo quando foi carregado do disco, não há nada a ser gerado
+    if all(n_cluster in cache_mapas_eulerizados for n_cluster in numeros_clusters):
+        return
+
+    print("Gerando 'cache' dos mapas...")
+
+    if processos is None:
+        processos = PROCESSOS_CACHE
+
+    # As sementes do k-means são sorteadas antes da execução, para que o resultado não dependa da ordem em que os
+    # processos terminam
+    sementes = {n_cluster: np.random.randint(2 ** 31 - 1) for n_cluster in numeros_clusters}
+
+    if processos <= 0:
+        processos = os.cpu_count()
+
+    if processos > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+
+        print("Execução paralela indisponível neste sistema, o 'cache' será gerado em série")
+        processos = 1
+
+    # Os processos são criados por fork para que herdem o grafo da cidade sem precisar serializá-lo
+    pool = multiprocessing.get_context('fork').Pool(processos) if processos > 1 else None
+
+    # Função que aplica as tarefas em série ou em paralelo, entregando os resultados conforme são concluídos
+    def executa(funcao, tarefas):
+
+        if pool is None:
+            return map(funcao, tarefas)
 
-    # b1, b2 = 100, 150  # Tamanho da população
-    pop = 100
+        return pool.imap_unordered(funcao, tarefas)
 
-    # c1, c2 = 0.45, 0.5  # Taxa de mutação
-    mut = 0.4
-
-    # d1, d2 = 0.65, 0.7  # Taxa de crossover
-    cro = 0.6
+    # Os processos são encerrados mesmo que a geração do 'cache' seja interrompida por um erro
+    gerado = False
 
-    configurations = {"1": [ger, pop, mut, cro]}
-    """configurations = {
-        "1": [a2, b2, c2, d2],
-        "2": [a2, b2, c2, d1],
-        "3": [a2, b2, c1, d2],
-        "4": [a2, b2, c1, d1],
-        "5": [a2, b1, c2, d2],
-        "6": [a2, b1, c2, d1],
-        "7": [a2, b1, c1, d2],
-        "8": [a2, b1, c1, d1],
-        "9": [a1, b2, c2, d2],
-        "10": [a1, b2, c2, d1],
-        "11": [a1, b2, c1, d2],
-        "12": [a1, b2, c1, d1],
-        "13": [a1, b1, c2, d2],
-        "14": [a1, b1, c2, d1],
-        "15": [a1, b1, c1, d2],
-        "16": [a1, b1, c1, d1]
-    }"""
+    try:
 
-    # Lista com as linhas do arquivo
-    linhas = []
+        # As coordenadas dos pontos são montadas uma única vez para todos os agrupamentos
+        coordenadas = coordenadas_agrupamento()
 
-    # Cria o arquivo de configurações
-    with open("configurations.log", "w") as arq_configuracao:
+        # Realiza a clusterização com cada número de clusters
+        # Com o aquecimento, cada agrupamento depende do anterior, então eles são feitos em série
+        if AQUECIMENTO_AGRUPAMENTO:
 
-        # Passa por cada uma das configurações
-        for config in configurations.keys():
+            agrupamentos = agrupamento.agrupa_todos(coordenadas, numeros_clusters, MODO_AGRUPAMENTO,
+                                                    sementes[numeros_clusters[0]] if numeros_clusters else None)
+        else:
+
+            agrupamentos = {}
 
-            # Número de vezes que cada configuração será testada
-            for iteracao in range(3):
-                # Adiciona a linha na lista
-                linhas.append(f"[{config}, {iteracao}]\n")
+            tarefas_agrupamento = [(n, sementes[n], coordenadas) for n in numeros_clusters]
 
-        # Após todas as linhas geradas, percorre a lista que as armazena
-        while linhas:
-            # Escrevendo no arquivo uma linha aleatoria, para que uma configuração não seja prejudicada tendo testes
-            # executados um após o outro
-            linha = random.choice(linhas)
-            arq_configuracao.write(linha)
-            linhas.remove(linha)
+            for n_cluster, rotulos in executa(_rotulos_tarefa, tarefas_agrupamento):
 
-    arq_configuracao.close()
+                agrupamentos[n_cluster] = rotulos
 
-    configuration_and_iteration = get_configuration_for_execute()
+        # Organiza os pontos de cada agrupamento, seguindo a ordem dos números de clusters
+        pontos_clusterizados = {}
 
-    # Executa as configurações do arquivo gerado acima
-    while configuration_and_iteration:
+        for n_cluster in numeros_clusters:
+            pontos_clusterizados[n_cluster] = agrupa_pontos(agrupamentos[n_cluster])
 
-        print(f"Iteração {str(configuration_and_iteration[1])}: Configuração {str(configuration_and_iteration[0])}\n")
+        # Monta as tarefas de eulerização, uma para cada agrupamento de cada número de clusters
+        tarefas = [(n_cluster, id_cluster, [ponto.id for ponto in cluster])
+                   for n_cluster in numeros_clusters for id_cluster, cluster in pontos_clusterizados[n_cluster].items()]
 
-        parameter = configurations[str(configuration_and_iteration[0])]
-        processamento_rotas(parameter[0], parameter[1], parameter[2], parameter[3])
+        # Inicia a lista de subgrafos eulerizados de cada número de clusters
+        subgrafos_eularizados = {n_cluster: {} for n_cluster in numeros_clusters}
 
-        save_configuration_executed(configuration_and_iteration)
-        configuration_and_iteration = get_configuration_for_execute()
+        # Quantidade de agrupamentos que ainda faltam para cada número de clusters
+        restantes = {n_cluster: len(pontos_clusterizados[n_cluster]) for n_cluster in numeros_clusters}
 
+        concluidos = 0
 
-# Calcula as medianas dos arquivos de saída gerados
-def calcula_medianas():
-    # Itera sobre os arquivos de saida
-    for filename in os.listdir("saida/Resultados"):
+        # Percorre os agrupamentos realizados pelo k-means
+        funcao = _subgrafo_em_processo if pool is not None else _subgrafo_tarefa
 
-        # Lista que armazena os valores de hypervolume
-        hypervolumes = []
+        for n_cluster, id_cluster, grafo_cluster in executa(funcao, tarefas):
 
-        # Lista que aramzena os valores de tempo de execução
-        tempos = []
+            # Recupera os objetos Rua das arestas montadas em outro processo
+            if pool is not None:
+                recupera_ruas(grafo_cluster)
 
-        # Abre o arquivo para ser lido e atualizado
-        # with open(filename, "a+") as arquivo:
-        with open("saida/Resultados/" + filename, "r") as input_file, tempfile.NamedTemporaryFile("w",
-                                                                                                  delete=False) as output_file:
+            # Adiciona nos subgrafos eulerizados
+            subgrafos_eularizados[n_cluster][id_cluster] = grafo_cluster
 
-            # Itera sobre as linhas do arquivo
-            for linha in input_file:
-                # O que tiver antes da vírgula é o valor de hypervolume
-                hypervolumes.append(float(linha.split(',')[0]))
+            restantes[n_cluster] -= 1
 
-                # E o que tiver depois é o valor do tempo de execução
-                tempos.append(float(linha.split(',')[1]))
+            if restantes[n_cluster] == 0:
 
-                # Escreve a linha novamente no arquivo
-                output_file.write(linha)
+                concluidos += 1
+                print(f"Cache do mapeamento para {n_cluster} clusters gerado ({concluidos}/{len(numeros_clusters)})")
 
-            # Ordena as listas
-            hypervolumes.sort()
-            tempos.sort()
+        gerado = True
+    finally:
 
-            # Cálculo da mediana
-            # Identifica se a lista é de tamanho ímpar ou par
-            if len(hypervolumes) % 2 == 0 and len(tempos) % 2 == 0:
+        if pool is not None:
 
-                # Se for par calcula a média entre os dois elementos centrais
-                media_hypervolume = (hypervolumes[ceil(len(hypervolumes) / 2) - 1] +
-                                     hypervolumes[ceil(len(hypervolumes) / 2)]) / 2
-                media_tempos = (tempos[ceil(len(tempos) / 2) - 1] + tempos[ceil(len(tempos) / 2)]) / 2
-
-                output_file.write(f"\n\n{media_hypervolume},{media_tempos}")
+            if gerado:
+                pool.close()
             else:
+                pool.terminate()
 
-                # Se for ímpar calcula o meio da lista
-                output_file.write(f"\n\n{hypervolumes[ceil(len(hypervolumes) / 2) - 1]},"
-                                  f"{tempos[ceil(len(hypervolumes) / 2) - 1]}")
+            pool.join()
 
-        shutil.move(output_file.name, "saida/Resultados/" + filename)
+    # Insere na lista global para ser acessada posteriormente, seguindo a ordem dos números de clusters
+    for n_cluster in numeros_clusters:
 
+        subgrafos = {id_cluster: subgrafos_eularizados[n_cluster][id_cluster]
+                     for id_cluster in pontos_clusterizados[n_cluster]}
 
-# Monta o 'cache'
-def monta_cache_mapas():
+        cache_mapas_eulerizados[n_cluster] = [pontos_clusterizados[n_cluster], subgrafos]
 
-    global cache_mapas_eulerizados
 
-    print("Gerando 'cache' dos mapas...")
 
-    # Vai do mínimo ao máximo de clusters
-    # O mínimo foi definido como 2 para abranger o mínimo possível em qualquer execução
-    for n_cluster in range(2, MAX_CLUSTERS + 1):
+# Descarta a cidade processada, deixando os dados globais como estavam antes da leitura do arquivo
+# Permite que outra cidade seja processada na mesma execução
+def limpa_cidade():
 
-        # Realiza a clusterização com o número de clusters atual
-        pontos_clusterizados = k_means(n_cluster)
+    global quantidade_lixo_cidade
 
-        # Inicia a lista de subgrafos eulerizados
-        subgrafos_eularizados = {}
+    pontos.clear()
+    pontos_otimizados.clear()
+    ruas.clear()
 
-        # Percorre os agrupamentos realizados pelo k-means
-        for id_cluster, cluster in pontos_clusterizados.items():
+    # Os grafos são limpos no lugar, pois outros módulos podem possuir referências a eles
+    grafo_cidade.clear()
+    grafo_cidade_simplificado.clear()
 
-            # Monta um subgrafo com o agrupamento
-            grafo_cluster = grafo_cidade_simplificado.subgraph(ponto.id for ponto in cluster).copy()
+    cache_mapas_eulerizados.clear()
+    distancias_deposito.clear()
+    predecessores_deposito.clear()
 
-            # Verifica se o subgrafo é euleriano
-            if not nx.is_eulerian(grafo_cluster):
+    quantidade_lixo_cidade = 0
 
-                # Transforma em um grafo euleriano
-                grafo_cluster = converte_grafo_euleriano(grafo_cluster)
 
-            # Adiciona nos subgrafos eulerizados
-            subgrafos_eularizados[id_cluster] = grafo_cluster
+# Monta o modelo imutável da cidade a partir dos dados globais, que é utilizado pelo NSGA-II
+# O grafo compilado é montado com as demandas atuais, então o modelo deve ser montado depois que elas forem calculadas
+def monta_modelo_cidade():
+
+    grafo = GrafoCompilado(grafo_cidade_simplificado, pontos_otimizados, DEPOSITO, distancias_deposito,
+                           predecessores_deposito)
+
+    clusters = {n_cluster: {id_cluster: [ponto.id for ponto in cluster]
+                            for id_cluster, cluster in pontos_clusterizados.items()}
+                for n_cluster, (pontos_clusterizados, _) in cache_mapas_eulerizados.items()}
+
+    subgrafos = {n_cluster: subgrafos for n_cluster, (_, subgrafos) in cache_mapas_eulerizados.items()}
+
+    coordenadas = {id_ponto: f"{ponto.longitude},{ponto.latitude},{ponto.altitude}"
+                   for id_ponto, ponto in pontos_otimizados.items()}
 
-        print(f"Cache do mapeamento para {n_cluster} clusters gerado")
+    # A aresta pode armazenar o objeto Rua ou somente o seu id
+    nomes_ruas = {rua.id: rua.nome for _, _, rua in grafo_cidade_simplificado.edges(data='rua')
+                  if isinstance(rua, Rua)}
 
-        # Insere na lista global para ser acessada posteriormente
-        cache_mapas_eulerizados[n_cluster] = [pontos_clusterizados, subgrafos_eularizados]
+    return ModeloCidade(grafo, DEPOSITO, CAPACIDADE_CAMINHAO, quantidade_lixo_cidade, clusters, subgrafos, coordenadas,
+                        nomes_ruas)
 
 
 # Captura a altitude dos pontos
@@ -0,0 +1,80 @@
+# Testes do desempate pelo operador de crowding do NSGA-II
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+# O módulo util deve ser importado antes do NSGA-II, que o importa de volta
+import RoteamentoTCC.util  # noqa: F401
+from RoteamentoTCC.nsga.nsga2 import NSGA2
+from RoteamentoTCC.nsga.population import Population
+import RoteamentoTCC.nsga.dominancia as dominancia
+
+
+# Retorna uma instância do NSGA-II sem a cidade, suficiente para os operadores de crowding
+@pytest.fixture
+def nsga():
+    return NSGA2.__new__(NSGA2)
+
+
+# Cria uma população com os ranks e crowding distances passados, um indivíduo por par
+def _populacao(ranks, distancias):
+
+    population = Population(10, 1, 5)
+
+    for rank, distancia in zip(ranks, distancias):
+
+        individual = population.new_individual([1, 1, []])
+        individual.rank = rank
+        individual.crowding_distance = distancia
+
+    return population
+
+
+def test_mesmo_rank_maior_crowding_vence(nsga):
+
+    a, b = _populacao([1, 1], [0.5, 1.5]).individuals
+
+    assert nsga.crowded_comparison(a, b) == b
+    assert nsga.crowded_comparison(b, a) == b
+
+
+def test_menor_rank_vence_qualquer_crowding(nsga):
+
+    a, b = _populacao([1, 2], [0.0, np.inf]).individuals
+
+    assert nsga.crowded_comparison(a, b) == a
+    assert nsga.crowded_comparison(b, a) == a
+
+
+def test_ordem_crowding_mantem_ordem_original_nos_empates():
+
+    ranks = [2, 1, 1, 2, 1, 1]
+    distancias = [1.0, 0.5, np.inf, 1.0, 0.5, np.inf]
+
+    assert dominancia.ordem_crowding(ranks, distancias).tolist() == [2, 5, 1, 4, 0, 3]
+    assert dominancia.ordem_crowding(ranks, distancias, 3).tolist() == [2, 5, 1]
+
+
+def test_truncamento_segue_crowded_comparison(nsga):
+
+    gerador = random.Random(7)
+
+    ranks = [gerador.randint(1, 3) for _ in range(40)]
+    distancias = [gerador.choice([0.0, 0.25, 0.5, 1.0, np.inf]) for _ in range(40)]
+
+    population = _populacao(ranks, distancias)
+    individuals = population.individuals
+
+    ordem = nsga.crowded_truncation(population, population.size)
+
+    assert sorted(ordem.tolist()) == list(range(population.size))
+
+    # Todo indivíduo vence, ou empata com, os que vêm depois dele na ordem
+    for anterior, posterior in itertools.combinations(ordem, 2):
+        assert nsga.crowded_comparison(individuals[posterior], individuals[anterior]) == individuals[anterior]
+
+    # O truncamento retorna o início da mesma ordem
+    assert nsga.crowded_truncation(population, 10).tolist() == ordem[:10].tolist()
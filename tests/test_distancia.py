@@ -0,0 +1,57 @@
+# Testes da precisão do cálculo vetorizado de distâncias em relação ao geopy
+
+import numpy as np
+import pytest
+
+from RoteamentoTCC.distancia import calcula_distancias, erro_geopy
+
+# Pares fixos de coordenadas (lat1, lon1, lat2, lon2) na região de Formiga, com distâncias de poucos metros a alguns
+# quilômetros, como as arestas e os trechos de rua das cidades
+PARES_CIDADE = np.array([
+    (-20.4640, -45.4262, -20.4641, -45.4262),
+    (-20.4640, -45.4262, -20.4652, -45.4275),
+    (-20.4598, -45.4311, -20.4705, -45.4190),
+    (-20.4500, -45.4500, -20.4900, -45.4000),
+    (-20.4723, -45.4458, -20.4723, -45.4157),
+    (-20.4401, -45.4230, -20.4802, -45.4230),
+])
+
+# Pares fixos de coordenadas distantes, incluindo o equador, altas latitudes e pontos quase antípodas
+PARES_DISTANTES = np.array([
+    (-20.4640, -45.4262, -19.9167, -43.9345),
+    (-20.4640, -45.4262, -23.5505, -46.6333),
+    (0.0, 0.0, 0.0, 1.0),
+    (60.0, 10.0, 61.0, 12.0),
+    (0.0, 0.0, 0.5, 179.5),
+])
+
+
+def _erro(pares, modo):
+    return erro_geopy(pares[:, 0], pares[:, 1], pares[:, 2], pares[:, 3], modo)
+
+
+def test_vincenty_cidade_erro_abaixo_de_micrometro():
+    assert _erro(PARES_CIDADE, 'vincenty') < 1e-6
+
+
+def test_vincenty_distantes_erro_submilimetrico():
+    assert _erro(PARES_DISTANTES, 'vincenty') < 1e-3
+
+
+@pytest.mark.parametrize('pares', [PARES_CIDADE, PARES_DISTANTES], ids=['cidade', 'distantes'])
+def test_haversine_erro_relativo_ate_meio_porcento(pares):
+
+    # O erro é avaliado par a par, relativo à distância de cada um
+    for par in pares:
+
+        distancia = calcula_distancias(*par[:, None], 'vincenty')[0]
+
+        assert _erro(par[None, :], 'haversine') < 0.005 * distancia
+
+
+def test_pontos_coincidentes():
+
+    pares = np.array([(-20.4640, -45.4262, -20.4640, -45.4262)])
+
+    for modo in ('vincenty', 'haversine'):
+        assert _erro(pares, modo) == 0.0